@@ -135,10 +135,8 @@ def dY_dt_multimode_evolution(Y, self):
         df_hat_dt  -= fields_term
 
     # Avoiding addition of the collisional term when tau != inf
-    tau = self.physical_system.params.tau(self.q1_center, 
-                                          self.q2_center,
-                                          self.p1, self.p2, self.p3
-                                         )
+    # tau is evaluated once at initialization of the solver:
+    tau = self._tau
 
     df_hat_dt += af.select(tau != np.inf,\
                            C_f_hat,\
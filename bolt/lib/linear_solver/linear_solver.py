@@ -152,6 +152,18 @@ class linear_solver(object):
         else:
             self.single_mode_evolution = False
 
+        # Evaluating tau once over the phase space. This is used in 
+        # checking for tau = 0 systems in every time-step:
+        if(self.single_mode_evolution == False):
+            self._tau = physical_system.params.tau(self.q1_center, self.q2_center,
+                                                   self.p1, self.p2, self.p3
+                                                  )
+            
+            if(isinstance(self._tau, af.Array)):
+                self._tau_is_zero = bool(af.any_true(self._tau == 0))
+            else:
+                self._tau_is_zero = (self._tau == 0)
+
         # Initializing f, f_hat and the other EM field quantities:
         self._initialize(physical_system.params)
 
@@ -8,12 +8,7 @@ from .dY_dt import dY_dt
 def RK5_step(self, dt):
     self.Y = integrators.RK5(dY_dt, self.Y, dt, self)
     # Solving for tau = 0 systems
-    if(    self.single_mode_evolution == False
-       and af.any_true(self.physical_system.params.tau(self.q1_center, self.q2_center, 
-                                                       self.p1, self.p2, self.p3
-                                                      ) == 0
-                      )
-      ):
+    if(self.single_mode_evolution == False and self._tau_is_zero == True):
         f_hat = self.Y[:, :, :, 0]
         f     = af.real(af.ifft2(0.5 * self.N_q2 * self.N_q1 * f_hat))
 
@@ -29,12 +24,7 @@ def RK5_step(self, dt):
 def RK4_step(self, dt):
     self.Y = integrators.RK4(dY_dt, self.Y, dt, self)
     # Solving for tau = 0 systems
-    if(    self.single_mode_evolution == False
-       and af.any_true(self.physical_system.params.tau(self.q1_center, self.q2_center, 
-                                                       self.p1, self.p2, self.p3
-                                                      ) == 0
-                      )
-      ):
+    if(self.single_mode_evolution == False and self._tau_is_zero == True):
         f_hat = self.Y[:, :, :, 0]
         f     = af.real(af.ifft2(0.5 * self.N_q2 * self.N_q1 * f_hat))
 
@@ -50,12 +40,7 @@ def RK4_step(self, dt):
 def RK2_step(self, dt):
     self.Y = integrators.RK2(dY_dt, self.Y, dt, self)
     # Solving for tau = 0 systems
-    if(    self.single_mode_evolution == False
-       and af.any_true(self.physical_system.params.tau(self.q1_center, self.q2_center, 
-                                                       self.p1, self.p2, self.p3
-                                                      ) == 0
-                      )
-      ):
+    if(self.single_mode_evolution == False and self._tau_is_zero == True):
         f_hat = self.Y[:, :, :, 0]
         f     = af.real(af.ifft2(0.5 * self.N_q2 * self.N_q1 * f_hat))
 
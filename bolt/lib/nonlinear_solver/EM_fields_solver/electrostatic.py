@@ -4,52 +4,513 @@
 import arrayfire as af
 import numpy as np
 from numpy.fft import fftfreq
+from petsc4py import PETSc
+
+from bolt.lib.nonlinear_solver.utils.ghost_zones import get_local_corners, \
+                                                       get_ghost_widths, \
+                                                       get_interior_slices
+
+def _split(N, N_parts):
+    """
+    Returns the slices which split range(N) into N_parts
+    contiguous parts of nearly equal sizes.
+    """
+    sizes  = [N // N_parts + (1 if i < N % N_parts else 0) for i in range(N_parts)]
+    starts = np.cumsum([0] + sizes)
+
+    return([slice(starts[i], starts[i + 1]) for i in range(N_parts)])
+
+def _overlap(a, b, offset = 0):
+    """
+    Returns the slice of the overlap of the slices a and b, shifted
+    by -offset. Returns an empty slice when these don't overlap.
+    """
+    start = max(a.start, b.start)
+    stop  = max(min(a.stop, b.stop), start)
+
+    return(slice(start - offset, stop - offset))
+
+def _redistribute(comm, array, send_slices, recv_slices, shape_out):
+    """
+    Redistributes the blocks of the arrays held by the ranks of comm,
+    using a single all-to-all exchange. array[send_slices[i]] is sent to
+    rank i, and the block received from rank i is assigned to 
+    array_out[recv_slices[i]], where array_out is of shape shape_out. The 
+    slices select along the first 2 axes, and any further axes are kept.
+    """
+    send_buffer = np.concatenate([array[slices].ravel() for slices in send_slices])
+    send_counts = [array[slices].size for slices in send_slices]
+
+    array_out   = np.zeros(shape_out, dtype = array.dtype)
+    recv_counts = [array_out[slices].size for slices in recv_slices]
+    recv_buffer = np.zeros(sum(recv_counts), dtype = array.dtype)
+
+    comm.Alltoallv([send_buffer, send_counts], [recv_buffer, recv_counts])
+
+    recv_displacements = np.cumsum([0] + recv_counts)
+    for i, slices in enumerate(recv_slices):
+        array_out[slices] = \
+            recv_buffer[recv_displacements[i]:recv_displacements[i + 1]].\
+            reshape(array_out[slices].shape)
+
+    return(array_out)
+
+def _slab_redistributions(local_zones, rank, N_q1, N_q2, N_k1):
+    """
+    Returns the redistributions used by the parallel FFTs on the rank, as
+    a dict of the (send_slices, recv_slices) passed to _redistribute:
+
+    to_q2_slabs  : Local zones --> slabs of q2(holding all of q1)
+    to_k1_slabs  : Slabs of q2 --> slabs of k1(holding all of q2)
+
+    along with their inverses from_k1_slabs and from_q2_slabs. The shapes
+    of the arrays held by the rank are returned under the key shapes. 
+    local_zones holds the slices(along q1, q2) of the local zones of all
+    the ranks, and N_k1 is the number of wavenumbers along q1.
+    """
+    N_procs = len(local_zones)
+
+    q2_slabs = _split(N_q2, N_procs)
+    k1_slabs = _split(N_k1, N_procs)
+
+    (q1_local, q2_local) = local_zones[rank]
+    q2_slab, k1_slab     = q2_slabs[rank], k1_slabs[rank]
+
+    redistributions = {}
+
+    redistributions['to_q2_slabs'] = \
+        ([(slice(None), _overlap(q2_local, q2_slabs[i], q2_local.start))
+          for i in range(N_procs)
+         ],
+         [(local_zones[i][0], _overlap(local_zones[i][1], q2_slab, q2_slab.start))
+          for i in range(N_procs)
+         ]
+        )
+
+    redistributions['to_k1_slabs'] = \
+        ([(k1_slabs[i], slice(None)) for i in range(N_procs)],
+         [(slice(None), q2_slabs[i]) for i in range(N_procs)]
+        )
+    
+    # The inverse redistributions swap the slices sent and received:
+    redistributions['from_k1_slabs'] = redistributions['to_k1_slabs'][::-1]
+    redistributions['from_q2_slabs'] = redistributions['to_q2_slabs'][::-1]
+
+    redistributions['shapes'] = \
+        {'q2_slab'     : (N_q1, q2_slab.stop - q2_slab.start),
+         'q2_slab_hat' : (N_k1, q2_slab.stop - q2_slab.start),
+         'k1_slab'     : (k1_slab.stop - k1_slab.start, N_q2),
+         'local_zone'  : (q1_local.stop - q1_local.start,
+                          q2_local.stop - q2_local.start
+                         )
+        }
+
+    return(redistributions)
+
+def _create_fft_poisson_plan(self):
+    """
+    Creates the data used by fft_poisson(held in self._fft_poisson_plan), 
+    which is cached since it doesn't change during the evolution. This 
+    includes the wavenumbers for the real-to-complex transforms, and the 
+    inverse of the laplacian.
+
+    When run in parallel, the transforms are carried out over slabs:
+    The local zones of the DMDA are redistributed so that each rank holds
+    all of q1 for a slab of q2, and is transformed along q1. The result is
+    redistributed so that each rank holds all of q2 for a slab of k1, 
+    and is transformed along q2. The inverse transforms retrace these steps.
+    """
+    N_procs = self._comm.size
+    N_k1    = self.N_q1 // 2 + 1
+
+    k_q1 = np.fft.rfftfreq(self.N_q1, self.dq1)
+    k_q2 = fftfreq(self.N_q2, self.dq2)
+
+    if(N_procs == 1):
+        k_q2, k_q1 = np.meshgrid(k_q2, k_q1)
+
+        inverse_laplacian       = 1 / (4 * np.pi**2 * (k_q1**2 + k_q2**2) + (k_q1 == 0) * (k_q2 == 0))
+        inverse_laplacian[0, 0] = 0
+
+        self._fft_poisson_plan = {'k_q1'              : af.to_array(k_q1),
+                                  'k_q2'              : af.to_array(k_q2),
+                                  'inverse_laplacian' : af.to_array(inverse_laplacian)
+                                 }
+
+        return
+
+    if(self.N_q2 == 1 or self.N_q2 < N_procs or N_k1 < N_procs):
+        raise Exception('FFT solver needs the number of zones along q2, and '
+                        'N_q1 // 2 + 1 to be at least the number of ranks. '
+                        'Use the KSP solver instead'
+                       )
+
+    # Local zones of the DMDA held by all the ranks:
+    local_zones = [(slice(i_q1_start, i_q1_start + N_q1_local), 
+                    slice(i_q2_start, i_q2_start + N_q2_local)
+                   )
+                   for ((i_q1_start, i_q2_start), (N_q1_local, N_q2_local)) 
+                   in self._comm.allgather(get_local_corners(self._da_f))
+                  ]
+
+    plan = _slab_redistributions(local_zones, self._comm.rank, 
+                                 self.N_q1, self.N_q2, N_k1
+                                )
+
+    k1_slab    = _split(N_k1, N_procs)[self._comm.rank]
+    k_q2, k_q1 = np.meshgrid(k_q2, k_q1[k1_slab])
+
+    inverse_laplacian = 1 / (4 * np.pi**2 * (k_q1**2 + k_q2**2) + (k_q1 == 0) * (k_q2 == 0))
+    inverse_laplacian[(k_q1 == 0) * (k_q2 == 0)] = 0
+
+    plan['k_q1']              = k_q1
+    plan['k_q2']              = k_q2
+    plan['inverse_laplacian'] = inverse_laplacian
+
+    self._fft_poisson_plan = plan
+
+    return
 
 def fft_poisson(self, f=None):
     """
     Solves the Poisson Equation using the FFTs:
 
-    Used as a backup solver in case of low resolution runs
-    (ie. used on a single node) with periodic boundary
-    conditions.
+    Used for runs with periodic boundary conditions. Real-to-complex
+    transforms are used. When run in parallel, the transforms are carried
+    out over slabs of the domain(see _create_fft_poisson_plan).
     """
     if(self.performance_test_flag == True):
         tic = af.time()
 
-    if (self._comm.size != 1):
-        raise Exception('FFT solver can only be used when run in serial')
+    if(getattr(self, '_fft_poisson_plan', None) is None):
+        _create_fft_poisson_plan(self)
+
+    plan = self._fft_poisson_plan
+
+    interior_q1, interior_q2 = get_interior_slices(self)
+    rho = af.reorder(  self.physical_system.params.charge_electron \
+                     * self.compute_moments('density', f)[:, interior_q1, interior_q2],
+                     1, 2, 0
+                    )
+
+    if(self._comm.size == 1):
+        rho_hat = af.fft2_r2c(rho)
+
+        potential_hat = rho_hat * plan['inverse_laplacian']
+
+        E1_hat = -1j * 2 * np.pi * plan['k_q1'] * potential_hat
+        E2_hat = -1j * 2 * np.pi * plan['k_q2'] * potential_hat
+
+        # Non-inclusive of ghost-zones:
+        E1_physical = af.reorder(af.fft2_c2r(E1_hat, self.N_q1 % 2 == 1), 2, 0, 1)
+        E2_physical = af.reorder(af.fft2_c2r(E2_hat, self.N_q1 % 2 == 1), 2, 0, 1)
 
     else:
-        N_g = self.N_ghost
-        rho = af.reorder(  self.physical_system.params.charge_electron \
-                         * self.compute_moments('density', f)[:, N_g:-N_g, N_g:-N_g],
-                         1, 2, 0
+        rho = rho.to_ndarray().reshape(plan['shapes']['local_zone'])
+
+        # Transforming along q1:
+        rho = _redistribute(self._comm, rho, *plan['to_q2_slabs'], 
+                            plan['shapes']['q2_slab']
+                           )
+        rho_hat = np.fft.rfft(rho, axis = 0)
+
+        # Transforming along q2:
+        rho_hat = _redistribute(self._comm, rho_hat, *plan['to_k1_slabs'], 
+                                plan['shapes']['k1_slab']
+                               )
+        rho_hat = np.fft.fft(rho_hat, axis = 1)
+
+        potential_hat = rho_hat * plan['inverse_laplacian']
+
+        # E1 and E2 are stacked along axis 2, and transformed together:
+        E_hat = np.stack([-1j * 2 * np.pi * plan['k_q1'] * potential_hat,
+                          -1j * 2 * np.pi * plan['k_q2'] * potential_hat
+                         ],
+                         axis = 2
                         )
+        
+        E_hat = np.fft.ifft(E_hat, axis = 1)
+        E_hat = _redistribute(self._comm, E_hat, *plan['from_k1_slabs'], 
+                              plan['shapes']['q2_slab_hat'] + (2,)
+                             )
 
-        k_q1 = fftfreq(rho.shape[0], self.dq1)
-        k_q2 = fftfreq(rho.shape[1], self.dq2)
+        E = np.fft.irfft(E_hat, n = self.N_q1, axis = 0)
+        E = _redistribute(self._comm, E, *plan['from_q2_slabs'], 
+                          plan['shapes']['local_zone'] + (2,)
+                         )
+        
+        # Non-inclusive of ghost-zones:
+        E1_physical = af.reorder(af.to_array(np.ascontiguousarray(E[:, :, 0])), 2, 0, 1)
+        E2_physical = af.reorder(af.to_array(np.ascontiguousarray(E[:, :, 1])), 2, 0, 1)
 
-        k_q2, k_q1 = np.meshgrid(k_q2, k_q1)
+    self.cell_centered_EM_fields[0, interior_q1, interior_q2] = E1_physical
+    self.cell_centered_EM_fields[1, interior_q1, interior_q2] = E2_physical
 
-        k_q1 = af.to_array(k_q1)
-        k_q2 = af.to_array(k_q2)
+    af.eval(self.cell_centered_EM_fields)
 
-        rho_hat = af.fft2(rho)
+    if(self.performance_test_flag == True):
+        af.sync()
+        toc = af.time()
+        self.time_fieldsolver += toc - tic
+    
+    return
 
-        potential_hat       = rho_hat / (4 * np.pi**2 * (k_q1**2 + k_q2**2))
-        potential_hat[0, 0] = 0
+def _poisson_boundary_conditions(self):
+    """
+    Returns the boundary conditions used for the potential at the edges
+    of the domain, as a dict with the keys 'q1_left', 'q1_right', 
+    'q2_bottom' and 'q2_top'. These are taken as periodic when f is 
+    periodic, Neumann(dphi/dn = 0) when f is mirrored, and Dirichlet
+    (phi = 0) otherwise. The non-periodic edges may be overridden using
+    params.poisson_boundary_conditions(a dict with the same keys).
+    """
+    overrides = getattr(self.physical_system.params, 
+                        'poisson_boundary_conditions', {}
+                       )
 
-        E1_hat = -1j * 2 * np.pi * k_q1 * potential_hat
-        E2_hat = -1j * 2 * np.pi * k_q2 * potential_hat
+    boundary_conditions = {}
+    for edge in ['q1_left', 'q1_right', 'q2_bottom', 'q2_top']:
+        bc = getattr(self.boundary_conditions, 'in_' + edge)
 
-        # Non-inclusive of ghost-zones:
-        E1_physical = af.reorder(af.real(af.ifft2(E1_hat)), 2, 0, 1)
-        E2_physical = af.reorder(af.real(af.ifft2(E2_hat)), 2, 0, 1)
+        if(bc == 'periodic'):
+            boundary_conditions[edge] = 'periodic'
+        
+        elif(edge in overrides):
+            if(overrides[edge] not in ['dirichlet', 'neumann']):
+                raise NotImplementedError('Boundary condition for the potential '
+                                          'invalid/not-implemented'
+                                         )
+            boundary_conditions[edge] = overrides[edge]
+
+        elif(bc == 'mirror'):
+            boundary_conditions[edge] = 'neumann'
+
+        else:
+            boundary_conditions[edge] = 'dirichlet'
+
+    return(boundary_conditions)
+
+def _multigrid_levels(N, N_local, periodic):
+    """
+    Returns the number of levels of the geometric multigrid hierarchy
+    which may be obtained by coarsening the DMDA along an axis of N
+    zones(N_local of which are held locally). The coarsening halves
+    the number of zones for periodic axes, and the number of intervals
+    between the zones otherwise. The coarsest level is to hold at least
+    4 zones, with at least 2 zones in each local zone.
+    """
+    levels = 1
+
+    while True:
+        if(periodic):
+            if(N % 2 != 0 or N_local % 2 != 0):
+                break
+            N_coarse, N_local_coarse = N // 2, N_local // 2
+
+        else:
+            if((N - 1) % 2 != 0):
+                break
+            N_coarse, N_local_coarse = (N - 1) // 2 + 1, N_local // 2
+
+        if(N_coarse < 4 or N_local_coarse < 2):
+            break
+
+        N, N_local = N_coarse, N_local_coarse
+        levels    += 1
+
+    return(levels)
+
+def _create_ksp_poisson(self):
+    """
+    Assembles the matrix of -laplacian(phi)(using the 5-point stencil)
+    on self._da_ksp, and creates the KSP solver used by ksp_poisson.
+    The solver uses CG, preconditioned by geometric multigrid on the
+    hierarchy obtained by coarsening self._da_ksp, with Galerkin coarse
+    operators. These may be changed using the options with the prefix
+    poisson_(for instance -poisson_ksp_type, -poisson_pc_mg_levels)
+    """
+    da  = self._da_ksp
+    bcs = self._poisson_bcs = _poisson_boundary_conditions(self)
+
+    ((i_q1_start, i_q2_start), (N_q1_local, N_q2_local)) = get_local_corners(da)
+
+    A = da.createMatrix()
+
+    # The matrix is assembled in a single call, using the local(ghosted)
+    # indices of the zones, which are mapped to the global indices by the
+    # local to global mapping of the DMDA set on A:
+    dim                              = da.getDim()
+    (starts_ghosted, sizes_ghosted)  = da.getGhostCorners()
+    strides                          = (1, sizes_ghosted[0])[:dim]
+    
+    index = np.meshgrid(*[np.arange(start, start + N_local) 
+                          for start, N_local in zip((i_q1_start, i_q2_start), 
+                                                    (N_q1_local, N_q2_local)
+                                                   )[:dim]
+                         ], indexing = 'ij'
+                       )
+    index = [np.ravel(index_axis) for index_axis in index]
+
+    local_index = lambda index: sum((index[axis] - starts_ghosted[axis]) * strides[axis]
+                                    for axis in range(dim)
+                                   )
+
+    rows     = local_index(index)
+    diagonal = np.zeros(rows.size)
+    cols     = [rows]
+    values   = [diagonal]
+
+    # Contributions to the stencil from the neighbours along each axis.
+    # Along q2, these are left out for domains degenerate along q2:
+    neighbours = [(0, self.N_q1, self.dq1, bcs['q1_left'], bcs['q1_right'])]
+    if(self.N_q2 > 1):
+        neighbours.append((1, self.N_q2, self.dq2, bcs['q2_bottom'], bcs['q2_top']))
+
+    for axis, N, dq, bc_start, bc_end in neighbours:
+        for offset, bc, at_edge in [(-1, bc_start, index[axis] == 0),
+                                    ( 1, bc_end,   index[axis] == N - 1)
+                                   ]:
+            diagonal += 1 / dq**2
+
+            # The ghost zone beyond a non-periodic edge is taken as
+            # -phi for Dirichlet, and as phi for Neumann boundaries.
+            # The entry for the neighbour is then added(as 0) to the 
+            # diagonal instead:
+            at_edge   = at_edge & (bc != 'periodic')
+            diagonal += np.where(at_edge, (1 if bc == 'dirichlet' else -1) / dq**2, 0)
+
+            neighbour       = list(index)
+            neighbour[axis] = index[axis] + offset
+
+            cols.append(np.where(at_edge, rows, local_index(neighbour)))
+            values.append(np.where(at_edge, 0, -1 / dq**2))
+
+    A.setValuesLocalRCV(rows.reshape(-1, 1).astype(PETSc.IntType),
+                        np.stack(cols, axis = 1).astype(PETSc.IntType),
+                        np.stack(values, axis = 1),
+                        addv = PETSc.InsertMode.ADD_VALUES
+                       )
+
+    A.assemble()
+
+    # Without any Dirichlet edges, phi is defined up to a constant:
+    if('dirichlet' not in bcs.values()):
+        self._poisson_nullspace = PETSc.NullSpace().create(constant = True, 
+                                                           comm     = self._comm
+                                                          )
+        A.setNullSpace(self._poisson_nullspace)
+
+    else:
+        self._poisson_nullspace = None
+
+    multigrid_levels = \
+        min(_multigrid_levels(N, N_local, bcs[edge] == 'periodic')
+            for N, N_local, edge in [(self.N_q1, N_q1_local, 'q1_left'),
+                                     (self.N_q2, N_q2_local, 'q2_bottom')
+                                    ][:da.getDim()]
+           )
+
+    # Defaults, which are not set when passed by the user:
+    options = PETSc.Options('poisson_')
+    
+    if(not options.hasName('pc_mg_levels')):
+        options.setValue('pc_mg_levels', multigrid_levels)
+
+    if(not options.hasName('pc_mg_galerkin')):
+        options.setValue('pc_mg_galerkin', 'both')
+
+    self._ksp_poisson = PETSc.KSP().create(comm = self._comm)
+    self._ksp_poisson.setOptionsPrefix('poisson_')
+    self._ksp_poisson.setDM(da)
+    self._ksp_poisson.setDMActive(False)
+    self._ksp_poisson.setOperators(A)
+    self._ksp_poisson.setType('cg')
+    self._ksp_poisson.getPC().setType('mg')
+    
+    # The potential from the previous solve is used as the initial guess:
+    self._ksp_poisson.setInitialGuessNonzero(True)
+    self._ksp_poisson.setFromOptions()
+
+    self._glob_rho       = da.createGlobalVec()
+    self._glob_potential = da.createGlobalVec()
+    self._glob_potential.set(0)
+
+    self._local_potential = da.createLocalVec()
+
+    return
+
+def ksp_poisson(self, f=None):
+    """
+    Solves the Poisson Equation -laplacian(phi) = rho on self._da_ksp,
+    using PETSc's KSP(see _create_ksp_poisson), and assigns E = -grad(phi)
+    to the cell centered fields. Unlike fft_poisson, this may be used when
+    run in parallel, and with non-periodic boundaries.
+    """
+    if(self.performance_test_flag == True):
+        tic = af.time()
+
+    if(getattr(self, '_ksp_poisson', None) is None):
+        _create_ksp_poisson(self)
+
+    ((i_q1_start, i_q2_start), (N_q1_local, N_q2_local)) = \
+        get_local_corners(self._da_ksp)
+
+    N_g_q1, N_g_q2           = get_ghost_widths(self)
+    interior_q1, interior_q2 = get_interior_slices(self)
+
+    rho = self.physical_system.params.charge_electron \
+          * self.compute_moments('density', f)[:, interior_q1, interior_q2]
+
+    af.flat(rho).to_ndarray(self._glob_rho.getArray())
+
+    if(self._poisson_nullspace is not None):
+        self._poisson_nullspace.remove(self._glob_rho)
+
+    self._ksp_poisson.solve(self._glob_rho, self._glob_potential)
+
+    # Obtaining the potential including the ghost zones:
+    self._da_ksp.globalToLocal(self._glob_potential, self._local_potential)
+    
+    phi = af.moddims(af.to_array(self._local_potential.getArray()),
+                     N_q1_local + 2 * N_g_q1, N_q2_local + 2 * N_g_q2
+                    )
+
+    # Filling the ghost zones adjacent to the non-periodic edges:
+    bcs  = self._poisson_bcs
+    sign = lambda edge: -1 if bcs[edge] == 'dirichlet' else 1
+
+    if(i_q1_start == 0 and bcs['q1_left'] != 'periodic'):
+        phi[N_g_q1 - 1] = sign('q1_left') * phi[N_g_q1]
+
+    if(i_q1_start + N_q1_local == self.N_q1 and bcs['q1_right'] != 'periodic'):
+        phi[-N_g_q1] = sign('q1_right') * phi[-N_g_q1 - 1]
+
+    # Using central differences for E = -grad(phi):
+    i_q1 = slice(N_g_q1, N_g_q1 + N_q1_local)
+    i_q2 = slice(N_g_q2, N_g_q2 + N_q2_local)
+
+    E1 = - (  phi[N_g_q1 + 1:N_g_q1 + N_q1_local + 1, i_q2]
+            - phi[N_g_q1 - 1:N_g_q1 + N_q1_local - 1, i_q2]
+           ) / (2 * self.dq1)
+
+    self.cell_centered_EM_fields[0, interior_q1, interior_q2] = \
+        af.moddims(E1, 1, N_q1_local, N_q2_local)
+
+    if(self.N_q2 > 1):
+        if(i_q2_start == 0 and bcs['q2_bottom'] != 'periodic'):
+            phi[:, N_g_q2 - 1] = sign('q2_bottom') * phi[:, N_g_q2]
+
+        if(i_q2_start + N_q2_local == self.N_q2 and bcs['q2_top'] != 'periodic'):
+            phi[:, -N_g_q2] = sign('q2_top') * phi[:, -N_g_q2 - 1]
+
+        E2 = - (  phi[i_q1, N_g_q2 + 1:N_g_q2 + N_q2_local + 1]
+                - phi[i_q1, N_g_q2 - 1:N_g_q2 + N_q2_local - 1]
+               ) / (2 * self.dq2)
 
-        self.cell_centered_EM_fields[0, N_g:-N_g, N_g:-N_g] = E1_physical
-        self.cell_centered_EM_fields[1, N_g:-N_g, N_g:-N_g] = E2_physical
+        self.cell_centered_EM_fields[1, interior_q1, interior_q2] = \
+            af.moddims(E2, 1, N_q1_local, N_q2_local)
 
-        af.eval(self.cell_centered_EM_fields)
+    af.eval(self.cell_centered_EM_fields)
 
     if(self.performance_test_flag == True):
         af.sync()
@@ -3,7 +3,7 @@
 
 import arrayfire as af
 
-from .electrostatic import fft_poisson
+from .electrostatic import fft_poisson, ksp_poisson
 from .fdtd_explicit import fdtd, fdtd_grid_to_ck_grid
 from .. import interpolation_routines
 
@@ -17,15 +17,20 @@ def fields_step(self, dt):
         self._communicate_fields()
         self._apply_bcs_fields()
 
+    elif (self.physical_system.params.fields_solver == 'ksp'):
+        ksp_poisson(self)
+        self._communicate_fields()
+        self._apply_bcs_fields()
+
     elif (self.physical_system.params.fields_solver == 'fdtd'):
         # Will return a flattened array containing the values of
         # J1,2,3 in 2D space:
-        self.J1 =   self.physical_system.params.charge_electron \
-                  * self.compute_moments('mom_p1_bulk')  # (i + 1/2, j + 1/2)
-        self.J2 =   self.physical_system.params.charge_electron \
-                  * self.compute_moments('mom_p2_bulk')  # (i + 1/2, j + 1/2)
-        self.J3 =   self.physical_system.params.charge_electron \
-                  * self.compute_moments('mom_p3_bulk')  # (i + 1/2, j + 1/2)
+        J = self.physical_system.params.charge_electron \
+            * self.compute_moments(['mom_p1_bulk', 'mom_p2_bulk', 'mom_p3_bulk'])
+
+        self.J1 = J[0]  # (i + 1/2, j + 1/2)
+        self.J2 = J[1]  # (i + 1/2, j + 1/2)
+        self.J3 = J[2]  # (i + 1/2, j + 1/2)
 
         # Obtaining the values for current density on the Yee-Grid:
         self.J1 = 0.5 * (self.J1 + af.shift(self.J1, 0, 0, 1))  # (i + 1/2, j)
@@ -66,7 +71,11 @@ def fields_step(self, dt):
                                    invalid/not-implemented'
                                  )
 
-    interpolation_routines.f_interp_p_3d(self, dt)
+    if(getattr(self, '_p_advection_method', 'interpolation') == 'shear_rotation'):
+        interpolation_routines.f_interp_p_shear_rotation(self, dt)
+
+    else:
+        interpolation_routines.f_interp_p_3d(self, dt)
     af.eval(self.f)
 
     if(self.performance_test_flag == True):
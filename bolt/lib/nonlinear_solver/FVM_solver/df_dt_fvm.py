@@ -1,9 +1,11 @@
 import arrayfire as af
 
-from bolt.lib.nonlinear_solver.EM_fields_solver.electrostatic import fft_poisson
+from bolt.lib.nonlinear_solver.EM_fields_solver.electrostatic import fft_poisson, \
+                                                                     ksp_poisson
 # Importing Riemann solver used in calculating fluxes:
-from .riemann_solver import riemann_solver
-from .reconstruct import reconstruct
+from .riemann_solver import riemann_flux_difference
+from .reconstruct import reconstruct, reconstruct_batched
+from bolt.lib.nonlinear_solver.utils.ghost_zones import reconstruction_ghost_widths
 
 # Equation to solve:
 # df/dt + d(C_q1 * f)/dq1 + d(C_q2 * f)/dq2 = C[f]
@@ -25,52 +27,98 @@ from .reconstruct import reconstruct
                           #  +  C[f_{i+1/2, j+1/2}]
                           # )
 
-def df_dt_fvm(f, self, at_n = True):
-    
-    multiply = lambda a, b: a * b
+def df_dt_fvm(f, self, at_n = True, fields = None):
+    """
+    Returns df/dt as given by the finite volume discretization. 
 
+    The cell-centered EM fields used in the advection in p-space are
+    taken as cell_centered_EM_fields_at_n when using the FDTD solver
+    with at_n = True, and as cell_centered_EM_fields otherwise. 
+    Alternatively, the fields(E1, E2, E3, B1, B2, B3 stacked along 
+    axis 0) may be passed directly using the argument fields.
+    """
+    df_dt = df_dt_fvm_q(f, self) + df_dt_fvm_local(f, self, at_n, fields)
+
+    af.eval(df_dt)
+    return(df_dt)
+
+def _reconstruct_flux_and_f(self, C_q, f, axis, method_in_q):
+    """
+    Returns the values of the flux C_q * f and of f, reconstructed at the
+    left and right edges of each cell along axis, as the tuples 
+    (flux_plus_eps, flux_minus_eps), (f_plus_eps, f_minus_eps). The values
+    of f are only needed by the Lax-Friedrichs flux. These are returned as
+    (None, None) when using the upwind flux, and aren't reconstructed.
+    """
+    flux = af.broadcast(lambda a, b: a * b, C_q, f)
+
+    if(self.physical_system.params.riemann_solver == 'upwind-flux'):
+        [flux_edges] = reconstruct_batched(self, [flux], axis, method_in_q)
+        f_edges      = (None, None)
+
+    else:
+        # The flux and f are reconstructed together:
+        [flux_edges, f_edges] = reconstruct_batched(self, [flux, f], axis, method_in_q)
+
+    return(flux_edges, f_edges)
+
+def df_dt_fvm_q(f, self):
+    """
+    Returns the contribution of the fluxes along q1 and q2 to df/dt.
+    This needs the ghost zones of f to have been communicated.
+    """
     # Giving shorter name references:
     method_in_q = self.physical_system.params.reconstruction_method_in_q
-    method_in_p = self.physical_system.params.reconstruction_method_in_p
 
     # Variation of q1 is along axis 1
-    left_plus_eps_flux, right_minus_eps_flux = \
-        reconstruct(self, af.broadcast(multiply, self._C_q1, f), 1, method_in_q)
+    ((left_plus_eps_flux, right_minus_eps_flux),
+     (f_left_plus_eps, f_right_minus_eps)
+    ) = _reconstruct_flux_and_f(self, self._C_q1, f, 1, method_in_q)
     
-    # Variation of q2 is along axis 2
-    bot_plus_eps_flux, top_minus_eps_flux = \
-        reconstruct(self, af.broadcast(multiply, self._C_q2, f), 2, method_in_q)
+    # The Riemann solves at the faces are fused with the
+    # flux differences: df_dt = - (F_{i+1} - F_{i}) / dq
+    df_dt = - riemann_flux_difference(self, left_plus_eps_flux, right_minus_eps_flux,
+                                      f_left_plus_eps, f_right_minus_eps, 'q1'
+                                     ) / self.dq1
+
+    # The fluxes along q2 are skipped for domains which 
+    # are degenerate along q2(N_q2 = 1):
+    if(self.N_q2 > 1):
+        # Variation of q2 is along axis 2
+        ((bot_plus_eps_flux, top_minus_eps_flux),
+         (f_bot_plus_eps, f_top_minus_eps)
+        ) = _reconstruct_flux_and_f(self, self._C_q2, f, 2, method_in_q)
+
+        df_dt -= riemann_flux_difference(self, bot_plus_eps_flux, top_minus_eps_flux,
+                                         f_bot_plus_eps, f_top_minus_eps, 'q2'
+                                        ) / self.dq2
 
-    f_left_plus_eps, f_right_minus_eps = reconstruct(self, f, 1, method_in_q)
-    f_bot_plus_eps, f_top_minus_eps    = reconstruct(self, f, 2, method_in_q)
-
-    # f_left_minus_eps of i-th cell is f_right_minus_eps of the (i-1)th cell
-    f_left_minus_eps = af.shift(f_right_minus_eps, 0,  1)
-    # Extending the same to bot:
-    f_bot_minus_eps  = af.shift(f_top_minus_eps,   0,  0, 1)
+    af.eval(df_dt)
+    return(df_dt)
 
-    # Applying the shifts to the fluxes:
-    left_minus_eps_flux = af.shift(right_minus_eps_flux, 0,  1)
-    bot_minus_eps_flux  = af.shift(top_minus_eps_flux,   0,  0,  1)
+def df_dt_fvm_local(f, self, at_n = True, fields = None):
+    """
+    Returns the contribution of the source term, and the fluxes in p-space 
+    to df/dt(see df_dt_fvm for the arguments at_n, fields). These are local
+    in q-space, and so the ghost zones of f aren't needed in the physical 
+    domain. This allows these to be computed while the ghost zones are 
+    being communicated. Returns 0 when there are no such terms.
+    """
+    multiply = lambda a, b: a * b
 
-    left_flux  = riemann_solver(self, left_minus_eps_flux, left_plus_eps_flux,
-                                f_left_minus_eps, f_left_plus_eps, 'q1'
-                               )
+    # Giving shorter name references:
+    method_in_p = self.physical_system.params.reconstruction_method_in_p
 
-    bot_flux   = riemann_solver(self, bot_minus_eps_flux, bot_plus_eps_flux,
-                                f_bot_minus_eps, f_bot_plus_eps, 'q2'
-                               )
+    df_dt = 0
 
-    right_flux = af.shift(left_flux, 0, -1)
-    top_flux   = af.shift(bot_flux,  0,  0, -1)
-    
-    df_dt = - (right_flux - left_flux)/self.dq1 \
-            - (top_flux   - bot_flux )/self.dq2 \
-            + self._source(f, self.q1_center, self.q2_center,
-                           self.p1, self.p2, self.p3, 
-                           self.compute_moments, 
-                           self.physical_system.params, False
-                          ) 
+    # The source term is skipped for collisionless systems. For tau = 0
+    # systems, f is set to f0 after the step has been taken in op_fvm_q:
+    if(self._collision_regime in ['uniform', 'varying']):
+        df_dt += self._source(f, self.q1_center, self.q2_center,
+                              self.p1, self.p2, self.p3, 
+                              self.compute_moments, 
+                              self.physical_system.params, False
+                             ) 
 
     if(    self.physical_system.params.solver_method_in_p == 'FVM' 
        and self.physical_system.params.charge_electron != 0
@@ -81,6 +129,12 @@ def df_dt_fvm(f, self, at_n = True):
             self._communicate_fields()
             self._apply_bcs_fields()
 
+        elif(self.physical_system.params.fields_solver == 'ksp'):
+
+            ksp_poisson(self, f)
+            self._communicate_fields()
+            self._apply_bcs_fields()
+
         # This is taken care of by the timestepper that is utilized
         # when FDTD is to be used with FVM in p-space
         elif(self.physical_system.params.fields_solver == 'fdtd'):
@@ -91,9 +145,19 @@ def df_dt_fvm(f, self, at_n = True):
                                        invalid/not-implemented'
                                      )
 
-        if(    self.physical_system.params.fields_solver == 'fdtd'
-           and at_n == True
-          ):
+        if(fields is not None):
+
+            E1 = fields[0]
+            E2 = fields[1]
+            E3 = fields[2]
+
+            B1 = fields[3]
+            B2 = fields[4]
+            B3 = fields[5]
+
+        elif(    self.physical_system.params.fields_solver == 'fdtd'
+             and at_n == True
+            ):
 
             E1 = self.cell_centered_EM_fields_at_n[0]
             E2 = self.cell_centered_EM_fields_at_n[1]
@@ -131,43 +195,44 @@ def df_dt_fvm(f, self, at_n = True):
                                           self.physical_system.params
                                          )
 
-        # Variation of p1 is along axis 0:
-        left_plus_eps_flux_p1, right_minus_eps_flux_p1 = \
-            reconstruct(self, self._convert_to_p_expanded(af.broadcast(multiply, A_p1, f)), 0, method_in_p)
-        # Variation of p2 is along axis 1:
-        bot_plus_eps_flux_p2, top_minus_eps_flux_p2 = \
-            reconstruct(self, self._convert_to_p_expanded(af.broadcast(multiply, A_p2, f)), 1, method_in_p)
-        # Variation of p3 is along axis 2:
-        back_plus_eps_flux_p3, front_minus_eps_flux_p3 = \
-            reconstruct(self, self._convert_to_p_expanded(af.broadcast(multiply, A_p3, f)), 2, method_in_p)
+        # Variation of p1, p2 and p3 is along axes 0, 1 and 2 respectively
+        # in p_expanded form. The fluxes along degenerate axes of p-space
+        # (N_p = 1) are skipped, since their differences vanish:
+        for axis, (A_p, N_p, dp) in enumerate([(A_p1, self.N_p1, self.dp1),
+                                               (A_p2, self.N_p2, self.dp2),
+                                               (A_p3, self.N_p3, self.dp3)
+                                              ]
+                                             ):
+            if(N_p == 1):
+                continue
 
-        left_minus_eps_flux_p1 = af.shift(right_minus_eps_flux_p1, 1)
-        bot_minus_eps_flux_p2  = af.shift(top_minus_eps_flux_p2,   0, 1)
-        back_minus_eps_flux_p3 = af.shift(front_minus_eps_flux_p3, 0, 0, 1)
+            shift = lambda array, n: af.shift(array, *([0] * axis + [n]))
 
-        # Obtaining the fluxes by face-averaging:
-        left_flux_p1  = 0.5 * (left_minus_eps_flux_p1 + left_plus_eps_flux_p1)
-        bot_flux_p2   = 0.5 * (bot_minus_eps_flux_p2  + bot_plus_eps_flux_p2)
-        back_flux_p3  = 0.5 * (back_minus_eps_flux_p3 + back_plus_eps_flux_p3)
+            flux_p = self._convert_to_p_expanded(af.broadcast(multiply, A_p, f))
 
-        right_flux_p1 = af.shift(left_flux_p1, -1)
-        top_flux_p2   = af.shift(bot_flux_p2,   0, -1)
-        front_flux_p3 = af.shift(back_flux_p3,  0,  0, -1)
+            # When the velocity grid is split along p1, the ghost zones
+            # along p1 are received from the adjacent blocks of p1:
+            N_g_p = 0
+            if(axis == 0 and getattr(self, 'N_p1_procs', 1) > 1):
+                N_g_p  = reconstruction_ghost_widths[method_in_p]
+                flux_p = self._communicate_p1_halo(flux_p, N_g_p)
 
-        left_flux_p1  = self._convert_to_q_expanded(left_flux_p1)
-        right_flux_p1 = self._convert_to_q_expanded(right_flux_p1)
+            left_plus_eps_flux_p, right_minus_eps_flux_p = \
+                reconstruct(self, flux_p, axis, method_in_p)
 
-        bot_flux_p2   = self._convert_to_q_expanded(bot_flux_p2)
-        top_flux_p2   = self._convert_to_q_expanded(top_flux_p2)
+            # Obtaining the fluxes by face-averaging:
+            left_flux_p  = 0.5 * (shift(right_minus_eps_flux_p, 1) + left_plus_eps_flux_p)
+            right_flux_p = shift(left_flux_p, -1)
 
-        back_flux_p3  = self._convert_to_q_expanded(back_flux_p3)
-        front_flux_p3 = self._convert_to_q_expanded(front_flux_p3)
+            flux_difference_p = right_flux_p - left_flux_p
 
-        df_dt += - (right_flux_p1 - left_flux_p1)/self.dp1 \
-                 - (top_flux_p2   - bot_flux_p2 )/self.dp2 \
-                 - (front_flux_p3 - back_flux_p3)/self.dp3
+            if(N_g_p > 0):
+                flux_difference_p = flux_difference_p[N_g_p:-N_g_p]
+
+            df_dt += - self._convert_to_q_expanded(flux_difference_p) / dp
+
+    if(isinstance(df_dt, af.Array)):
+        af.eval(df_dt)
 
-    
-    af.eval(df_dt)
     return(df_dt)
  
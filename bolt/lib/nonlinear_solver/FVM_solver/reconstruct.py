@@ -1,3 +1,5 @@
+import arrayfire as af
+
 from .reconstruction_methods.minmod import reconstruct_minmod
 from .reconstruction_methods.ppm import reconstruct_ppm
 from .reconstruction_methods.weno5 import reconstruct_weno5
@@ -29,3 +31,26 @@ def reconstruct(self, input_array, axis, reconstruction_method):
         self.time_reconstruct += toc - tic
 
     return(left_face_value, right_face_value)
+
+def reconstruct_batched(self, input_arrays, axis, reconstruction_method):
+    """
+    Reconstructs several arrays along the same axis in a single call to
+    the reconstruction method. The arrays(which need to be of the same
+    shape, with at most 3 dimensions) are stacked along axis 3, so that
+    the shifted stencils and the smoothness indicators are computed once
+    for all the arrays.
+
+    Returns a list containing the tuple (left_face_value, right_face_value)
+    for each of the input arrays, in the order passed.
+    """
+    stacked_array = input_arrays[0]
+    for array in input_arrays[1:]:
+        stacked_array = af.join(3, stacked_array, array)
+
+    left_face_value, right_face_value = \
+        reconstruct(self, stacked_array, axis, reconstruction_method)
+
+    return([(left_face_value[:, :, :, i], right_face_value[:, :, :, i])
+            for i in range(len(input_arrays))
+           ]
+          )
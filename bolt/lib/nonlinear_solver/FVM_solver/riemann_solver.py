@@ -1,62 +1,105 @@
 import arrayfire as af
 
-def upwind_flux(left_flux, right_flux, velocity):
-    
-    flux = af.select(velocity > 0, 
-                     left_flux,
-                     right_flux
-                    )
-    
-    af.eval(flux)
-    return(flux)
+def _upwind_mask(self, dim):
+    """
+    Returns the mask(1 where the velocity is positive, 0 otherwise)
+    used by the upwind flux along dim. This retains the shape of 
+    C_q1/C_q2, so that it may be broadcasted onto f instead of
+    being tiled. The masks are cached, and are only recomputed when
+    the arrays C_q1/C_q2 are reassigned.
+    """
+    if(dim == 'q1'):
+        velocity = self._C_q1
+
+    elif(dim == 'q2'):
+        velocity = self._C_q2
+
+    else:
+        raise NotImplementedError('Invalid Option!')
 
-def lax_friedrichs_flux(left_flux, right_flux, left_f, right_f, c_lax):
+    if(getattr(self, '_upwind_masks', None) is None):
+        self._upwind_masks = {}
     
-    flux = 0.5 * (left_flux + right_flux) - 0.5 * c_lax * (right_f - left_f)
+    if(    dim not in self._upwind_masks 
+       or self._upwind_masks[dim][0] is not velocity
+      ):
+        mask = af.cast(velocity > 0, velocity.dtype())
+        af.eval(mask)
+        self._upwind_masks[dim] = (velocity, mask)
+
+    return(self._upwind_masks[dim][1])
+
+def riemann_flux_difference(self, plus_eps_flux, minus_eps_flux, 
+                            f_plus_eps, f_minus_eps, dim
+                           ):
+    """
+    Returns the difference of the numerical fluxes at the right and
+    left faces of each cell along dim: F_{i+1} - F_{i}
+
+    The arguments are the values reconstructed at the left edge(plus_eps)
+    and the right edge(minus_eps) of each cell. The Riemann solve at both
+    the faces and the difference are expressed as a single expression, 
+    which is evaluated as one kernel without forming the face fluxes.
+    """
+    if(self.performance_test_flag == True):    
+        tic = af.time()
 
-    af.eval(flux)
-    return(flux)
+    # Variation of q1 is along axis 1, and that of q2 is along axis 2:
+    if(dim == 'q1'):
+        shift = lambda array, n: af.shift(array, 0, n)
+        axis  = 1
+        dq    = self.dq1
 
+    elif(dim == 'q2'):
+        shift = lambda array, n: af.shift(array, 0, 0, n)
+        axis  = 2
+        dq    = self.dq2
 
-def riemann_solver(self, left_flux, right_flux, left_f, right_f, dim):
+    else:
+        raise NotImplementedError('Invalid Option!')
 
-    if(self.performance_test_flag == True):    
-        tic = af.time()
+    # Values from the neighbouring cells sharing the faces:
+    minus_eps_flux_prev = shift(minus_eps_flux, 1)
+    plus_eps_flux_next  = shift(plus_eps_flux, -1)
 
     if(self.physical_system.params.riemann_solver == 'upwind-flux'):
 
-        if(dim == 'q1'):
-            velocity = af.tile(self._C_q1, 1, left_flux.shape[1], left_flux.shape[2])
-
-        elif(dim == 'q2'):
-            velocity = af.tile(self._C_q2, 1, left_flux.shape[1], left_flux.shape[2])
-
+        # Masks at the left and right faces of each cell:
+        mask = _upwind_mask(self, dim)
+        
+        if(mask.dims()[axis:axis + 1] in [(), (1,)]):
+            mask_next = mask
         else:
-            raise NotImplementedError('Invalid Option!')
+            mask_next = shift(mask, -1)
 
-        flux = upwind_flux(left_flux, right_flux, velocity)
+        flux_difference = \
+            af.broadcast(lambda m, m_next, l, r, l_next, r_next:
+                           (r_next + m_next * (l_next - r_next))
+                         - (r      + m      * (l      - r     )),
+                         mask, mask_next, 
+                         minus_eps_flux_prev, plus_eps_flux,
+                         minus_eps_flux, plus_eps_flux_next
+                        )
 
     elif(self.physical_system.params.riemann_solver == 'lax-friedrichs'):
 
-        if(dim == 'q1'):
-            c_lax = self.dt/self.dq1 
+        c_lax = self.dt / dq
 
-        elif(dim == 'q2'):
-            c_lax = self.dt/self.dq2 
+        flux_difference = \
+              0.5 * (minus_eps_flux + plus_eps_flux_next)     \
+            - 0.5 * (minus_eps_flux_prev + plus_eps_flux)     \
+            - 0.5 * c_lax * (  shift(f_plus_eps, -1) - f_minus_eps
+                             - f_plus_eps + shift(f_minus_eps, 1)
+                            )
 
-        else:
-            raise NotImplementedError('Invalid Option!')
-
-        flux = lax_friedrichs_flux(left_flux, right_flux, left_f, right_f, 
-                                   c_lax
-                                  )
-   
     else:
         raise NotImplementedError('Riemann solver passed is invalid/not-implemented')
 
+    af.eval(flux_difference)
+
     if(self.performance_test_flag == True):
         af.sync()
         toc = af.time()
         self.time_riemann += toc - tic
 
-    return(flux)
+    return(flux_difference)
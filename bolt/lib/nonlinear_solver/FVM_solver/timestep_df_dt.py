@@ -1,71 +1,284 @@
 """
-This file hold the timestepper function which is to 
+This file hold the timestepper functions which are to 
 be used when the FDTD solver is to be used with the 
 finite volume method in p-space.
+
+Apart from the default RK2 method, the strong stability preserving
+methods SSP-RK3 and SSP-RK(10, 4) are provided in their low-storage
+forms, which only need 2 f-sized registers irrespective of the order
+of the method.
 """
 
 import arrayfire as af 
-from .df_dt_fvm import df_dt_fvm
+from .df_dt_fvm import df_dt_fvm_q, df_dt_fvm_local
 from bolt.lib.nonlinear_solver.EM_fields_solver.fdtd_explicit \
     import fdtd, fdtd_grid_to_ck_grid
+from bolt.lib.nonlinear_solver.utils.ghost_zones import get_interior_slices
+
+def _fdtd_coupled(self):
+    return(    self.physical_system.params.charge_electron != 0
+           and self.physical_system.params.fields_solver == 'fdtd'
+          )
+
+def _deep_halo(self):
+    return(getattr(self, '_halo_depth', 1) > 1)
+
+def _use_ghost_zones(self):
+    """
+    Called at the start of each step. In the communication-avoiding 
+    mode(params.halo_depth > 1), the ghost zones are communicated here
+    (when needed) for all the stages of the step, instead of at each stage.
+    """
+    if(_deep_halo(self)):
+        self._use_ghost_zones_f()
+
+    return
+
+def _df_dt_communicated(self, f, at_n = True, fields = None):
+    """
+    Assigns f to self.f, communicates its ghost zones(and applies the
+    boundary conditions), and returns df/dt(see df_dt_fvm). The terms
+    which are local in q-space are computed while the communication 
+    of the ghost zones is in progress. In the communication-avoiding 
+    mode, the ghost zones advanced along with the stages are used.
+    """
+    self.f = f
+    
+    if(_deep_halo(self)):
+        df_dt_local = df_dt_fvm_local(self.f, self, at_n, fields)
+
+    else:
+        self._communicate_f_begin()
+        df_dt_local = df_dt_fvm_local(self.f, self, at_n, fields)
+        self._communicate_f_end()
+    
+    self._apply_bcs_f()
+    
+    df_dt = df_dt_fvm_q(self.f, self) + df_dt_local
+    
+    af.eval(df_dt)
+    return(df_dt)
+
+def _relative_error(self, f, f_reference):
+    """
+    Returns the maximum difference between f and f_reference, normalized
+    by the maximum value of f. Only the local zone is considered, since 
+    the ghost zones hold values which haven't been communicated yet.
+    """
+    interior_q1, interior_q2 = get_interior_slices(self)
+
+    f           = f[:, interior_q1, interior_q2]
+    f_reference = f_reference[:, interior_q1, interior_q2]
+
+    return(af.max(af.abs(f - f_reference)) / af.max(af.abs(f)))
+
+def _advance_fields_fdtd(self, dt):
+    """
+    Advances the EM fields by dt using the FDTD solver. The current
+    density is computed using self.f, which is expected to be at
+    the time-level n+1/2.
+    """
+    # Will return a flattened array containing the values of
+    # J1,2,3 in 2D space:
+    J = self.physical_system.params.charge_electron \
+        * self.compute_moments(['mom_p1_bulk', 'mom_p2_bulk', 'mom_p3_bulk'])
+
+    self.J1 = J[0]  # (i + 1/2, j + 1/2)
+    self.J2 = J[1]  # (i + 1/2, j + 1/2)
+    self.J3 = J[2]  # (i + 1/2, j + 1/2)
+
+    # Obtaining the values for current density on the Yee-Grid:
+    self.J1 = 0.5 * (self.J1 + af.shift(self.J1, 0, 0, 1))  # (i + 1/2, j)
+    self.J2 = 0.5 * (self.J2 + af.shift(self.J2, 0, 1, 0))  # (i, j + 1/2)
+
+    self.J3 = 0.25 * (  self.J3 + af.shift(self.J3, 0, 1, 0) +
+                      + af.shift(self.J3, 0, 0, 1)
+                      + af.shift(self.J3, 0, 1, 1)
+                     )  # (i, j)
+
+    # Here:
+    # cell_centered_EM_fields[:3] is at n
+    # cell_centered_EM_fields[3:] is at n+1/2
+    # cell_centered_EM_fields_at_n_plus_half[3:] is at n-1/2
+
+    self.cell_centered_EM_fields_at_n[:3] = self.cell_centered_EM_fields[:3]
+    self.cell_centered_EM_fields_at_n[3:] = \
+        0.5 * (  self.cell_centered_EM_fields_at_n_plus_half[3:] 
+               + self.cell_centered_EM_fields[3:]
+              )
+
+
+    self.cell_centered_EM_fields_at_n_plus_half[3:] = self.cell_centered_EM_fields[3:]
+
+    fdtd(self, dt)
+    fdtd_grid_to_ck_grid(self)
+
+    # Here
+    # cell_centered_EM_fields[:3] is at n+1
+    # cell_centered_EM_fields[3:] is at n+3/2
+
+    self.cell_centered_EM_fields_at_n_plus_half[:3] = \
+        0.5 * (  self.cell_centered_EM_fields_at_n_plus_half[:3] 
+               + self.cell_centered_EM_fields[:3]
+              )
+    return
 
 def fvm_timestep_RK2(self, dt):
     
+    _use_ghost_zones(self)
+
     f_initial = self.f
-    self.f    = self.f + df_dt_fvm(self.f, self, True) * (dt / 2)
+    f_half    = f_initial + _df_dt_communicated(self, f_initial, True) * (dt / 2)
 
-    self._communicate_f()
-    self._apply_bcs_f()
+    if(_fdtd_coupled(self)):
+        # The current density is computed using f_half, with its
+        # ghost zones communicated:
+        self.f = f_half
+        if(not _deep_halo(self)):
+            self._communicate_f()
+        self._apply_bcs_f()
 
-    if(    self.physical_system.params.charge_electron != 0
-       and self.physical_system.params.fields_solver == 'fdtd'
-      ):
+        _advance_fields_fdtd(self, dt)
         
-        # Will return a flattened array containing the values of
-        # J1,2,3 in 2D space:
-        self.J1 =   self.physical_system.params.charge_electron \
-                  * self.compute_moments('mom_p1_bulk')  # (i + 1/2, j + 1/2)
-        self.J2 =   self.physical_system.params.charge_electron \
-                  * self.compute_moments('mom_p2_bulk')  # (i + 1/2, j + 1/2)
-        self.J3 =   self.physical_system.params.charge_electron \
-                  * self.compute_moments('mom_p3_bulk')  # (i + 1/2, j + 1/2)
-
-        # Obtaining the values for current density on the Yee-Grid:
-        self.J1 = 0.5 * (self.J1 + af.shift(self.J1, 0, 0, 1))  # (i + 1/2, j)
-        self.J2 = 0.5 * (self.J2 + af.shift(self.J2, 0, 1, 0))  # (i, j + 1/2)
-
-        self.J3 = 0.25 * (  self.J3 + af.shift(self.J3, 0, 1, 0) +
-                          + af.shift(self.J3, 0, 0, 1)
-                          + af.shift(self.J3, 0, 1, 1)
-                         )  # (i, j)
-
-        # Here:
-        # cell_centered_EM_fields[:3] is at n
-        # cell_centered_EM_fields[3:] is at n+1/2
-        # cell_centered_EM_fields_at_n_plus_half[3:] is at n-1/2
-
-        self.cell_centered_EM_fields_at_n[:3] = self.cell_centered_EM_fields[:3]
-        self.cell_centered_EM_fields_at_n[3:] = \
-            0.5 * (  self.cell_centered_EM_fields_at_n_plus_half[3:] 
-                   + self.cell_centered_EM_fields[3:]
-                  )
-
-
-        self.cell_centered_EM_fields_at_n_plus_half[3:] = self.cell_centered_EM_fields[3:]
-
-        fdtd(self, dt)
-        fdtd_grid_to_ck_grid(self)
-
-        # Here
-        # cell_centered_EM_fields[:3] is at n+1
-        # cell_centered_EM_fields[3:] is at n+3/2
-
-        self.cell_centered_EM_fields_at_n_plus_half[:3] = \
-            0.5 * (  self.cell_centered_EM_fields_at_n_plus_half[:3] 
-                   + self.cell_centered_EM_fields[:3]
-                  )
-    
-    self.f = f_initial + df_dt_fvm(self.f, self, False) * dt
+        self.f = f_initial + (  df_dt_fvm_q(self.f, self) 
+                              + df_dt_fvm_local(self.f, self, False)
+                             ) * dt
+
+    else:
+        self.f = f_initial + _df_dt_communicated(self, f_half, False) * dt
+
+    # Embedded error estimate used in adaptive time-stepping. This is
+    # the difference between the RK2 solution and the forward Euler 
+    # solution(f_initial + dt * df_dt(f_initial) = 2 * f_half - f_initial),
+    # normalized by the maximum value of f:
+    if(getattr(self, '_estimate_error', False) == True):
+        error = _relative_error(self, self.f, 2 * f_half - f_initial)
+
+        self._error_estimate = max(self._error_estimate, error)
 
     af.eval(self.f)
     return
+
+class _SSPStages(object):
+    """
+    Evaluates df/dt for the stages of the SSP methods. The first
+    stage of both methods is a forward Euler step of size c_1 * dt. 
+    The predictor obtained from it is used to deposit the current at
+    n+1/2 and advance the fields by dt once per timestep. For the
+    later stages, the cell-centered fields are linearly interpolated
+    in time between n and n+1 at the time of the stage.
+    """
+    def __init__(self, solver, dt):
+        self.solver = solver
+        self.dt     = dt
+
+        self.fields_n         = None
+        self.fields_n_plus_1  = None
+
+    def first_stage(self, c_1):
+        solver = self.solver
+        dt     = self.dt
+
+        f_initial = solver.f
+        df_dt     = _df_dt_communicated(solver, f_initial, True)
+        f_stage   = f_initial + c_1 * dt * df_dt
+
+        if(_fdtd_coupled(solver)):
+            solver.f = f_initial + (0.5 * dt) * df_dt
+            if(not _deep_halo(solver)):
+                solver._communicate_f()
+            solver._apply_bcs_f()
+            
+            _advance_fields_fdtd(solver, dt)
+            
+            # (E, B) at n and n+1:
+            self.fields_n        = solver.cell_centered_EM_fields_at_n.copy()
+            self.fields_n_plus_1 = \
+                af.join(0, solver.cell_centered_EM_fields[:3],
+                        0.5 * (  solver.cell_centered_EM_fields_at_n_plus_half[3:]
+                               + solver.cell_centered_EM_fields[3:]
+                              )
+                       )
+
+        # Forward Euler solution over dt used in the error estimate:
+        if(getattr(solver, '_estimate_error', False) == True):
+            self.f_euler = f_initial + dt * df_dt
+
+        return(f_stage)
+
+    def __call__(self, f, c):
+        """
+        Returns dt * df/dt evaluated at (f, t_n + c * dt).
+        """
+        solver = self.solver
+        
+        if(self.fields_n is None):
+            return(self.dt * _df_dt_communicated(solver, f, False))
+
+        fields = (1 - c) * self.fields_n + c * self.fields_n_plus_1
+        return(self.dt * _df_dt_communicated(solver, f, fields = fields))
+
+    def finalize(self, f):
+        solver   = self.solver
+        solver.f = f
+
+        if(getattr(solver, '_estimate_error', False) == True):
+            error = _relative_error(solver, solver.f, self.f_euler)
+
+            solver._error_estimate = max(solver._error_estimate, error)
+            del self.f_euler
+
+        af.eval(solver.f)
+        return
+
+def fvm_timestep_SSPRK3(self, dt):
+    """
+    3-stage, 3rd order SSP method of Shu and Osher in its 
+    low-storage form: only the initial solution and the stage
+    value are held.
+    """
+    _use_ghost_zones(self)
+
+    stage = _SSPStages(self, dt)
+    
+    f_initial = self.f
+    f_stage   = stage.first_stage(1)
+
+    f_stage = 0.75 * f_initial + 0.25 * (f_stage + stage(f_stage, 1))
+    af.eval(f_stage)
+    f_stage = (1 / 3) * f_initial + (2 / 3) * (f_stage + stage(f_stage, 0.5))
+
+    stage.finalize(f_stage)
+    return
+
+def fvm_timestep_SSPRK104(self, dt):
+    """
+    10-stage, 4th order SSP method of Ketcheson(2008) in its 2N
+    low-storage form(registers q1 and q2). This has an SSP 
+    coefficient of 6, allowing a timestep 6 times the forward
+    Euler limit with only 10 evaluations of df/dt.
+    """
+    _use_ghost_zones(self)
+
+    stage = _SSPStages(self, dt)
+
+    q2 = self.f
+    q1 = stage.first_stage(1 / 6)
+    af.eval(q1)
+
+    for i in range(2, 6):
+        q1 = q1 + stage(q1, (i - 1) / 6) / 6
+        af.eval(q1)
+    
+    q2 = (1 / 25) * q2 + (9 / 25) * q1
+    q1 = 15 * q2 - 5 * q1
+    af.eval(q1, q2)
+
+    for i in range(6, 10):
+        q1 = q1 + stage(q1, (i - 4) / 6) / 6
+        af.eval(q1)
+    
+    q1 = q2 + (3 / 5) * q1 + (1 / 10) * stage(q1, 1)
+
+    stage.finalize(q1)
+    return
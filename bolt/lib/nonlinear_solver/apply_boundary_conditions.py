@@ -3,6 +3,8 @@
 
 import arrayfire as af
 
+from .utils.ghost_zones import get_local_corners
+
 def apply_dirichlet_bcs_f(self, boundary):
     
     N_g = self.N_ghost
@@ -76,6 +78,20 @@ def apply_dirichlet_bcs_f(self, boundary):
 
     return
 
+def _flip_p_axis(self, array, axis):
+    """
+    Flips the array which is in q_expanded form along the axis
+    of p_expanded form passed(0 --> p1, 1 --> p2, 2 --> p3).
+    """
+    dims = array.dims()
+    N_q  = array.elements() // (self.N_p1 * self.N_p2 * self.N_p3)
+
+    array = af.flip(af.moddims(array, self.N_p1, self.N_p2, self.N_p3, N_q),
+                    axis
+                   )
+
+    return(af.moddims(array, *dims))
+
 def apply_mirror_bcs_f(self, boundary):
 
     N_g = self.N_ghost
@@ -85,68 +101,56 @@ def apply_mirror_bcs_f(self, boundary):
         #   0   1   2   3   4   5
         # For mirror boundary conditions:
         # 0 = 5; 1 = 4; 2 = 3;
-        self.f[:, :N_g] = af.flip(self.f[:, N_g:2 * N_g], 1)
-        
+
         # The points in the ghost zone need to have direction 
         # of velocity reversed as compared to the physical zones 
         # they are mirroring. To do this we flip the axis that 
-        # contains the variation in p1
+        # contains the variation in p1. Only the ghost zone slab 
+        # is converted to p_expanded form for this:
         self.f[:, :N_g] = \
-            self._convert_to_q_expanded(af.flip(self._convert_to_p_expanded(self.f), 
-                                                0
-                                               )
-                                       )[:, :N_g]
+            _flip_p_axis(self, af.flip(self.f[:, N_g:2 * N_g], 1), 0)
 
     elif(boundary == 'right'):
         # ...-x-0-x-0-x-0-|-0-x-0-x-0-x
         #      -6  -5  -4  -3  -2  -1
         # For mirror boundary conditions:
         # -1 = -6; -2 = -5; -3 = -4;
-        self.f[:, -N_g:] = af.flip(self.f[:, -2 * N_g:-N_g], 1)
 
         # The points in the ghost zone need to have direction 
         # of velocity reversed as compared to the physical zones 
         # they are mirroring. To do this we flip the axis that 
-        # contains the variation in p1
+        # contains the variation in p1. Only the ghost zone slab 
+        # is converted to p_expanded form for this:
         self.f[:, -N_g:] = \
-            self._convert_to_q_expanded(af.flip(self._convert_to_p_expanded(self.f), 
-                                                0
-                                               )
-                                       )[:, -N_g:]
+            _flip_p_axis(self, af.flip(self.f[:, -2 * N_g:-N_g], 1), 0)
 
     elif(boundary == 'bottom'):
         # x-0-x-0-x-0-|-0-x-0-x-0-x-....
         #   0   1   2   3   4   5
         # For mirror boundary conditions:
         # 0 = 5; 1 = 4; 2 = 3;
-        self.f[:, :, :N_g] = af.flip(self.f[:, :, N_g:2 * N_g], 2)
 
         # The points in the ghost zone need to have direction 
         # of velocity reversed as compared to the physical zones 
         # they are mirroring. To do this we flip the axis that 
-        # contains the variation in p2
+        # contains the variation in p2. Only the ghost zone slab 
+        # is converted to p_expanded form for this:
         self.f[:, :, :N_g] = \
-            self._convert_to_q_expanded(af.flip(self._convert_to_p_expanded(self.f), 
-                                                1
-                                               )
-                                       )[:, :, :N_g]
+            _flip_p_axis(self, af.flip(self.f[:, :, N_g:2 * N_g], 2), 1)
 
     elif(boundary == 'top'):
         # ...-x-0-x-0-x-0-|-0-x-0-x-0-x
         #      -6  -5  -4  -3  -2  -1
         # For mirror boundary conditions:
         # -1 = -6; -2 = -5; -3 = -4;
-        self.f[:, :, -N_g:] = af.flip(self.f[:, :, -2 * N_g:-N_g], 2)
 
         # The points in the ghost zone need to have direction 
         # of velocity reversed as compared to the physical zones 
         # they are mirroring. To do this we flip the axis that 
-        # contains the variation in p2
+        # contains the variation in p2. Only the ghost zone slab 
+        # is converted to p_expanded form for this:
         self.f[:, :, -N_g:] = \
-            self._convert_to_q_expanded(af.flip(self._convert_to_p_expanded(self.f), 
-                                                1
-                                               )
-                                       )[:, :, -N_g:]
+            _flip_p_axis(self, af.flip(self.f[:, :, -2 * N_g:-N_g], 2), 1)
 
     else:
         raise Exception('Invalid choice for boundary')
@@ -159,7 +163,8 @@ def apply_bcs_f(self):
 
     # Obtaining start coordinates for the local zone
     # Additionally, we also obtain the size of the local zone
-    ((i_q1_start, i_q2_start), (N_q1_local, N_q2_local)) = self._da_f.getCorners()
+    ((i_q1_start, i_q2_start), (N_q1_local, N_q2_local)) = \
+        get_local_corners(self._da_f)
     # Obtaining the end coordinates for the local zone
     (i_q1_end, i_q2_end) = (i_q1_start + N_q1_local - 1, i_q2_start + N_q2_local - 1)
 
@@ -210,7 +215,9 @@ def apply_bcs_f(self):
             raise NotImplementedError('Unavailable/Invalid boundary condition')
 
     # If local zone includes the bottom physical boundary:
-    if(i_q2_start == 0):
+    # No ghost zones are held along q2 when N_q2 = 1, and the
+    # boundary conditions along q2 need not be applied:
+    if(i_q2_start == 0 and self.N_q2 > 1):
 
         if(self.boundary_conditions.in_q2_bottom == 'dirichlet'):
             apply_dirichlet_bcs_f(self, 'bottom')
@@ -236,7 +243,7 @@ def apply_bcs_f(self):
             raise NotImplementedError('Unavailable/Invalid boundary condition')
 
     # If local zone includes the top physical boundary:
-    if(i_q2_end == self.N_q2 - 1):
+    if(i_q2_end == self.N_q2 - 1 and self.N_q2 > 1):
 
         if(self.boundary_conditions.in_q2_top == 'dirichlet'):
             apply_dirichlet_bcs_f(self, 'top')
@@ -255,6 +262,9 @@ def apply_bcs_f(self):
         else:
             raise NotImplementedError('Unavailable/Invalid boundary condition')
 
+    # The ghost zones of f have been changed in-place:
+    self._f_version = getattr(self, '_f_version', 0) + 1
+
     af.eval(self.f)
 
     if(self.performance_test_flag == True):
@@ -416,7 +426,8 @@ def apply_bcs_fields(self):
 
     # Obtaining start coordinates for the local zone
     # Additionally, we also obtain the size of the local zone
-    ((i_q1_start, i_q2_start), (N_q1_local, N_q2_local)) = self._da_fields.getCorners()
+    ((i_q1_start, i_q2_start), (N_q1_local, N_q2_local)) = \
+        get_local_corners(self._da_fields)
     # Obtaining the end coordinates for the local zone
     (i_q1_end, i_q2_end) = (i_q1_start + N_q1_local - 1, i_q2_start + N_q2_local - 1)
 
@@ -467,7 +478,9 @@ def apply_bcs_fields(self):
             raise NotImplementedError('Unavailable/Invalid boundary condition')
 
     # If local zone includes the bottom physical boundary:
-    if(i_q2_start == 0):
+    # No ghost zones are held along q2 when N_q2 = 1, and the
+    # boundary conditions along q2 need not be applied:
+    if(i_q2_start == 0 and self.N_q2 > 1):
 
         if(self.boundary_conditions.in_q2_bottom == 'dirichlet'):
             apply_dirichlet_bcs_fields(self, 'bottom')
@@ -493,7 +506,7 @@ def apply_bcs_fields(self):
             raise NotImplementedError('Unavailable/Invalid boundary condition')
 
     # If local zone includes the top physical boundary:
-    if(i_q2_end == self.N_q2 - 1):
+    if(i_q2_end == self.N_q2 - 1 and self.N_q2 > 1):
 
         if(self.boundary_conditions.in_q2_top == 'dirichlet'):
             apply_dirichlet_bcs_fields(self, 'top')
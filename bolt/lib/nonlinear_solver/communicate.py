@@ -1,51 +1,208 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import numpy as np
 import arrayfire as af
+from petsc4py import PETSc
 
-def communicate_f(self):
+from .utils.ghost_zones import get_local_corners, get_ghost_widths, \
+                               get_interior_slices
+from .utils.shared_memory import shares_host_memory, place_af_array, \
+                                 reset_af_array
+
+def _create_ghost_scatter_f(self):
     """
-    Used in communicating the values at the boundary zones
-    for each of the local vectors among all procs.
-    This routine is called to take care of communication
-    (and periodic B.C's) procedures for the distribution
-    function array.
+    Creates the scatter which fills only the ghost zones of the local
+    zone from the global vector of f. The ghost zones are gathered into
+    the sequential vector self._ghost_f, and self._ghost_f_indices
+    holds the positions of its elements in af.flat(self.f).
+
+    The ghost zones at the physical boundaries which aren't periodic 
+    aren't mapped to any zone of the global vector, and are left out.
+    These are filled by the application of the boundary conditions.
+    """
+    ((i_q1_start, i_q2_start), (N_q1_local, N_q2_local)) = \
+        get_local_corners(self._da_f)
+
+    N_g_q1, N_g_q2 = get_ghost_widths(self)
+    dof            = self._da_f.getDof()
+
+    i_q1, i_q2 = np.meshgrid(np.arange(N_q1_local + 2 * N_g_q1),
+                             np.arange(N_q2_local + 2 * N_g_q2),
+                             indexing = 'ij'
+                            )
+
+    is_ghost = (   (i_q1 <  N_g_q1) | (i_q1 >= N_q1_local + N_g_q1)
+                 | (i_q2 <  N_g_q2) | (i_q2 >= N_q2_local + N_g_q2)
+               )
+
+    # Indices of the ghost zones in the local vector(q1 varies fastest),
+    # and of the zones they are mapped to in the global vector:
+    local_zones  = (i_q1 + (N_q1_local + 2 * N_g_q1) * i_q2)[is_ghost]
+    local_zones  = local_zones.astype(PETSc.IntType)
+    global_zones = self._da_f.getLGMap().applyBlock(local_zones)
+
+    # Zones which aren't mapped are flagged by -1:
+    local_zones  = local_zones[global_zones >= 0]
+    global_zones = global_zones[global_zones >= 0]
+
+    self._ghost_f       = PETSc.Vec().createSeq(dof * local_zones.size,
+                                                comm = PETSc.COMM_SELF
+                                               )
+    self._ghost_f_array = self._ghost_f.getArray()
+
+    self._scatter_ghost_f = \
+        PETSc.Scatter().create(self._glob_f, 
+                               PETSc.IS().createBlock(dof, global_zones,
+                                                      comm = PETSc.COMM_SELF
+                                                     ),
+                               self._ghost_f, None
+                              )
+
+    self._ghost_f_indices = \
+        af.to_array((local_zones[:, None] * dof + np.arange(dof)).ravel())
+
+    return
+
+def communicate_f_begin(self):
+    """
+    Begins the communication of the values at the boundary zones
+    for each of the local vectors among all procs(including periodic
+    B.C's) for the distribution function array. The communication
+    is completed by communicate_f_end(). In between, computations
+    which only use the values in the physical domain of the local zone
+    may be carried out, while the communication is in progress.
+
+    Only the strips of width N_ghost along the edges of the local zone
+    are copied to the global vector, since these are the only zones 
+    which are read by the ghost zones of the neighbouring local zones.
     """
     if(self.performance_test_flag == True):
         tic = af.time()
 
-    # Obtaining start coordinates for the local zone
-    # Additionally, we also obtain the size of the local zone
-    ((i_q1_start, i_q2_start), (N_q1_local, N_q2_local)) = self._da_f.getCorners()
+    ((i_q1_start, i_q2_start), (N_q1_local, N_q2_local)) = \
+        get_local_corners(self._da_f)
 
-    N_g = self.N_ghost
+    N_g_q1, N_g_q2           = get_ghost_widths(self)
+    interior_q1, interior_q2 = get_interior_slices(self)
 
-    # Assigning the local array only when Dirichlet
-    # boundary conditions are applied. This is needed since
-    # only inflowing characteristics are to be changed by 
-    # the apply boundary conditions function.
+    if(getattr(self, '_scatter_ghost_f', None) is None):
+        _create_ghost_scatter_f(self)
 
-    if(   self.boundary_conditions.in_q1_left   == 'dirichlet'
-       or self.boundary_conditions.in_q1_right  == 'dirichlet' 
-       or self.boundary_conditions.in_q2_bottom == 'dirichlet' 
-       or self.boundary_conditions.in_q2_top    == 'dirichlet' 
-      ):
-        af.flat(self.f).to_ndarray(self._local_f_array)
+    # On the CPU backend, the PETSc.Vecs are backed by af.Arrays, 
+    # which are held until communicate_f_end():
+    self._glob_f_buffer  = None
+    self._ghost_f_buffer = None
 
     # Global value is non-inclusive of the ghost-zones:
-    af.flat(self.f[:, N_g:-N_g, N_g:-N_g]).to_ndarray(self._glob_f_array)
+    if(N_q1_local <= 2 * N_g_q1 or N_q2_local <= 2 * N_g_q2):
+        if(shares_host_memory()):
+            self._glob_f_buffer = \
+                place_af_array(self._glob_f, 
+                               af.flat(self.f[:, interior_q1, interior_q2])
+                              )
+        else:
+            af.flat(self.f[:, interior_q1, interior_q2]).to_ndarray(self._glob_f_array)
+
+    else:
+        # View of the global array in the layout (dof, N_q1, N_q2):
+        glob_f = self._glob_f_array.reshape((self._da_f.getDof(), 
+                                             N_q1_local, N_q2_local
+                                            ), 
+                                            order = 'F'
+                                           )
+
+        def pack(glob_f_strip, f_strip):
+            glob_f_strip[:] = af.flat(f_strip).to_ndarray().reshape(glob_f_strip.shape,
+                                                                    order = 'F'
+                                                                   )
+
+        # Strips along the left and right edges:
+        pack(glob_f[:, :N_g_q1], 
+             self.f[:, N_g_q1:2 * N_g_q1, interior_q2]
+            )
+        pack(glob_f[:, -N_g_q1:], 
+             self.f[:, N_q1_local:N_q1_local + N_g_q1, interior_q2]
+            )
+
+        # Strips along the bottom and top edges, without the corners:
+        if(N_g_q2 > 0):
+            pack(glob_f[:, N_g_q1:-N_g_q1, :N_g_q2],
+                 self.f[:, 2 * N_g_q1:N_q1_local, N_g_q2:2 * N_g_q2]
+                )
+            pack(glob_f[:, N_g_q1:-N_g_q1, -N_g_q2:],
+                 self.f[:, 2 * N_g_q1:N_q1_local, N_q2_local:N_q2_local + N_g_q2]
+                )
+
+    if(shares_host_memory()):
+        self._ghost_f_buffer = \
+            place_af_array(self._ghost_f, 
+                           af.constant(0, self._ghost_f.getSize(), 
+                                       dtype = af.Dtype.f64
+                                      )
+                          )
+
+    # This scatter takes care of interzonal communications. Additionally,
+    # it also automatically applies periodic BCs when necessary:
+    self._scatter_ghost_f.begin(self._glob_f, self._ghost_f, 
+                                PETSc.InsertMode.INSERT_VALUES,
+                                PETSc.ScatterMode.FORWARD
+                               )
+
+    if(self.performance_test_flag == True):
+        af.sync()
+        toc = af.time()
+        self.time_communicate_f += toc - tic
+
+    return
+
+def communicate_f_end(self):
+    """
+    Completes the communication started by communicate_f_begin(),
+    and assigns the values received to the ghost zones of self.f.
+    The ghost zones at the physical boundaries which aren't periodic
+    are left unchanged.
+    """
+    if(self.performance_test_flag == True):
+        # Computations overlapped with the communication are
+        # completed, so that these aren't timed here:
+        af.sync()
+        tic = af.time()
+
+    self._scatter_ghost_f.end(self._glob_f, self._ghost_f, 
+                              PETSc.InsertMode.INSERT_VALUES,
+                              PETSc.ScatterMode.FORWARD
+                             )
+
+    # Obtaining start coordinates for the local zone
+    # Additionally, we also obtain the size of the local zone
+    ((i_q1_start, i_q2_start), (N_q1_local, N_q2_local)) = \
+        get_local_corners(self._da_f)
 
-    # The following function takes care of interzonal communications
-    # Additionally, it also automatically applies periodic BCs when necessary
-    self._da_f.globalToLocal(self._glob_f, self._local_f)
+    N_g_q1, N_g_q2 = get_ghost_widths(self)
 
     # Converting back from PETSc.Vec to af.Array:
-    f_flattened = af.to_array(self._local_f_array)
-    self.f      = af.moddims(f_flattened,
-                             self.N_p1 * self.N_p2 * self.N_p3,
-                             N_q1_local + 2 * N_g,
-                             N_q2_local + 2 * N_g
-                            )
+    if(self._ghost_f_buffer is not None):
+        reset_af_array(self._ghost_f, self._ghost_f_buffer)
+        f_ghost = self._ghost_f_buffer
+
+    else:
+        f_ghost = af.to_array(self._ghost_f_array)
+
+    if(self._glob_f_buffer is not None):
+        reset_af_array(self._glob_f, self._glob_f_buffer)
+
+    self._glob_f_buffer  = None
+    self._ghost_f_buffer = None
+
+    f_flattened = af.flat(self.f)
+    f_flattened[self._ghost_f_indices] = f_ghost
+    
+    self.f = af.moddims(f_flattened,
+                        self.N_p1 * self.N_p2 * self.N_p3,
+                        N_q1_local + 2 * N_g_q1,
+                        N_q2_local + 2 * N_g_q2
+                       )
 
     af.eval(self.f)
 
@@ -56,6 +213,35 @@ def communicate_f(self):
 
     return
 
+def communicate_f(self):
+    """
+    Used in communicating the values at the boundary zones
+    for each of the local vectors among all procs.
+    This routine is called to take care of communication
+    (and periodic B.C's) procedures for the distribution
+    function array.
+    """
+    communicate_f_begin(self)
+    communicate_f_end(self)
+    return
+
+def use_ghost_zones_f(self):
+    """
+    Used in the communication-avoiding mode(params.halo_depth > 1), 
+    before taking a step which uses up _N_ghost_step ghost zones of f.
+    The ghost zones of f are communicated only when fewer than these
+    are still valid. Returns True when the ghost zones were communicated.
+    """
+    communicated = False
+
+    if(self._valid_ghost_width < self._N_ghost_step):
+        communicate_f(self)
+        self._valid_ghost_width = self.N_ghost
+        communicated            = True
+
+    self._valid_ghost_width -= self._N_ghost_step
+    return(communicated)
+
 
 def communicate_fields(self, on_fdtd_grid = False):
     """
@@ -73,44 +259,53 @@ def communicate_fields(self, on_fdtd_grid = False):
 
     # Obtaining start coordinates for the local zone
     # Additionally, we also obtain the size of the local zone
-    ((i_q1_start, i_q2_start), (N_q1_local, N_q2_local)) = self._da_fields.getCorners()
+    ((i_q1_start, i_q2_start), (N_q1_local, N_q2_local)) = \
+        get_local_corners(self._da_fields)
 
-    N_g = self.N_ghost
-
-    # Assigning the values of the af.Array 
-    # fields quantities to the PETSc.Vec:
+    N_g_q1, N_g_q2           = get_ghost_widths(self)
+    interior_q1, interior_q2 = get_interior_slices(self)
 
     if(on_fdtd_grid is True):
-        flattened_global_EM_fields_array = \
-            af.flat(self.yee_grid_EM_fields[:, N_g:-N_g, N_g:-N_g])
-        flattened_global_EM_fields_array.to_ndarray(self._glob_fields_array)
+        fields = self.yee_grid_EM_fields
+    else:
+        fields = self.cell_centered_EM_fields
+
+    if(shares_host_memory()):
+        # The PETSc.Vecs are backed by the af.Arrays. The local vector
+        # is backed by a copy of the fields, so that the ghost zones
+        # at the boundaries which aren't periodic are left unchanged:
+        glob_fields  = place_af_array(self._glob_fields, 
+                                      af.flat(fields[:, interior_q1, interior_q2])
+                                     )
+        local_fields = place_af_array(self._local_fields, fields.copy())
+
+        # Takes care of boundary conditions and interzonal communications:
+        self._da_fields.globalToLocal(self._glob_fields, self._local_fields)
+
+        reset_af_array(self._glob_fields, glob_fields)
+        reset_af_array(self._local_fields, local_fields)
 
     else:
-        flattened_global_EM_fields_array = \
-            af.flat(self.cell_centered_EM_fields[:, N_g:-N_g, N_g:-N_g])
-        flattened_global_EM_fields_array.to_ndarray(self._glob_fields_array)
+        # Assigning the values of the af.Array 
+        # fields quantities to the PETSc.Vec:
+        af.flat(fields[:, interior_q1, interior_q2]).to_ndarray(self._glob_fields_array)
+
+        # Takes care of boundary conditions and interzonal communications:
+        self._da_fields.globalToLocal(self._glob_fields, self._local_fields)
 
-    # Takes care of boundary conditions and interzonal communications:
-    self._da_fields.globalToLocal(self._glob_fields, self._local_fields)
+        local_fields = af.to_array(self._local_fields_array)
 
     # Converting back to af.Array
-    if(on_fdtd_grid is True):
+    fields = af.moddims(local_fields, 6, N_q1_local + 2 * N_g_q1,
+                        N_q2_local + 2 * N_g_q2
+                       )
+    af.eval(fields)
 
-        self.yee_grid_EM_fields = af.moddims(af.to_array(self._local_fields_array),
-                                             6, N_q1_local + 2 * N_g,
-                                             N_q2_local + 2 * N_g
-                                            )
-        
-        af.eval(self.yee_grid_EM_fields)
+    if(on_fdtd_grid is True):
+        self.yee_grid_EM_fields = fields
 
     else:
-
-        self.cell_centered_EM_fields = af.moddims(af.to_array(self._local_fields_array),
-                                                  6, N_q1_local + 2 * N_g,
-                                                  N_q2_local + 2 * N_g
-                                                 )
-        
-        af.eval(self.cell_centered_EM_fields)
+        self.cell_centered_EM_fields = fields
     
     if(self.performance_test_flag == True):
         af.sync()
@@ -118,3 +313,46 @@ def communicate_fields(self, on_fdtd_grid = False):
         self.time_communicate_fields += toc - tic
 
     return
+
+def communicate_p1_halo(self, array, N_g):
+    """
+    Used when the velocity grid is split along p1 among the ranks of 
+    self._comm_p. Returns the array(in p_expanded form) padded along p1
+    with N_g ghost zones on either side, which are received from the ranks
+    holding the adjacent blocks of p1. The blocks are taken to be periodic
+    along p1, consistent with the shifts used in computing the fluxes in 
+    p-space when the velocity grid isn't split.
+    """
+    if(self.performance_test_flag == True):
+        tic = af.time()
+
+    comm = self._comm_p
+    dims = [array.dims()[i] if i < array.numdims() else 1 for i in range(4)]
+
+    rank_left  = (comm.rank - 1) % comm.size
+    rank_right = (comm.rank + 1) % comm.size
+
+    send_left  = af.flat(array[:N_g]).to_ndarray()
+    send_right = af.flat(array[-N_g:]).to_ndarray()
+
+    recv_left  = np.empty_like(send_left)
+    recv_right = np.empty_like(send_right)
+
+    # The zones at the left edge are the ghost zones to the right 
+    # of the block on the left, and vice versa:
+    comm.Sendrecv(send_left, rank_left, recvbuf = recv_right, source = rank_right)
+    comm.Sendrecv(send_right, rank_right, recvbuf = recv_left, source = rank_left)
+
+    ghost_zones = lambda buffer: af.moddims(af.to_array(buffer), 
+                                            N_g, dims[1], dims[2], dims[3]
+                                           )
+
+    array = af.join(0, ghost_zones(recv_left), array, ghost_zones(recv_right))
+    af.eval(array)
+
+    if(self.performance_test_flag == True):
+        af.sync()
+        toc = af.time()
+        self.time_communicate_f += toc - tic
+
+    return(array)
@@ -4,6 +4,70 @@
 import arrayfire as af
 import numpy as np
 
+def _moment_variable(self, moment_name):
+    """
+    Returns the polynomial in (p1, p2, p3) by which the distribution 
+    function is weighted when computing the moment moment_name.
+    """
+    try:
+        moment_exponents = \
+            np.array(self.physical_system.moment_exponents[moment_name])
+        moment_coeffs    = \
+            np.array(self.physical_system.moment_coeffs[moment_name])
+
+    except BaseException:
+        raise KeyError('moment_name not defined under physical system')
+
+    try:
+        moment_variable = 1
+        for i in range(moment_exponents.shape[0]):
+            moment_variable *=   moment_coeffs[i, 0] \
+                               * self.p1**(moment_exponents[i, 0]) \
+                               + moment_coeffs[i, 1] \
+                               * self.p2**(moment_exponents[i, 1]) \
+                               + moment_coeffs[i, 2] \
+                               * self.p3**(moment_exponents[i, 2])
+
+    except BaseException:
+        moment_variable =   moment_coeffs[0] * self.p1**(moment_exponents[0]) \
+                          + moment_coeffs[1] * self.p2**(moment_exponents[1]) \
+                          + moment_coeffs[2] * self.p3**(moment_exponents[2])
+
+    return(moment_variable)
+
+def _moment_weights(self, moment_names):
+    """
+    Returns the weight matrix of shape (len(moment_names), N_p1 * N_p2 * N_p3)
+    whose rows are the moment variables for moment_names, with the volume
+    element dp1 * dp2 * dp3 folded in. Since the velocity grid is not 
+    changed during the evolution, these matrices are cached.
+    """
+    cache = getattr(self, '_moment_weights_cache', None)
+
+    if(cache is None):
+        cache = self._moment_weights_cache = {}
+
+    if(moment_names not in cache):
+        N_p = self.p1.elements()
+
+        for i in range(len(moment_names)):
+            # Adding 0 * p1 ensures that constant moment variables
+            # are also expanded to an array of shape (N_p, 1, 1):
+            row = af.moddims(  (_moment_variable(self, moment_names[i]) + 0 * self.p1)
+                             * self.dp3 * self.dp2 * self.dp1,
+                             1, N_p
+                            )
+
+            if(i == 0):
+                weights = row
+            else:
+                weights = af.join(0, weights, row)
+
+        af.eval(weights)
+        cache[moment_names] = weights
+
+    return(cache[moment_names])
+
 def compute_moments(self, moment_name, f=None):
     """
     Used in computing the moments of the distribution function.
@@ -13,11 +77,14 @@ def compute_moments(self, moment_name, f=None):
     Parameters
     ----------
 
-    moments_name : str
+    moments_name : str/list/tuple
                    Pass the moment name which needs to be computed.
                    It must be noted that this needs to be defined by the
                    user under moment_defs under src and passed to the 
-                   physical_system object.
+                   physical_system object. When a list of moment names
+                   is passed, all the moments are computed together in 
+                   a single reduction over the velocity axis, and are 
+                   returned stacked along axis 0 in the order passed.
     
     f: af.Array
        Pass this argument as well when you want to compute the 
@@ -32,44 +99,79 @@ def compute_moments(self, moment_name, f=None):
     The above line will lookup the definition for 'density' under the dict
     moments_exponents, and moments_coefficients and calculate the same
     accordingly
+
+    >> moments = solver.compute_moments(['density', 'energy'])
+
+    Here moments[0] contains the density, and moments[1] the energy.
     """
-    try:
-        moment_exponents = \
-            np.array(self.physical_system.moment_exponents[moment_name])
-        moment_coeffs    = \
-            np.array(self.physical_system.moment_coeffs[moment_name])
+    if(f is None):
+        f = self.f
 
-    except BaseException:
-        raise KeyError('moment_name not defined under physical system')
+    if(isinstance(moment_name, str)):
+        moment_names = (moment_name,)
+    else:
+        moment_names = tuple(moment_name)
 
-    try:
-        moment_variable = 1
-        for i in range(moment_exponents.shape[0]):
-            moment_variable *=   moment_coeffs[i, 0] \
-                               * self.p1**(moment_exponents[i, 0]) \
-                               + moment_coeffs[i, 1] \
-                               * self.p2**(moment_exponents[i, 1]) \
-                               + moment_coeffs[i, 2] \
-                               * self.p3**(moment_exponents[i, 2])
+    # Solvers which track the version of the state self.f(see the property f
+    # of nonlinear_solver) make use of a cache of the moments. On a cache miss,
+    # all the moments defined under physical_system are computed in a single
+    # pass over f. Repeated requests for moments of the same f are then served
+    # from the cache, until f is changed:
+    f_version = getattr(self, '_f_version', None)
 
-    except BaseException:
-        moment_variable =   moment_coeffs[0] * self.p1**(moment_exponents[0]) \
-                          + moment_coeffs[1] * self.p2**(moment_exponents[1]) \
-                          + moment_coeffs[2] * self.p3**(moment_exponents[2])
+    if(f_version is not None):
+        all_names = tuple(self.physical_system.moment_exponents)
+        cache     = getattr(self, '_moments_cache', None)
 
-    # Defining a lambda function to perform broadcasting operations
-    # This is done using af.broadcast, which allows us to perform 
-    # batched operations when operating on arrays of different sizes
-    multiply = lambda a, b:a*b
+        if(cache is None or cache[0] is not f or cache[1] != f_version):
+            cache = self._moments_cache = \
+                (f, f_version, _batched_moments(self, all_names, f))
 
-    # af.broadcast(function, *args) performs batched operations on
-    # function(*args)
-    if(f is None):
-        moment   =   af.sum(af.broadcast(multiply, self.f, moment_variable), 0) \
-                   * self.dp3 * self.dp2 * self.dp1
-    else:
-        moment   =   af.sum(af.broadcast(multiply, f, moment_variable), 0) \
-                   * self.dp3 * self.dp2 * self.dp1
+        try:
+            indices = [all_names.index(name) for name in moment_names]
+        except ValueError:
+            raise KeyError('moment_name not defined under physical system')
+
+        if(len(indices) == 1):
+            return(cache[2][indices[0]])
+
+        else:
+            return(af.lookup(cache[2], 
+                             af.to_array(np.array(indices, dtype = np.int32)),
+                             0
+                            )
+                  )
+
+    return(_batched_moments(self, moment_names, f))
+
+def _batched_moments(self, moment_names, f):
+    """
+    Returns the moments of f for all the moment names in the tuple
+    moment_names, stacked along axis 0. These are obtained from a single
+    matrix multiplication of the weight matrix with f.
+    """
+    weights = _moment_weights(self, moment_names)
+
+    # Flattening f to (N_p, N_q1 * N_q2), so that all the moments are 
+    # obtained from a single matrix multiplication:
+    N_p  = f.dims()[0]
+    N_q1 = f.dims()[1] if f.numdims() > 1 else 1
+    N_q2 = f.dims()[2] if f.numdims() > 2 else 1
+
+    moments = af.matmul(weights, af.moddims(f, N_p, N_q1 * N_q2))
+
+    # When the velocity grid is split among the ranks of self._comm_p,
+    # the contributions of the blocks of the velocity grid are summed:
+    comm_p = getattr(self, '_comm_p', None)
+    
+    if(comm_p is not None and comm_p.size > 1):
+        moments_local = af.flat(moments).to_ndarray()
+        moments_sum   = np.zeros_like(moments_local)
+
+        comm_p.Allreduce(moments_local, moments_sum)
+        moments = af.to_array(moments_sum)
+
+    moments = af.moddims(moments, len(moment_names), N_q1, N_q2)
 
-    af.eval(moment)
-    return (moment)
+    af.eval(moments)
+    return(moments)
@@ -5,6 +5,11 @@ from petsc4py import PETSc
 import numpy as np
 import arrayfire as af
 
+from bolt.lib.nonlinear_solver.utils.ghost_zones import get_interior_slices
+from bolt.lib.nonlinear_solver.utils.shared_memory import shares_host_memory, \
+                                                         place_af_array, \
+                                                         reset_af_array
+
 def dump_moments(self, file_name):
     """
     This function is used to dump variables to a file for later usage.
@@ -45,17 +50,17 @@ def dump_moments(self, file_name):
     
     >> h5f.close()
     """
-    N_g = self.N_ghost
-
-    i = 0
-    for key in self.physical_system.moment_exponents:
-        if(i == 0):
-            array_to_dump = self.compute_moments(key)[:, N_g:-N_g,N_g:-N_g]
-        else:
-            array_to_dump = af.join(0, array_to_dump,
-                                    self.compute_moments(key)[:, N_g:-N_g,N_g:-N_g]
-                                   )
-        i += 1
+    interior_q1, interior_q2 = get_interior_slices(self)
+
+    # All the moments are computed together, stacked along axis 0:
+    array_to_dump = \
+        self.compute_moments(list(self.physical_system.moment_exponents))
+    array_to_dump = array_to_dump[:, interior_q1, interior_q2]
+
+    # When the velocity grid is split along p1, the moments are the
+    # same for all the blocks of p1, and are dumped from the first:
+    if(getattr(self, '_comm_p', None) is not None and self._comm_p.rank != 0):
+        return
 
     af.flat(array_to_dump).to_ndarray(self._glob_moments_array)
     PETSc.Object.setName(self._glob_moments, 'moments')
@@ -99,11 +104,26 @@ def dump_distribution_function(self, file_name):
     
     >> h5f.close()
     """
-    N_g = self.N_ghost
+    interior_q1, interior_q2 = get_interior_slices(self)
     
-    af.flat(self.f[:, N_g:-N_g, N_g:-N_g]).to_ndarray(self._glob_f_array)
-    PETSc.Object.setName(self._glob_f, 'distribution_function')
+    PETSc.Object.setName(self._glob_dump_f, 'distribution_function')
+    # When the velocity grid is split along p1, each block of p1
+    # is dumped to a file of its own:
+    if(getattr(self, 'N_p1_procs', 1) > 1):
+        file_name += '_p1_block_' + str(self._comm_p.rank)
+
     viewer = PETSc.Viewer().createHDF5(file_name + '.h5', 'w', comm=self._comm)
-    viewer(self._glob_f)
+
+    # On the CPU backend, the data is written directly from the af.Array:
+    if(shares_host_memory()):
+        f_dump = place_af_array(self._glob_dump_f, 
+                                af.flat(self.f[:, interior_q1, interior_q2])
+                               )
+        viewer(self._glob_dump_f)
+        reset_af_array(self._glob_dump_f, f_dump)
+
+    else:
+        af.flat(self.f[:, interior_q1, interior_q2]).to_ndarray(self._glob_dump_f_array)
+        viewer(self._glob_dump_f)
 
     return
@@ -5,6 +5,11 @@ from petsc4py import PETSc
 import numpy as np
 import arrayfire as af
 
+from bolt.lib.nonlinear_solver.utils.ghost_zones import get_interior_slices
+from bolt.lib.nonlinear_solver.utils.shared_memory import shares_host_memory, \
+                                                         place_af_array, \
+                                                         reset_af_array
+
 def load_distribution_function(self, file_name):
     """
     This function is used to load the distribution function from the
@@ -24,16 +29,40 @@ def load_distribution_function(self, file_name):
     The above statemant will load the distribution function data stored in the file
     distribution_function.h5 into self.f
     """
+    # When the velocity grid is split along p1, each block of p1
+    # is loaded from the file dumped for it:
+    if(getattr(self, 'N_p1_procs', 1) > 1):
+        file_name += '_p1_block_' + str(self._comm_p.rank)
+
     viewer = PETSc.Viewer().createHDF5(file_name + '.h5', 
                                        PETSc.Viewer.Mode.READ, 
                                        comm=self._comm
                                       )
-    self._glob_f.load(viewer)
 
-    N_g = self.N_ghost
-    self.f[:, N_g:-N_g, N_g:-N_g] = af.moddims(af.to_array(self._glob_f_array),
-                                               self.N_p1 * self.N_p2 * self.N_p3,
-                                               self.N_q1, self.N_q2
-                                              )
+    # On the CPU backend, the data is read directly into an af.Array:
+    if(shares_host_memory()):
+        f_loaded = place_af_array(self._glob_dump_f,
+                                  af.constant(0, self._glob_dump_f.getLocalSize(),
+                                              dtype = af.Dtype.f64
+                                             )
+                                 )
+        self._glob_dump_f.load(viewer)
+        reset_af_array(self._glob_dump_f, f_loaded)
+
+    else:
+        self._glob_dump_f.load(viewer)
+        f_loaded = af.to_array(self._glob_dump_f_array)
+
+    interior_q1, interior_q2 = get_interior_slices(self)
+    self.f[:, interior_q1, interior_q2] = \
+        af.moddims(f_loaded,
+                   self.N_p1 * self.N_p2 * self.N_p3,
+                   self.N_q1, self.N_q2
+                  )
+    # The values of f have been changed in-place:
+    self._f_version = getattr(self, '_f_version', 0) + 1
+
+    # The ghost zones are no longer valid(see halo_depth):
+    self._valid_ghost_width = 0
 
     return
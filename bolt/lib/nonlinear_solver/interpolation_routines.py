@@ -3,11 +3,45 @@
 
 import arrayfire as af
 import numpy as np
+from numpy.fft import fftfreq
 
-def f_interp_2d(self, dt):
-    
-    if(self.performance_test_flag == True):
-        tic = af.time()
+from .utils.ghost_zones import get_local_corners, get_ghost_widths, \
+                               get_interior_slices
+
+def _departure_indices_q(self, dt):
+    """
+    Returns the departure points of the characteristics in q-space,
+    expressed in terms of the (fractional) indices of the local 
+    zone-centered grid. These are of shape (N_q1, N_q2, dof) so that
+    they can be passed directly to af.approx2 without the coordinate
+    arrays xp, yp. The result is cached, and only recomputed when dt 
+    or the advection terms change. When the domain is degenerate along
+    q2(N_q2 = 1), the departure indices along q2 are returned as None.
+    """
+    cache = getattr(self, '_departure_indices_q_cache', None)
+
+    if(    cache is not None
+       and cache[0] == dt
+       and cache[1] is self._A_q1
+       and cache[2] is self._A_q2
+      ):
+        return(cache[3], cache[4])
+
+    # The stencil of the spline interpolation about the departure point
+    # needs to lie within the ghost zones which are valid for the step.
+    # This limits the displacement in zones(CFL number) to N_ghost - 1:
+    max_abs = lambda a: af.max(af.abs(a)) if isinstance(a, af.Array) else abs(a)
+    N_g     = getattr(self, '_N_ghost_step', self.N_ghost)
+    CFL_max = max_abs(self._A_q1) * abs(dt) / self.dq1
+
+    if(self.N_q2 > 1):
+        CFL_max = max(CFL_max, max_abs(self._A_q2) * abs(dt) / self.dq2)
+
+    if(CFL_max > N_g - 1):
+        raise Exception('The CFL number in q-space(' + str(CFL_max) + ') '
+                        'exceeds N_ghost - 1 = ' + str(N_g - 1) + '. '
+                        'Increase N_ghost, or decrease the time-step'
+                       )
 
     # Defining a lambda function to perform broadcasting operations
     # This is done using af.broadcast, which allows us to perform 
@@ -17,21 +51,248 @@ def f_interp_2d(self, dt):
     # af.broadcast(function, *args) performs batched operations on
     # function(*args)
     q1_center_new = af.broadcast(addition, self.q1_center, - self._A_q1 * dt)
-    q2_center_new = af.broadcast(addition, self.q2_center, - self._A_q2 * dt)
+
+    # Converting to index space of the local grid(including ghost zones):
+    q1_index_new = (q1_center_new - af.min(self.q1_center)) / self.dq1
 
     # Reordering from (dof, N_q1, N_q2) --> (N_q1, N_q2, dof)
-    self.f = af.approx2(af.reorder(self.f, 1, 2, 0),
-                        af.reorder(q1_center_new, 1, 2, 0),
-                        af.reorder(q2_center_new, 1, 2, 0),
-                        af.INTERP.BICUBIC_SPLINE, 
-                        xp = af.reorder(self.q1_center, 1, 2, 0),
-                        yp = af.reorder(self.q2_center, 1, 2, 0)
-                       )
+    q1_index_new = af.reorder(q1_index_new, 1, 2, 0)
+    af.eval(q1_index_new)
+
+    if(self.N_q2 == 1):
+        q2_index_new = None
+
+    else:
+        q2_center_new = af.broadcast(addition, self.q2_center, - self._A_q2 * dt)
+        q2_index_new  = (q2_center_new - af.min(self.q2_center)) / self.dq2
+        q2_index_new  = af.reorder(q2_index_new, 1, 2, 0)
+        af.eval(q2_index_new)
+
+    self._departure_indices_q_cache = (dt, self._A_q1, self._A_q2,
+                                       q1_index_new, q2_index_new
+                                      )
+    return(q1_index_new, q2_index_new)
+
+def _interpolate_q(self, f, q1_index, q2_index):
+    """
+    Interpolates f(in the layout (N_q1, N_q2, dof)) at the positions
+    given in index space. Since the departure points are given in 
+    index space, approx2 is called without the coordinate arrays xp, yp.
+    """
+    if(self.N_q2 == 1):
+        # Only the advection along q1 is performed for domains 
+        # which are degenerate along q2:
+        return(af.approx1(f, q1_index, af.INTERP.CUBIC_SPLINE))
+
+    else:
+        return(af.approx2(f, q1_index, q2_index, af.INTERP.BICUBIC_SPLINE))
+
+def f_interp_2d(self, dt):
+    
+    if(self.performance_test_flag == True):
+        tic = af.time()
+
+    q1_index_new, q2_index_new = _departure_indices_q(self, dt)
+
+    # Using the layout (N_q1, N_q2, dof). The state is left in this
+    # layout, and is only transposed back when required.
+    f = _interpolate_q(self, self._get_f_in_layout('q_interp'),
+                       q1_index_new, q2_index_new
+                      )
+
+    af.eval(f)
+    self._set_f_in_layout(f, 'q_interp')
+
+    if(self.performance_test_flag == True):
+        af.sync()
+        toc = af.time()
+        self.time_interp2 += toc - tic
+
+    return
+
+def f_interp_2d_overlapped(self, dt):
+    """
+    Performs the same advection in q-space as f_interp_2d, while also
+    communicating the ghost zones of f(and applying the boundary 
+    conditions). The zones which are at least N_ghost zones away 
+    from the edges of the physical domain of the local zone only use
+    the values in the physical domain, and are interpolated while the 
+    communication of the ghost zones is in progress. The remaining strips
+    (which include the ghost zones) are interpolated after the 
+    communication is completed.
+    """
+    ((i_q1_start, i_q2_start), (N_q1_local, N_q2_local)) = \
+        get_local_corners(self._da_f)
+
+    N_g_q1, N_g_q2 = get_ghost_widths(self)
+
+    # In the communication-avoiding mode(params.halo_depth > 1), the 
+    # ghost zones are only communicated once every halo_depth steps:
+    if(getattr(self, '_halo_depth', 1) > 1):
+        self._use_ghost_zones_f()
+        self._apply_bcs_f()
+        f_interp_2d(self, dt)
+        return
+
+    # Falling back to the blocking communication when the local 
+    # zone is too small to contain such zones:
+    if(N_q1_local <= 2 * N_g_q1 or N_q2_local <= 2 * N_g_q2):
+        self._communicate_f()
+        self._apply_bcs_f()
+        f_interp_2d(self, dt)
+        return
+
+    self._communicate_f_begin()
+
+    if(self.performance_test_flag == True):
+        tic = af.time()
+
+    q1_index_new, q2_index_new = _departure_indices_q(self, dt)
+
+    # Interpolates at the zones selected by the slices along q1 and q2:
+    def interpolate_zones(f, slice_q1, slice_q2, offset_q1 = 0, offset_q2 = 0):
+        q1_index = q1_index_new[slice_q1, slice_q2] - offset_q1
+
+        if(q2_index_new is None):
+            q2_index = None
+        else:
+            q2_index = q2_index_new[slice_q1, slice_q2] - offset_q2
+
+        return(_interpolate_q(self, f, q1_index, q2_index))
+
+    # Zones which only depend on the values in the physical domain. The
+    # departure points are offset to be in the index space of the 
+    # physical domain, which is used in the layout (N_q1, N_q2, dof):
+    interior_q1, interior_q2 = get_interior_slices(self)
+    inner_q1,    inner_q2    = slice(2 * N_g_q1, N_q1_local), slice(2 * N_g_q2, N_q2_local)
+
+    f_physical = af.reorder(self.f[:, interior_q1, interior_q2], 1, 2, 0)
+    f_inner    = interpolate_zones(f_physical, inner_q1, inner_q2, N_g_q1, N_g_q2)
+
+    # Not waiting on the completion of f_inner:
+    af.eval(f_inner)
+
+    if(self.performance_test_flag == True):
+        toc = af.time()
+        self.time_interp2 += toc - tic
+
+    self._communicate_f_end()
+    self._apply_bcs_f()
+
+    if(self.performance_test_flag == True):
+        tic = af.time()
+
+    f = self._get_f_in_layout('q_interp')
+
+    # Strips along the edges, including the ghost zones:
+    f_left  = interpolate_zones(f, slice(0, 2 * N_g_q1), slice(None))
+    f_right = interpolate_zones(f, slice(N_q1_local, None), slice(None))
+
+    if(N_g_q2 > 0):
+        f_bottom = interpolate_zones(f, inner_q1, slice(0, 2 * N_g_q2))
+        f_top    = interpolate_zones(f, inner_q1, slice(N_q2_local, None))
+        f_inner  = af.join(1, f_bottom, f_inner, f_top)
+
+    f = af.join(0, f_left, f_inner, f_right)
+
+    af.eval(f)
+    self._set_f_in_layout(f, 'q_interp')
+
+    if(self.performance_test_flag == True):
+        af.sync()
+        toc = af.time()
+        self.time_interp2 += toc - tic
+
+    return
+
+def _fft_phase_shift_q(self, dt):
+    """
+    Returns the factors exp(-i k_q1 A_q1 dt) and exp(-i k_q2 A_q2 dt) 
+    which are used in performing the advection in q-space as a phase
+    shift in Fourier space. These are of shape (N_q1, 1, dof) and 
+    (1, N_q2, dof) respectively. The factors are cached, and only 
+    recomputed when dt or the advection terms change.
+    """
+    cache = getattr(self, '_fft_phase_shift_q_cache', None)
+
+    if(    cache is not None
+       and cache[0] == dt
+       and cache[1] is self._A_q1
+       and cache[2] is self._A_q2
+      ):
+        return(cache[3], cache[4])
 
-    # Reordering from (N_q1, N_q2, dof) --> (dof, N_q1, N_q2)
-    self.f = af.reorder(self.f, 2, 0, 1)
+    k_q1 = af.to_array(fftfreq(self.N_q1, self.dq1))
+    k_q2 = af.reorder(af.to_array(fftfreq(self.N_q2, self.dq2)), 1, 0)
 
-    af.eval(self.f)
+    A_q1 = self._A_q1
+    A_q2 = self._A_q2
+
+    # Reordering from (dof, 1, 1) --> (1, 1, dof)
+    if(isinstance(A_q1, af.Array)):
+        A_q1 = af.reorder(A_q1, 1, 2, 0)
+
+    if(isinstance(A_q2, af.Array)):
+        A_q2 = af.reorder(A_q2, 1, 2, 0)
+
+    multiply = lambda a, b:a * b
+
+    phase_q1 = af.exp(-1j * 2 * np.pi * dt * af.broadcast(multiply, k_q1, A_q1))
+    phase_q2 = af.exp(-1j * 2 * np.pi * dt * af.broadcast(multiply, k_q2, A_q2))
+
+    af.eval(phase_q1, phase_q2)
+    self._fft_phase_shift_q_cache = (dt, self._A_q1, self._A_q2,
+                                     phase_q1, phase_q2
+                                    )
+    return(phase_q1, phase_q2)
+
+def f_interp_2d_fft(self, dt):
+    """
+    Performs the advection in q-space exactly by applying a phase shift
+    to the Fourier transform of the distribution function:
+
+    f(q1 - A_q1 * dt, q2 - A_q2 * dt) = IFFT(FFT(f) * exp(-i k.A_q dt))
+
+    This is only valid when A_q is independent of q, and the system is 
+    periodic along q1 and q2 with the complete domain being held locally.
+    Since only the values in the physical domain are used, the ghost zones
+    need not be communicated prior to calling this function. The ghost 
+    zones are filled by periodic wrapping of the result.
+    """
+    if(self.performance_test_flag == True):
+        tic = af.time()
+
+    N_g_q1, N_g_q2           = get_ghost_widths(self)
+    interior_q1, interior_q2 = get_interior_slices(self)
+
+    phase_q1, phase_q2 = _fft_phase_shift_q(self, dt)
+
+    # Using the layout (N_q1, N_q2, dof). The state is left in this
+    # layout, and is only transposed back when required.
+    f = self._get_f_in_layout('q_interp')[interior_q1, interior_q2]
+
+    # af.fft, af.fft2 are batched over the dof axis. Only the shift
+    # along q1 is applied for domains which are degenerate along q2:
+    if(self.N_q2 == 1):
+        multiply = lambda a, b:a * b
+        f        = af.real(af.ifft(af.broadcast(multiply, af.fft(f), phase_q1)))
+
+    else:
+        multiply = lambda a, b, c:a * b * c
+        f        = af.real(af.ifft2(af.broadcast(multiply, af.fft2(f), 
+                                                 phase_q1, phase_q2
+                                                )
+                                   )
+                          )
+
+    # Filling the ghost zones:
+    f = af.join(0, f[-N_g_q1:], f, f[:N_g_q1])
+
+    if(N_g_q2 > 0):
+        f = af.join(1, f[:, -N_g_q2:], f, f[:, :N_g_q2])
+
+    af.eval(f)
+    self._set_f_in_layout(f, 'q_interp')
 
     if(self.performance_test_flag == True):
         af.sync()
@@ -69,67 +330,205 @@ def f_interp_p_3d(self, dt):
                                       self.physical_system.params
                                      )
     
-    # Defining a lambda function to perform broadcasting operations
-    # This is done using af.broadcast, which allows us to perform 
-    # batched operations when operating on arrays of different sizes
-    addition = lambda a,b:a + b
-    
+    # The interpolants(departure points in index space, going from 
+    # [0, N_p - 1]) are obtained directly from the advection terms, 
+    # without first forming the departure points p_new. This allows 
+    # the JIT compiler of ArrayFire to fuse the computation of each 
+    # interpolant into a single kernel:
+    interpolant = lambda p, A_p, p_start, dp, dt:(p - dt * A_p - p_start) / dp - 0.5
+
     # af.broadcast(function, *args) performs batched operations on
     # function(*args)
-    p1_new = af.broadcast(addition, self.p1, - dt * A_p1)
-    p2_new = af.broadcast(addition, self.p2, - dt * A_p2)
+    p1_interpolant = af.broadcast(interpolant, self.p1, A_p1, 
+                                  self.p1_start, self.dp1, dt
+                                 )
+    p1_interpolant = self._convert_to_p_expanded(p1_interpolant)
 
-    p1_new = self._convert_to_p_expanded(p1_new)
-    p2_new = self._convert_to_p_expanded(p2_new)
+    # The interpolations along degenerate axes of p-space(N_p = 1)
+    # are skipped:
+    interpolate_p2 = (self.N_p2 > 1)
+    interpolate_p3 = (self.physical_system.params.p_dim == 3 and self.N_p3 > 1)
 
-    # Transforming interpolant to go from [0, N_p - 1]:
-    p1_lower_boundary = self.p1_start + 0.5 * self.dp1
-    p2_lower_boundary = self.p2_start + 0.5 * self.dp2
-
-    p1_interpolant = (p1_new - p1_lower_boundary) / self.dp1
-    p2_interpolant = (p2_new - p2_lower_boundary) / self.dp2
+    if(interpolate_p2):
+        p2_interpolant = af.broadcast(interpolant, self.p2, A_p2, 
+                                      self.p2_start, self.dp2, dt
+                                     )
+        p2_interpolant = self._convert_to_p_expanded(p2_interpolant)
 
-    if(self.physical_system.params.p_dim == 3):        
+    if(interpolate_p3):        
         
-        p3_new = af.broadcast(addition, self.p3, - 0.5 * dt * A_p3)
-        p3_new = self._convert_to_p_expanded(p3_new)
-        p3_lower_boundary = self.p3_start + 0.5 * self.dp3
+        p3_interpolant = af.broadcast(interpolant, self.p3, A_p3, 
+                                      self.p3_start, self.dp3, 0.5 * dt
+                                     )
+
         # Reordering p3_interpolant to bring variation in p3 to the 0-th axis:
-        p3_interpolant = af.reorder((p3_new - p3_lower_boundary) / self.dp3, 2, 0, 1)
+        p3_interpolant = af.reorder(self._convert_to_p_expanded(p3_interpolant), 
+                                    2, 0, 1
+                                   )
 
     # We perform the 3d interpolation by performing
-    # individual 1d + 2d interpolations. Reordering to bring the
-    # variation in values along axis 0 and axis 1
+    # individual 1d + 2d interpolations. The p3-interpolations are
+    # performed in the layout (N_p3, N_p1, N_p2, N_q), and the 
+    # (p1, p2)-interpolation in the layout (N_p1, N_p2, N_p3, N_q).
+    # The state is left in the last layout used, and is only 
+    # transposed back when required.
+    if(interpolate_p3):
+        
+        f = af.approx1(self._get_f_in_layout('p3_first'),
+                       p3_interpolant, 
+                       af.INTERP.CUBIC_SPLINE
+                      )
+        self._set_f_in_layout(f, 'p3_first')
+
+    if(interpolate_p2):
+        f = af.approx2(self._get_f_in_layout('p_expanded'),
+                       p1_interpolant,
+                       p2_interpolant,
+                       af.INTERP.BICUBIC_SPLINE
+                      )
 
-    self.f = self._convert_to_p_expanded(self.f)
+    else:
+        f = af.approx1(self._get_f_in_layout('p_expanded'),
+                       p1_interpolant,
+                       af.INTERP.CUBIC_SPLINE
+                      )
 
-    if(self.physical_system.params.p_dim == 3):
+    self._set_f_in_layout(f, 'p_expanded')
 
+    if(interpolate_p3):
         
-        self.f = af.approx1(af.reorder(self.f, 2, 0, 1),
-                            p3_interpolant, 
-                            af.INTERP.CUBIC_SPLINE
-                           )
+        f = af.approx1(self._get_f_in_layout('p3_first'),
+                       p3_interpolant, 
+                       af.INTERP.CUBIC_SPLINE
+                      )
+        self._set_f_in_layout(f, 'p3_first')
 
-        self.f = af.reorder(self.f, 1, 2, 0)
+    af.eval(f)
 
-    self.f = af.approx2(self.f,
-                        p1_interpolant,
-                        p2_interpolant,
-                        af.INTERP.BICUBIC_SPLINE
-                       )
+    if(self.performance_test_flag == True):
+        af.sync()
+        toc = af.time()
+        self.time_interp3 += toc - tic
 
-    if(self.physical_system.params.p_dim == 3):
-        
-        self.f = af.approx1(af.reorder(self.f, 2, 0, 1),
-                            p3_interpolant, 
-                            af.INTERP.CUBIC_SPLINE
-                           )
+    return
+
+def _advect_p_axis(self, axis, displacement):
+    """
+    Performs the 1D interpolation f(p_axis - displacement) along the
+    axis(0 --> p1, 1 --> p2, 2 --> p3) of p-space. displacement is 
+    passed in q_expanded form, and may vary along p and q.
+    """
+    p, p_start, dp = [(self.p1, self.p1_start, self.dp1),
+                      (self.p2, self.p2_start, self.dp2),
+                      (self.p3, self.p3_start, self.dp3)
+                     ][axis]
+
+    # Layout in which the variation along axis is held along axis 0:
+    layout = ['p_expanded', 'p2_first', 'p3_first'][axis]
+
+    # Transforming interpolant to go from [0, N_p - 1]:
+    interpolant = lambda p, d:(p - d - p_start) / dp - 0.5
+    interpolant = af.broadcast(interpolant, p, displacement)
+
+    # Expanding to the shape of f, when displacement only varies along p:
+    if(interpolant.dims()[0] == interpolant.elements()):
+        interpolant = af.broadcast(lambda a, b:a + 0 * b, interpolant, self.q1_center)
+
+    interpolant = self._convert_layout(interpolant, 'q_expanded', layout)
+
+    f = af.approx1(self._get_f_in_layout(layout), interpolant,
+                   af.INTERP.CUBIC_SPLINE
+                  )
+
+    self._set_f_in_layout(f, layout)
+    return
+
+def _rotate_p_plane(self, axis_x, axis_y, theta):
+    """
+    Rotates the distribution function by the angle theta(which may vary 
+    along q) in the (p_x, p_y) plane of p-space, such that 
+    f(p) --> f(R(-theta) p). This is performed exactly using the 
+    decomposition of the rotation into 3 shears, each of which is a 1D 
+    interpolation:
+
+    R(theta) = S_x(-tan(theta/2)) S_y(sin(theta)) S_x(-tan(theta/2))
+
+    The rotation is split into substeps of angle at most pi/2, since
+    tan(theta/2) diverges as theta --> pi.
+    """
+    p = [self.p1, self.p2, self.p3]
+
+    N_substeps = int(np.ceil(af.max(af.abs(theta)) / (np.pi / 2)))
+
+    if(N_substeps == 0):
+        return
+
+    theta = theta / N_substeps
+    
+    a = -af.tan(0.5 * theta)
+    b =  af.sin(theta)
+    
+    multiply = lambda a, b:a * b
+
+    for i in range(N_substeps):
+        _advect_p_axis(self, axis_x, af.broadcast(multiply, a, p[axis_y]))
+        _advect_p_axis(self, axis_y, af.broadcast(multiply, b, p[axis_x]))
+        _advect_p_axis(self, axis_x, af.broadcast(multiply, a, p[axis_y]))
+
+    return
+
+def f_interp_p_shear_rotation(self, dt):
+    """
+    Performs the advection in p-space for the Lorentz force
+    A_p = (q/m) * (E + p X B), by splitting it into:
+
+    - The acceleration due to E, which is a shift along each axis of 
+      p-space, and is performed through 1D interpolations.
+    - The gyration due to B, which is a rigid rotation of p-space. This 
+      is performed exactly through 1D shears(see _rotate_p_plane), and 
+      so is not limited by the gyro-angle per step.
+
+    These are combined as shift(dt/2) rotation(dt) shift(dt/2). For 
+    p_dim = 3, the rotation about B is split into rotations in the planes
+    perpendicular to each axis, combined through strang splitting. For 
+    p_dim = 2, only the rotation in the (p1, p2) plane due to B3 is 
+    considered.
+    """
+    if(self.performance_test_flag == True):
+        tic = af.time()
+
+    q_by_m = (  self.physical_system.params.charge_electron 
+              / self.physical_system.params.mass_particle
+             )
+    p_dim = self.physical_system.params.p_dim
+
+    E = [self.cell_centered_EM_fields_at_n[i] for i in range(3)]
+    B = [self.cell_centered_EM_fields_at_n[i] for i in range(3, 6)]
+
+    def shift_by_E(dt):
+        for axis in range(p_dim):
+            _advect_p_axis(self, axis, q_by_m * E[axis] * dt)
+
+    # Angle of rotation in the planes perpendicular to B1, B2, B3:
+    # For instance, dp1/dt = (q/m) p2 * B3, dp2/dt = -(q/m) p1 * B3
+    # is a rotation by -(q/m) * B3 * dt in the (p1, p2) plane
+    theta = lambda B, dt:-q_by_m * B * dt
+
+    shift_by_E(0.5 * dt)
+
+    if(p_dim == 3):
+        _rotate_p_plane(self, 1, 2, theta(B[0], 0.5 * dt))
+        _rotate_p_plane(self, 2, 0, theta(B[1], 0.5 * dt))
+        _rotate_p_plane(self, 0, 1, theta(B[2], dt))
+        _rotate_p_plane(self, 2, 0, theta(B[1], 0.5 * dt))
+        _rotate_p_plane(self, 1, 2, theta(B[0], 0.5 * dt))
+
+    else:
+        _rotate_p_plane(self, 0, 1, theta(B[2], dt))
 
-        self.f = af.reorder(self.f, 1, 2, 0)
+    shift_by_E(0.5 * dt)
 
-    self.f = self._convert_to_q_expanded(self.f)
-    af.eval(self.f)
+    af.eval(self._f)
 
     if(self.performance_test_flag == True):
         af.sync()
@@ -52,8 +52,13 @@ from .file_io import load
 from .utils.bandwidth_test import bandwidth_test
 from .utils.print_with_indent import indent
 from .utils.performance_timings import print_table
+from .utils.ghost_zones import get_local_corners, get_ghost_widths, \
+                               get_interior_slices, get_minimum_ghost_width, \
+                               get_halo_bytes, get_exchange_bytes, \
+                               choose_process_grid, get_ghost_width_per_step, \
+                               fvm_integrator_stages, reconstruction_ghost_widths
 from .compute_moments import compute_moments as compute_moments_imported
-from .EM_fields_solver.electrostatic import fft_poisson
+from .EM_fields_solver.electrostatic import fft_poisson, ksp_poisson
 
 class nonlinear_solver(object):
     """
@@ -111,20 +116,115 @@ class nonlinear_solver(object):
         self.N_p3, self.dp3 = physical_system.N_p3, physical_system.dp3
 
         # Getting number of ghost zones, and the boundary 
-        # conditions that are utilized:
-        N_g = self.N_ghost       = physical_system.N_ghost
+        # conditions that are utilized. When N_ghost is set to 'auto',
+        # the minimum number of ghost zones needed by the chosen methods
+        # is used. Otherwise, the value passed overrides the same:
+        N_ghost_minimum = get_minimum_ghost_width(physical_system.params)
+        
+        if(physical_system.N_ghost == 'auto'):
+            N_g = self.N_ghost = N_ghost_minimum
+
+        else:
+            N_g = self.N_ghost = physical_system.N_ghost
+
+            if(N_g < N_ghost_minimum):
+                raise Exception('N_ghost needs to be at least ' + str(N_ghost_minimum) +
+                                ' for the methods chosen'
+                               )
+
+        # Communication-avoiding mode(optional parameter halo_depth = k):
+        # The ghost zones are held k times as deep as needed by a single
+        # step(by all the stages of a step for the FVM), so that these need
+        # to be communicated only once every k steps. In between, the steps
+        # also advance the ghost zones(redundantly), and the depth of the 
+        # ghost zones which are valid(_valid_ghost_width) shrinks by 
+        # _N_ghost_step with every step:
+        self._halo_depth = getattr(physical_system.params, 'halo_depth', 1)
+
+        if(not isinstance(self._halo_depth, int) or self._halo_depth < 1):
+            raise Exception('halo_depth needs to be a positive integer')
+
+        self._N_ghost_step      = N_g
+        self._valid_ghost_width = 0
+
+        if(self._halo_depth > 1):
+            self._N_ghost_step = get_ghost_width_per_step(physical_system.params, N_g)
+            N_g = self.N_ghost = self._halo_depth * self._N_ghost_step
+
         self.boundary_conditions = physical_system.boundary_conditions
+
+        # When the domain is degenerate along q2(N_q2 = 1), as for 1D
+        # problems, 1D DMDAs are used so that no ghost zones are held 
+        # along q2. The operators along q2 are then skipped:
+        self.N_ghost_q2 = 0 if (self.N_q2 == 1) else N_g
         
-        # Declaring the communicator:
-        self._comm = PETSc.COMM_WORLD.tompi4py()
+        # Declaring the communicators. The velocity grid may optionally 
+        # be split along p1 among N_p1_procs ranks. The ranks which hold
+        # the same block of p1 form self._comm, over which q-space is
+        # decomposed using the DMDAs. The ranks which hold the same local
+        # zone of q-space form self._comm_p, over which the moments are 
+        # reduced, and the ghost zones along p1 are communicated:
+        self._comm_world = PETSc.COMM_WORLD.tompi4py()
+        self.N_p1_procs  = getattr(physical_system.params, 'N_p1_procs', 1)
+
+        # The mirror boundary conditions along q1 reverse p1. The mirror of
+        # the block of p1 held is then held by another rank of _comm_p:
+        if(    self.N_p1_procs > 1
+           and any(bc in ['mirror', 'mirror+dirichlet'] 
+                   for bc in [self.boundary_conditions.in_q1_left,
+                              self.boundary_conditions.in_q1_right
+                             ]
+                  )
+          ):
+            raise NotImplementedError('Splitting the velocity grid is not implemented '
+                                      'with mirror boundary conditions along q1'
+                                     )
+
+        if(   self._comm_world.size % self.N_p1_procs != 0
+           or self.N_p1 % self.N_p1_procs != 0
+          ):
+            raise Exception('N_p1_procs needs to divide both the number of ranks, and N_p1')
+
+        if(    self.N_p1_procs > 1 
+           and physical_system.params.solver_method_in_p != 'FVM'
+          ):
+            raise NotImplementedError('Splitting the velocity grid is only '
+                                      'implemented for FVM in p-space'
+                                     )
+
+        # Each block of p1 needs to hold the ghost zones along p1 which
+        # are sent to the adjacent blocks(see communicate_p1_halo):
+        if(self.N_p1_procs > 1):
+            N_g_p1 = reconstruction_ghost_widths.\
+                     get(physical_system.params.reconstruction_method_in_p)
+
+            if(N_g_p1 is None):
+                raise NotImplementedError('Reconstruction method invalid/not-implemented')
+
+            if(self.N_p1 // self.N_p1_procs < N_g_p1):
+                raise Exception('N_p1 // N_p1_procs needs to be at least ' + str(N_g_p1) +
+                                ' for the reconstruction method used in p-space'
+                               )
+
+        rank_p       = self._comm_world.rank % self.N_p1_procs
+        self._comm   = self._comm_world.Split(rank_p, self._comm_world.rank)
+        self._comm_p = self._comm_world.Split(self._comm_world.rank // self.N_p1_procs,
+                                              rank_p
+                                             )
+
+        # Holding the local block of p1. From here on, N_p1, p1_start
+        # and p1_end refer to the local block:
+        self.N_p1     = self.N_p1 // self.N_p1_procs
+        self.p1_start = self.p1_start + rank_p * self.N_p1 * self.dp1
+        self.p1_end   = self.p1_start + self.N_p1 * self.dp1
 
         if(self.physical_system.params.num_devices>1):
-            af.set_device(self._comm.rank%self.physical_system.params.num_devices)
+            af.set_device(self._comm_world.rank%self.physical_system.params.num_devices)
 
         PETSc.Sys.Print('\nBackend Details for Nonlinear Solver:')
 
         # Printing the backend details for each rank/device/node:
-        PETSc.Sys.syncPrint(indent('Rank ' + str(self._comm.rank) + ' of ' + str(self._comm.size-1)))
+        PETSc.Sys.syncPrint(indent('Rank ' + str(self._comm_world.rank) + ' of ' + str(self._comm_world.size-1)))
         PETSc.Sys.syncPrint(indent('On Node: '+ socket.gethostname()))
         PETSc.Sys.syncPrint(indent('Device Details:'))
         PETSc.Sys.syncPrint(indent(af.info_str(), 2))
@@ -175,18 +275,52 @@ class nonlinear_solver(object):
         # how the grid is partitioned when run in parallel which is 
         # utilized by the various methods of the solver.
 
-        self._da_f = PETSc.DMDA().create([self.N_q1, self.N_q2],
+        # The process grid is chosen so as to minimize the volume of the
+        # ghost zones of f which are exchanged, unless it is passed as 
+        # params.proc_sizes = (N_procs_q1, N_procs_q2):
+        exchange_arguments = (self.N_q1, self.N_q2, N_g, self.N_ghost_q2,
+                              self.N_p1 * self.N_p2 * self.N_p3,
+                              petsc_bc_in_q1 == 'periodic',
+                              petsc_bc_in_q2 == 'periodic'
+                             )
+
+        proc_sizes = getattr(physical_system.params, 'proc_sizes', None)
+
+        if(proc_sizes is None):
+            proc_sizes = choose_process_grid(self._comm.size, *exchange_arguments)
+
+        else:
+            proc_sizes = tuple(proc_sizes)
+
+            if(   len(proc_sizes) != 2 
+               or proc_sizes[0] * proc_sizes[1] != self._comm.size
+               or (self.N_q2 == 1 and proc_sizes[1] != 1)
+              ):
+                raise Exception('proc_sizes needs to be (N_procs_q1, N_procs_q2), where '
+                                'N_procs_q1 * N_procs_q2 is the number of ranks '
+                                'over which q-space is split(N_procs_q2 = 1 when N_q2 = 1)'
+                               )
+
+        self._proc_sizes = proc_sizes
+
+        if(self.N_q2 == 1):
+            da_sizes         = [self.N_q1]
+            da_boundary_type = (petsc_bc_in_q1, )
+            da_proc_sizes    = (proc_sizes[0], )
+
+        else:
+            da_sizes         = [self.N_q1, self.N_q2]
+            da_boundary_type = (petsc_bc_in_q1, petsc_bc_in_q2)
+            da_proc_sizes    = proc_sizes
+
+        self._da_f = PETSc.DMDA().create(da_sizes,
                                          dof           = (  self.N_p1 
                                                           * self.N_p2 
                                                           * self.N_p3
                                                          ),
                                          stencil_width = self.N_ghost,
-                                         boundary_type = (petsc_bc_in_q1,
-                                                          petsc_bc_in_q2
-                                                         ),
-                                         proc_sizes    = (PETSc.DECIDE, 
-                                                          PETSc.DECIDE
-                                                         ),
+                                         boundary_type = da_boundary_type,
+                                         proc_sizes    = da_proc_sizes,
                                          stencil_type  = 1,
                                          comm          = self._comm
                                         )
@@ -195,15 +329,11 @@ class nonlinear_solver(object):
         # EM field quantities. A DOF of 6 is taken so that the communications,
         # and application of B.C's may be carried out in a single call among
         # all the field quantities(E1, E2, E3, B1, B2, B3)
-        self._da_fields = PETSc.DMDA().create([self.N_q1, self.N_q2],
+        self._da_fields = PETSc.DMDA().create(da_sizes,
                                               dof           = 6,
                                               stencil_width = self.N_ghost,
-                                              boundary_type = (petsc_bc_in_q1,
-                                                               petsc_bc_in_q2
-                                                              ),
-                                              proc_sizes    = (PETSc.DECIDE,
-                                                               PETSc.DECIDE
-                                                              ),
+                                              boundary_type = da_boundary_type,
+                                              proc_sizes    = da_proc_sizes,
                                               stencil_type  = 1,
                                               comm          = self._comm
                                              )
@@ -212,34 +342,82 @@ class nonlinear_solver(object):
         # the KSP/SNES solver with a DOF of 1. This is used to solve for
         # the electrostatic case:
 
-        self._da_ksp = PETSc.DMDA().create([self.N_q1, self.N_q2],
+        self._da_ksp = PETSc.DMDA().create(da_sizes,
                                             stencil_width = self.N_ghost,
-                                            boundary_type = (petsc_bc_in_q1,
-                                                             petsc_bc_in_q2
-                                                            ),
-                                            proc_sizes    = (PETSc.DECIDE,
-                                                             PETSc.DECIDE
-                                                            ),
+                                            boundary_type = da_boundary_type,
+                                            proc_sizes    = da_proc_sizes,
                                             stencil_type  = 1,
                                             comm          = self._comm
                                           )
 
-        # This DA is used by the FileIO routine dump_moments():
+        # Reporting the size of the ghost zones of f, and the saving over
+        # the widest stencil supported(which needs 3 ghost zones) when 
+        # the minimum is used, or the possible saving when overridden:
+        N_g_reference = 3 if (physical_system.N_ghost == 'auto') else N_ghost_minimum
+        
+        halo_bytes = \
+            self._comm_world.allreduce(get_halo_bytes(self._da_f, N_g, 
+                                                      self.N_ghost_q2
+                                                     )
+                                      )
+        halo_bytes_reference = \
+            self._comm_world.allreduce(get_halo_bytes(self._da_f, N_g_reference, 
+                                                      min(self.N_ghost_q2, 1) * N_g_reference
+                                                     )
+                                      )
+
+        # Each block of p1 exchanges the ghost zones of f independently:
+        exchange_bytes = \
+            self.N_p1_procs * get_exchange_bytes(proc_sizes, *exchange_arguments)
+
+        PETSc.Sys.Print('Number of Ghost Zones              :', N_g, 
+                        '(minimum needed:', str(N_ghost_minimum) + ')'
+                       )
+        PETSc.Sys.Print('Ghost Zones of f(all ranks)        :', 
+                        '%.3f' % (halo_bytes / 1024**2), 'MB', 
+                        '(%.3f MB with N_ghost = %d)' % (halo_bytes_reference / 1024**2, 
+                                                         N_g_reference
+                                                        )
+                       )
+        PETSc.Sys.Print('Process Grid in q-space            :', 
+                        ' x '.join(str(N_procs) for N_procs in proc_sizes)
+                       )
+        PETSc.Sys.Print('Exchange of f(all ranks)           :', 
+                        '%.3f' % (exchange_bytes / 1024**2), 'MB per exchange'
+                       )
+
+        # This DA is used by the FileIO routine dump_moments(). The same
+        # process grid is used, so that the local zones match those of f:
         self._da_dump_moments = PETSc.DMDA().create([self.N_q1, self.N_q2],
                                                     dof        = len(self.
                                                                      physical_system.
                                                                      moment_exponents
                                                                     ),
-                                                    proc_sizes = (PETSc.DECIDE,
-                                                                  PETSc.DECIDE
-                                                                 ),
+                                                    proc_sizes = proc_sizes,
                                                     comm       = self._comm
                                                    )
 
         # Creation of the local and global vectors from the DA:
         # This is for the distribution function
-        self._glob_f  = self._da_f.createGlobalVec()
-        self._local_f = self._da_f.createLocalVec()
+        self._glob_f = self._da_f.createGlobalVec()
+
+        # The distribution function is dumped/loaded using the 2D layout
+        # in all cases, so that the files are unchanged when the domain
+        # is degenerate along q2:
+        if(self.N_q2 == 1):
+            self._da_dump_f = PETSc.DMDA().create([self.N_q1, self.N_q2],
+                                                  dof        = (  self.N_p1 
+                                                                * self.N_p2 
+                                                                * self.N_p3
+                                                               ),
+                                                  proc_sizes = proc_sizes,
+                                                  comm       = self._comm
+                                                 )
+
+            self._glob_dump_f = self._da_dump_f.createGlobalVec()
+
+        else:
+            self._glob_dump_f = self._glob_f
 
         # The following global and local vectors are used in
         # the communication routines for EM fields
@@ -250,8 +428,9 @@ class nonlinear_solver(object):
         self._glob_moments = self._da_dump_moments.createGlobalVec()
 
         # Getting the arrays for the above vectors:
-        self._glob_f_array  = self._glob_f.getArray()
-        self._local_f_array = self._local_f.getArray()
+        self._glob_f_array = self._glob_f.getArray()
+
+        self._glob_dump_f_array = self._glob_dump_f.getArray()
 
         self._glob_fields_array  = self._glob_fields.getArray()
         self._local_fields_array = self._local_fields.getArray()
@@ -260,7 +439,7 @@ class nonlinear_solver(object):
 
         # Setting names for the objects which will then be
         # used as the key identifiers for the HDF5 files:
-        PETSc.Object.setName(self._glob_f, 'distribution_function')
+        PETSc.Object.setName(self._glob_dump_f, 'distribution_function')
         PETSc.Object.setName(self._glob_moments, 'moments')
 
         # Obtaining the array values of the cannonical variables:
@@ -272,7 +451,8 @@ class nonlinear_solver(object):
     
         # Obtaining start coordinates for the local zone
         # Additionally, we also obtain the size of the local zone
-        ((i_q1_start, i_q2_start), (N_q1_local, N_q2_local)) = self._da_f.getCorners()
+        ((i_q1_start, i_q2_start), (N_q1_local, N_q2_local)) = \
+            get_local_corners(self._da_f)
         (i_q1_end, i_q2_end) = (i_q1_start + N_q1_local - 1, i_q2_start + N_q2_local - 1)
 
         # Applying dirichlet boundary conditions:        
@@ -294,7 +474,10 @@ class nonlinear_solver(object):
                                            self.physical_system.params
                                           )[:, -N_g:]
 
-        if(self.physical_system.boundary_conditions.in_q2_bottom == 'dirichlet'):
+        # No ghost zones are held along q2 when N_q2 = 1:
+        if(    self.physical_system.boundary_conditions.in_q2_bottom == 'dirichlet'
+           and self.N_q2 > 1
+          ):
             # If local zone includes the bottom physical boundary:
             if(i_q2_start == 0):
                 self.f[:, :, :N_g] = self.boundary_conditions.\
@@ -303,7 +486,9 @@ class nonlinear_solver(object):
                                            self.physical_system.params
                                           )[:, :, :N_g]
 
-        if(self.physical_system.boundary_conditions.in_q2_top == 'dirichlet'):
+        if(    self.physical_system.boundary_conditions.in_q2_top == 'dirichlet'
+           and self.N_q2 > 1
+          ):
             # If local zone includes the top physical boundary:
             if(i_q2_end == self.N_q2 - 1):
                 self.f[:, :, -N_g:] = self.boundary_conditions.\
@@ -312,9 +497,13 @@ class nonlinear_solver(object):
                                             self.physical_system.params
                                            )[:, :, -N_g:]
 
-        # Assigning the value to the PETSc Vecs(for dump at t = 0):
-        (af.flat(self.f)).to_ndarray(self._local_f_array)
-        (af.flat(self.f[:, N_g:-N_g, N_g:-N_g])).to_ndarray(self._glob_f_array)
+        # The values of f have been changed in-place:
+        self._f_version += 1
+
+        # Assigning the value to the global PETSc Vec(for dump at t = 0):
+        interior_q1, interior_q2 = get_interior_slices(self)
+
+        (af.flat(self.f[:, interior_q1, interior_q2])).to_ndarray(self._glob_f_array)
 
         # Assigning the advection terms along q1 and q2
         self._A_q1 = physical_system.A_q(self.q1_center, self.q2_center,
@@ -336,17 +525,137 @@ class nonlinear_solver(object):
                                          physical_system.params
                                         )[1]
 
+        # When A_q is independent of q, and the domain is periodic along
+        # both q1 and q2, the advection in q-space may be carried out 
+        # exactly as a phase shift in Fourier space. This requires that
+        # the complete domain is held locally(ie. run in serial):
+        self._fft_advect_q = (    physical_system.params.solver_method_in_q == 'ASL'
+                              and self._comm.size == 1
+                              and self.boundary_conditions.in_q1_left   == 'periodic'
+                              and self.boundary_conditions.in_q2_bottom == 'periodic'
+                              and self._is_q_independent(self._A_q1)
+                              and self._is_q_independent(self._A_q2)
+                             )
+
         # Assigning the function objects to methods of the solver:
         self._A_p = physical_system.A_p
 
         # Source/Sink term:
         self._source = physical_system.source
 
+        # Method used in integrating the source term(optional parameter):
+        # 'RK2'         - 2nd order Runge-Kutta(default)
+        # 'exponential' - Exact update for relaxation type sources
+        #                 of the form -(f - f0)/tau, such as BGK
+        self._source_integrator = getattr(physical_system.params, 
+                                          'source_integrator', 'RK2'
+                                         )
+
+        if(self._source_integrator not in ['RK2', 'exponential']):
+            raise NotImplementedError('Unavailable/Invalid source integrator')
+
+        # Whether the source term is a relaxation of the form -(f - f0)/tau
+        # such as BGK, which vanishes where tau is infinite(optional parameter,
+        # defaults to False). Only then is the evaluation of the source term
+        # skipped for collisionless systems(see _set_collision_regime):
+        self._source_is_relaxation = getattr(physical_system.params, 
+                                             'source_is_relaxation', False
+                                            )
+
+        # Time integrator used with the FVM(optional parameter):
+        # 'RK2'      - 2nd order Runge-Kutta(default)
+        # 'SSPRK3'   - 3-stage, 3rd order strong stability preserving RK
+        # 'SSPRK104' - 10-stage, 4th order strong stability preserving RK
+        # The SSP methods are used in their low-storage forms.
+        self._fvm_integrator = getattr(physical_system.params, 
+                                       'fvm_integrator', 'RK2'
+                                      )
+
+        if(self._fvm_integrator not in fvm_integrator_stages):
+            raise NotImplementedError('Unavailable/Invalid FVM integrator')
+
+        # Method used for the advection in p-space(optional parameter):
+        # 'interpolation'  - 3D interpolation using the advection terms A_p(default)
+        # 'shear_rotation' - Split into the acceleration due to the electric field
+        #                    which is a shift, and the gyration due to the magnetic 
+        #                    field which is performed as an exact rotation through
+        #                    1D shears. This assumes A_p = (q/m) * (E + p X B)
+        self._p_advection_method = getattr(physical_system.params, 
+                                           'p_advection_method', 'interpolation'
+                                          )
+
+        if(self._p_advection_method not in ['interpolation', 'shear_rotation']):
+            raise NotImplementedError('Unavailable/Invalid p-advection method')
+
+        if(    self._p_advection_method == 'shear_rotation' 
+           and physical_system.params.p_dim == 1
+          ):
+            raise NotImplementedError('Shear rotation requires p_dim >= 2')
+
+        # Evaluating tau over the phase space, and classifying the
+        # collisional regime of the system:
+        self._set_collision_regime()
+
         # Initializing a variable to track time-elapsed:
         # This becomes necessary when applying shearing wall
         # boundary conditions(WIP):
         self.time_elapsed = 0
 
+    def _set_collision_regime(self):
+        """
+        Evaluates the collision timescale tau over the phase space, and
+        classifies the system into one of the following regimes:
+
+        'tau_zero'      - tau is zero somewhere in the domain. f is set to
+                          the equilibrium distribution in every step.
+        'collisionless' - tau is infinite everywhere, and the source term
+                          is a relaxation(params.source_is_relaxation).
+                          The source term is not evaluated.
+        'uniform'       - tau is the same everywhere. This is stored as a
+                          scalar in self._tau.
+        'varying'       - tau varies over the phase space. This is stored
+                          as an array in self._tau.
+
+        This is done once at initialization to avoid evaluating tau, and
+        the reductions on it in every time-step. Needs to be called again
+        if params.tau is changed during the course of the evolution.
+        """
+        tau = self.physical_system.params.tau(self.q1_center, self.q2_center,
+                                              self.p1, self.p2, self.p3
+                                             )
+
+        if(isinstance(tau, af.Array)):
+            if(af.any_true(tau == 0)):
+                self._collision_regime = 'tau_zero'
+        
+            elif(    af.all_true(tau == np.inf) 
+                 and getattr(self, '_source_is_relaxation', False) == True
+                ):
+                self._collision_regime = 'collisionless'
+            
+            elif(af.min(tau) == af.max(tau)):
+                self._collision_regime = 'uniform'
+                tau                    = af.max(tau)
+
+            else:
+                self._collision_regime = 'varying'
+                af.eval(tau)
+
+        else:
+            if(tau == 0):
+                self._collision_regime = 'tau_zero'
+
+            elif(    tau == np.inf 
+                 and getattr(self, '_source_is_relaxation', False) == True
+                ):
+                self._collision_regime = 'collisionless'
+
+            else:
+                self._collision_regime = 'uniform'
+
+        self._tau = tau
+        return
+
     def _convert_to_q_expanded(self, array):
         """
         Since we are limited to use 4D arrays due to
@@ -362,12 +671,15 @@ class nonlinear_solver(object):
         """
         # Obtaining start coordinates for the local zone
         # Additionally, we also obtain the size of the local zone
-        ((i_q1_start, i_q2_start), (N_q1_local, N_q2_local)) = self._da_f.getCorners()
+        ((i_q1_start, i_q2_start), (N_q1_local, N_q2_local)) = \
+            get_local_corners(self._da_f)
+        
+        N_g_q1, N_g_q2 = get_ghost_widths(self)
      
         array = af.moddims(array,
                            self.N_p1 * self.N_p2 * self.N_p3,
-                           (N_q1_local + 2 * self.N_ghost),
-                           (N_q2_local + 2 * self.N_ghost)
+                           (N_q1_local + 2 * N_g_q1),
+                           (N_q2_local + 2 * N_g_q2)
                           )
 
         af.eval(array)
@@ -388,17 +700,33 @@ class nonlinear_solver(object):
         """
         # Obtaining start coordinates for the local zone
         # Additionally, we also obtain the size of the local zone
-        ((i_q1_start, i_q2_start), (N_q1_local, N_q2_local)) = self._da_f.getCorners()
+        ((i_q1_start, i_q2_start), (N_q1_local, N_q2_local)) = \
+            get_local_corners(self._da_f)
+        
+        N_g_q1, N_g_q2 = get_ghost_widths(self)
         
         array = af.moddims(array,
                            self.N_p1, self.N_p2, self.N_p3,
-                             (N_q1_local + 2 * self.N_ghost)
-                           * (N_q2_local + 2 * self.N_ghost)
+                             (N_q1_local + 2 * N_g_q1)
+                           * (N_q2_local + 2 * N_g_q2)
                           )
 
         af.eval(array)
         return (array)
 
+    def _is_q_independent(self, array):
+        """
+        Returns True when the array passed(such as the advection terms)
+        has no variation along q1 and q2. That is, when the array is
+        either a scalar or only varies along the axis 0 which holds the
+        variation in p-space.
+        """
+        if(isinstance(array, af.Array)):
+            return(array.dims()[0] == array.elements())
+        
+        else:
+            return(np.isscalar(array))
+
     def _calculate_q_center(self):
         """
         Initializes the cannonical variables q1, q2 using a centered
@@ -410,17 +738,20 @@ class nonlinear_solver(object):
 
         # Obtaining start coordinates for the local zone
         # Additionally, we also obtain the size of the local zone
-        ((i_q1_start, i_q2_start), (N_q1_local, N_q2_local)) = self._da_f.getCorners()
+        ((i_q1_start, i_q2_start), (N_q1_local, N_q2_local)) = \
+            get_local_corners(self._da_f)
 
         i_q1_center = i_q1_start + 0.5
         i_q2_center = i_q2_start + 0.5
 
+        N_g_q1, N_g_q2 = get_ghost_widths(self)
+
         i_q1 = (  i_q1_center 
-                + np.arange(-self.N_ghost, N_q1_local + self.N_ghost)
+                + np.arange(-N_g_q1, N_q1_local + N_g_q1)
                )
 
         i_q2 = (  i_q2_center
-                + np.arange(-self.N_ghost, N_q2_local + self.N_ghost)
+                + np.arange(-N_g_q2, N_q2_local + N_g_q2)
                )
 
         q1_center = self.q1_start + i_q1 * self.dq1
@@ -478,7 +809,10 @@ class nonlinear_solver(object):
 
         # Obtaining start coordinates for the local zone
         # Additionally, we also obtain the size of the local zone
-        ((i_q1_start, i_q2_start), (N_q1_local, N_q2_local)) = self._da_f.getCorners()
+        ((i_q1_start, i_q2_start), (N_q1_local, N_q2_local)) = \
+            get_local_corners(self._da_f)
+
+        N_g_q1, N_g_q2 = get_ghost_widths(self)
 
         # Initializing the EM fields quantities:
         # These quantities are defined for the CK grid:
@@ -488,27 +822,27 @@ class nonlinear_solver(object):
         # Magnetic fields are defined at the (n-1/2)-th timestep:
         self.cell_centered_EM_fields = af.constant(0, 6,
                                                      N_q1_local 
-                                                   + 2 * self.N_ghost,
+                                                   + 2 * N_g_q1,
                                                      N_q2_local 
-                                                   + 2 * self.N_ghost,
+                                                   + 2 * N_g_q2,
                                                    dtype=af.Dtype.f64
                                                   )
 
         # Field values at n-th timestep:
         self.cell_centered_EM_fields_at_n = af.constant(0, 6,
                                                           N_q1_local 
-                                                        + 2 * self.N_ghost,
+                                                        + 2 * N_g_q1,
                                                           N_q2_local 
-                                                        + 2 * self.N_ghost,
+                                                        + 2 * N_g_q2,
                                                         dtype=af.Dtype.f64
                                                        )
 
         # Field values at (n+1/2)-th timestep:
         self.cell_centered_EM_fields_at_n_plus_half = af.constant(0, 6,
                                                                     N_q1_local 
-                                                                  + 2 * self.N_ghost,
+                                                                  + 2 * N_g_q1,
                                                                     N_q2_local 
-                                                                  + 2 * self.N_ghost,
+                                                                  + 2 * N_g_q2,
                                                                   dtype=af.Dtype.f64
                                                                  )
 
@@ -516,9 +850,9 @@ class nonlinear_solver(object):
         # Declaring the arrays which store data on the FDTD grid:
         self.yee_grid_EM_fields = af.constant(0, 6,
                                                 N_q1_local 
-                                              + 2 * self.N_ghost,
+                                              + 2 * N_g_q1,
                                                 N_q2_local 
-                                              + 2 * self.N_ghost,
+                                              + 2 * N_g_q2,
                                               dtype=af.Dtype.f64
                                              )
 
@@ -530,6 +864,11 @@ class nonlinear_solver(object):
                 self._communicate_fields()
                 self._apply_bcs_fields()
 
+            elif (self.physical_system.params.fields_initialize == 'ksp'):
+                ksp_poisson(self)
+                self._communicate_fields()
+                self._apply_bcs_fields()
+
             elif (self.physical_system.params.fields_initialize == 'user-defined'):
                 
                 E1, E2, E3 = \
@@ -576,9 +915,105 @@ class nonlinear_solver(object):
             self.cell_centered_EM_fields_at_n_plus_half = \
                 af.join(0, E1, E2, E3, af.join(0, B1, B2, B3))
         
+    # The distribution function is held as a property, so that every
+    # reassignment of self.f increments the version counter _f_version.
+    # This is used in invalidating quantities which are cached for the
+    # current state, such as the moments of f. Operations which modify
+    # self.f in-place need to increment the counter explicitly.
+    # Additionally, the memory layout in which f is currently stored is 
+    # tracked by _f_layout(see _convert_layout). Accessing self.f always
+    # returns f in q_expanded form:
+    _f_version = 0
+    _f_layout  = 'q_expanded'
+
+    @property
+    def f(self):
+        return(self._get_f_in_layout('q_expanded'))
+
+    @f.setter
+    def f(self, value):
+        self._set_f_in_layout(value, 'q_expanded')
+
+    def _get_f_in_layout(self, layout):
+        """
+        Returns the distribution function in the requested layout. The
+        state is stored in this layout from here on, so that consecutive
+        operations which use the same layout don't need to transpose f.
+        """
+        if(self._f_layout != layout):
+            self._f        = self._convert_layout(self._f, self._f_layout, layout)
+            self._f_layout = layout
+
+        return(self._f)
+
+    def _set_f_in_layout(self, value, layout):
+        """
+        Assigns the distribution function which is in the layout passed.
+        """
+        self._f          = value
+        self._f_layout   = layout
+        self._f_version += 1
+        return
+
+    def _convert_layout(self, array, layout_in, layout_out):
+        """
+        Converts the array representing the distribution function between
+        the following layouts:
+
+        q_expanded: (N_p1 * N_p2 * N_p3, N_q1, N_q2)
+        q_interp  : (N_q1, N_q2, N_p1 * N_p2 * N_p3) - used in q-interpolations
+        p_expanded: (N_p1, N_p2, N_p3, N_q1 * N_q2)
+        p2_first  : (N_p2, N_p1, N_p3, N_q1 * N_q2)  - used in p2-interpolations
+        p3_first  : (N_p3, N_p1, N_p2, N_q1 * N_q2)  - used in p3-interpolations
+
+        Conversions between q_expanded and p_expanded only change the 
+        metadata of the array. The remaining conversions involve transposes.
+        """
+        if(layout_in == layout_out):
+            return(array)
+
+        # Converting to q_expanded:
+        if(layout_in == 'q_interp'):
+            array = af.reorder(array, 2, 0, 1)
+
+        elif(layout_in == 'p_expanded'):
+            array = self._convert_to_q_expanded(array)
+
+        elif(layout_in == 'p2_first'):
+            array = self._convert_to_q_expanded(af.reorder(array, 1, 0, 2, 3))
+
+        elif(layout_in == 'p3_first'):
+            array = self._convert_to_q_expanded(af.reorder(array, 1, 2, 0, 3))
+
+        # Converting from q_expanded:
+        if(layout_out == 'q_interp'):
+            array = af.reorder(array, 1, 2, 0)
+
+        elif(layout_out == 'p_expanded'):
+            array = self._convert_to_p_expanded(array)
+
+        elif(layout_out == 'p2_first'):
+            array = af.reorder(self._convert_to_p_expanded(array), 1, 0, 2, 3)
+
+        elif(layout_out == 'p3_first'):
+            array = af.reorder(self._convert_to_p_expanded(array), 2, 0, 1, 3)
+
+        af.eval(array)
+        return(array)
+
     # Injection of solver functions into class as methods:
-    _communicate_f      = communicate.\
-                          communicate_f
+    _communicate_f       = communicate.\
+                           communicate_f
+    _communicate_f_begin = communicate.\
+                           communicate_f_begin
+    _communicate_f_end   = communicate.\
+                           communicate_f_end
+
+    _use_ghost_zones_f   = communicate.\
+                           use_ghost_zones_f
+
+    _communicate_p1_halo = communicate.\
+                           communicate_p1_halo
 
     _communicate_fields = communicate.\
                           communicate_fields
@@ -591,6 +1026,9 @@ class nonlinear_solver(object):
     swss_timestep   = timestep.swss_step
     jia_timestep    = timestep.jia_step
 
+    compute_stable_dt = timestep.compute_stable_dt
+    evolve            = timestep.evolve
+
     compute_moments = compute_moments_imported
 
     dump_distribution_function = dump.dump_distribution_function
@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 
 import arrayfire as af
+import numpy as np
 
 def RK2(dx_dt, x_initial, dt, *args):
 
@@ -56,3 +57,29 @@ def RK5(dx_dt, x_initial, dt, *args):
 
     af.eval(x)
     return(x)
+
+def exponential_relaxation(dx_dt, x_initial, dt, tau, *args):
+    """
+    Exact update for relaxation type equations dx/dt = -(x - x_0)/tau,
+    where x_0 remains unchanged over the step(as for the BGK operator
+    which conserves the moments used in constructing x_0):
+
+    x(t + dt) = x_0 + (x - x_0) * exp(-dt/tau)
+              = x + dx_dt(x) * tau * (1 - exp(-dt/tau))
+
+    This is unconditionally stable, and requires a single evaluation
+    of dx_dt. Where tau is infinite, x is left unchanged.
+    """
+    if(isinstance(tau, af.Array)):
+        weight = af.select(tau == np.inf, dt, -tau * af.expm1(-dt / tau))
+
+    elif(tau == np.inf):
+        weight = dt
+
+    else:
+        weight = -tau * np.expm1(-dt / tau)
+
+    x = x_initial + dx_dt(x_initial, *args) * weight
+
+    af.eval(x)
+    return(x)
@@ -7,11 +7,24 @@ splitting for any 2 operators is carried out. These are then called
 in the timestep routine of the nonlinear solver. 
 """
 
-def strang(self, op1, op2, dt):
+def strang(self, op1, op2, dt, N_steps = 1):
     """
     Performs strang splitting for any 2 operators.
     This scheme is 2nd order accurate in time
 
+    When N_steps > 1, the trailing half-step of op1 of every
+    step is merged with the leading half-step of op1 in the 
+    following step(first-same-as-last). That is, instead of:
+
+    op1(dt/2) op2(dt) op1(dt/2) op1(dt/2) op2(dt) op1(dt/2)...
+
+    the following is performed:
+
+    op1(dt/2) op2(dt) op1(dt) op2(dt) ... op2(dt) op1(dt/2)
+
+    The state is only consistent with the unmerged scheme at the
+    end of the call. This halves the number of calls made to op1.
+
     Parameters
     ----------
     self: object
@@ -30,8 +43,17 @@ def strang(self, op1, op2, dt):
 
     dt : float
          Time-step size to evolve the system
+
+    N_steps : int
+              Number of time-steps of size dt that the system
+              is to be evolved by. Defaults to 1.
     """
     op1(self, 0.5 * dt)
+
+    for i in range(N_steps - 1):
+        op2(self, dt)
+        op1(self, dt)
+
     op2(self, dt)
     op1(self, 0.5 * dt)
 
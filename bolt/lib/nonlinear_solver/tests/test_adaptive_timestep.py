@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+This test checks the choice of the time-step used in evolve. The
+stable time-step is checked against the CFL condition for known
+advection coefficients. The steps taken by evolve are checked to end
+exactly at t_final, and the rejected steps are checked to restore the
+state of the system(f, fields and time). Additionally, the embedded
+error estimate of the FVM stepper is checked to ignore the ghost zones.
+"""
+
+import numpy as np
+import arrayfire as af
+from mpi4py import MPI
+
+from bolt.lib.nonlinear_solver import timestep
+from bolt.lib.nonlinear_solver.FVM_solver import timestep_df_dt
+
+def A_p(q1, q2, p1, p2, p3, E1, E2, E3, B1, B2, B3, params):
+    return (E1 + 0 * p1, E2 + 0 * p1, E3 + 0 * p1)
+
+class test(object):
+    def __init__(self, solver_method_in_q = 'ASL', charge_electron = 0):
+        self.physical_system = \
+            type('obj', (object, ),
+                 {'params': type('obj', (object, ),
+                                 {'charge_electron'    : charge_electron,
+                                  'solver_method_in_q' : solver_method_in_q,
+                                  'p_dim'              : 3
+                                 }
+                                )
+                 }
+                )
+
+        self.dq1 = 0.1
+        self.dq2 = 0.5
+
+        self._A_q1 = af.to_array(np.array([-2.0, 1.0]))
+        self._A_q2 = 1
+
+        self.dp1 = 0.01
+        self.dp2 = 0.1
+        self.dp3 = 0.1
+
+        self.p1 = self.p2 = self.p3 = af.constant(0, 4, dtype = af.Dtype.f64)
+        self.q1_center = self.q2_center = af.constant(0, 1, dtype = af.Dtype.f64)
+
+        self._A_p = A_p
+
+        self.cell_centered_EM_fields = \
+            af.to_array(np.array([3.0, 1.0, 1.0, 0.0, 0.0, 0.0]))
+
+        self.f            = af.constant(1, 4, dtype = af.Dtype.f64)
+        self.time_elapsed = 0
+
+        self._comm_world = MPI.COMM_WORLD
+
+        # Used to record the state of the system at the start of each step:
+        self.steps = []
+
+        # Relative errors estimated for the steps taken:
+        self.errors = []
+
+    def strang_timestep(self, dt):
+        self.steps.append((dt, self.f.copy(),
+                           self.cell_centered_EM_fields.copy(),
+                           self.time_elapsed
+                          )
+                         )
+
+        self.f                        = self.f + 1
+        self.cell_centered_EM_fields  = self.cell_centered_EM_fields + 1
+        self.time_elapsed            += dt
+
+        if(getattr(self, '_estimate_error', False) == True):
+            self._error_estimate = self.errors.pop(0) if self.errors else 0
+
+def test_compute_stable_dt():
+    # Crossing times: q1 --> 0.1 / 2, q2 --> 0.5 / 1
+    obj = test()
+    assert (abs(timestep.compute_stable_dt(obj, 0.5) - 0.5 * 0.1 / 2) < 1e-15)
+
+    # Crossing times: p1 --> 0.01 / 3, p2 --> 0.1 / 1, p3 --> 0.1 / 1
+    obj = test(charge_electron = -1)
+    assert (abs(timestep.compute_stable_dt(obj, 0.5) - 0.5 * 0.01 / 3) < 1e-15)
+
+def test_evolve_ends_at_t_final():
+    obj = test()
+    # The stable time-step(0.025) doesn't divide t_final:
+    timestep.evolve(obj, 0.06)
+
+    dt = [step[0] for step in obj.steps]
+
+    assert (len(dt) == 3)
+    assert (abs(dt[-1] - 0.01) < 1e-12)
+    assert (abs(obj.time_elapsed - 0.06) < 1e-15)
+
+def test_evolve_restores_rejected_steps():
+    obj = test(solver_method_in_q = 'FVM')
+    # The first step is rejected, and the later steps are accepted:
+    obj.errors = [1]
+
+    f_initial      = obj.f.copy()
+    fields_initial = obj.cell_centered_EM_fields.copy()
+
+    timestep.evolve(obj, 0.05, error_tolerance = 1e-3)
+
+    (dt_rejected, f_rejected, fields_rejected, time_rejected) = obj.steps[0]
+    (dt_retaken, f_retaken, fields_retaken, time_retaken)     = obj.steps[1]
+
+    # The step is retaken from the initial state with a smaller time-step:
+    assert (dt_retaken < dt_rejected)
+    assert (af.max(af.abs(f_retaken - f_initial)) == 0)
+    assert (af.max(af.abs(fields_retaken - fields_initial)) == 0)
+    assert (time_retaken == 0)
+
+    # Only the accepted steps contribute to the evolved state:
+    assert (abs(obj.time_elapsed - 0.05) < 1e-15)
+    assert (af.max(af.abs(obj.f - (f_initial + len(obj.steps) - 1))) == 0)
+
+def test_error_estimate_excludes_ghost_zones():
+    # RK2 for the test problem df/dt = f, with values in the ghost zones
+    # that are far off, as is the case before these are communicated:
+    N_g = 2
+    obj = test(solver_method_in_q = 'FVM')
+    obj.N_ghost = N_g
+    obj.f       = af.constant(1, 1, 8 + 2 * N_g, 8 + 2 * N_g, dtype = af.Dtype.f64)
+
+    obj._communicate_f       = lambda: None
+    obj._communicate_f_begin = lambda: None
+    obj._communicate_f_end   = lambda: None
+    obj._apply_bcs_f         = lambda: None
+
+    def df_dt_fvm_q(f, self):
+        df_dt = 1e3 + 0 * f
+        df_dt[:, N_g:-N_g, N_g:-N_g] = 0
+        return(df_dt)
+
+    df_dt_fvm_q_imported           = timestep_df_dt.df_dt_fvm_q
+    df_dt_fvm_local_imported       = timestep_df_dt.df_dt_fvm_local
+    timestep_df_dt.df_dt_fvm_q     = df_dt_fvm_q
+    timestep_df_dt.df_dt_fvm_local = lambda f, self, *args, **kwargs: f
+
+    dt = 0.01
+    obj.physical_system.params.fields_solver = 'fft'
+    obj._estimate_error = True
+    obj._error_estimate = 0
+
+    try:
+        timestep_df_dt.fvm_timestep_RK2(obj, dt)
+    finally:
+        timestep_df_dt.df_dt_fvm_q     = df_dt_fvm_q_imported
+        timestep_df_dt.df_dt_fvm_local = df_dt_fvm_local_imported
+
+    # In the local zone: RK2 --> 1 + dt + dt^2 / 2, Euler --> 1 + dt
+    error_expected = (dt**2 / 2) / (1 + dt + dt**2 / 2)
+    assert (abs(obj._error_estimate - error_expected) < 1e-12)
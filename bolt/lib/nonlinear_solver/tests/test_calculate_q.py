@@ -56,3 +56,29 @@ def test_calculate_q():
 
     assert (af.sum(af.abs(q1_expected - q1)) == 0)
     assert (af.sum(af.abs(q2_expected - q2)) == 0)
+
+
+def test_calculate_q_degenerate_q2():
+    # For domains degenerate along q2, a 1D DMDA is used, 
+    # and no ghost zones are held along q2:
+    obj = test()
+
+    obj.N_q2       = 1
+    obj.dq2        = (obj.q2_end - obj.q2_start) / obj.N_q2
+    obj.N_ghost_q2 = 0
+    
+    obj._da_f = PETSc.DMDA().create([obj.N_q1],
+                                    dof = 1,
+                                    stencil_width=obj.N_ghost
+                                   )
+
+    q1, q2 = calculate_q_center(obj)
+
+    q1_expected = obj.q1_start + \
+        (0.5 + np.arange(-obj.N_ghost, obj.N_q1 + obj.N_ghost)) * obj.dq1
+
+    q1_expected = af.reorder(af.to_array(q1_expected), 2, 0, 1)
+
+    assert (q1.dims() == (1, obj.N_q1 + 2 * obj.N_ghost))
+    assert (af.sum(af.abs(q1_expected - q1)) == 0)
+    assert (af.sum(af.abs(q2 - (obj.q2_start + 0.5 * obj.dq2))) == 0)
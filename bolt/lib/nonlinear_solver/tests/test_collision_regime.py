@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Checks the classification of the collisional regime of the system,
+which is carried out once at initialization from params.tau. The
+source term is only skipped for collisionless systems when it is
+declared to be a relaxation(params.source_is_relaxation), since other
+source terms don't vanish where tau is infinite.
+"""
+
+import numpy as np
+import arrayfire as af
+
+from bolt.lib.nonlinear_solver.nonlinear_solver import nonlinear_solver
+
+set_collision_regime = nonlinear_solver._set_collision_regime
+
+class test(object):
+    def __init__(self, tau, source_is_relaxation = True):
+        self.physical_system = type('obj', (object, ),
+                                    {'params': type('obj', (object, ),
+                                                    {'tau': tau})
+                                    }
+                                   )
+
+        self.q1_center = af.to_array(np.random.rand(1, 8, 4))
+        self.q2_center = af.to_array(np.random.rand(1, 8, 4))
+
+        self.p1 = af.to_array(np.random.rand(16))
+        self.p2 = self.p3 = 0 * self.p1
+
+        self._source_is_relaxation = source_is_relaxation
+
+def tau_array(value):
+    return(lambda q1, q2, p1, p2, p3:  value 
+                                     + af.broadcast(lambda a, b: 0 * a * b, q1, p1)
+          )
+
+def test_tau_zero():
+    for tau in [lambda *args: 0, tau_array(0)]:
+        obj = test(tau)
+        set_collision_regime(obj)
+        assert (obj._collision_regime == 'tau_zero')
+
+    # tau is zero only at a single point:
+    def tau(q1, q2, p1, p2, p3):
+        tau    = 1 + af.broadcast(lambda a, b: 0 * a * b, q1, p1)
+        tau[0] = 0
+        return(tau)
+
+    obj = test(tau)
+    set_collision_regime(obj)
+    assert (obj._collision_regime == 'tau_zero')
+
+def test_collisionless():
+    for tau in [lambda *args: np.inf, tau_array(np.inf)]:
+        obj = test(tau)
+        set_collision_regime(obj)
+        assert (obj._collision_regime == 'collisionless')
+
+        # Sources which aren't relaxations need to be evaluated:
+        obj = test(tau, source_is_relaxation = False)
+        set_collision_regime(obj)
+        assert (obj._collision_regime == 'uniform')
+        assert (obj._tau == np.inf)
+
+def test_uniform():
+    for tau in [lambda *args: 0.5, tau_array(0.5)]:
+        obj = test(tau)
+        set_collision_regime(obj)
+        assert (obj._collision_regime == 'uniform')
+        assert (obj._tau == 0.5)
+
+def test_varying():
+    obj = test(lambda q1, q2, p1, p2, p3: 1 + af.broadcast(lambda a, b: a * b, q1, p1))
+    set_collision_regime(obj)
+    
+    assert (obj._collision_regime == 'varying')
+    assert (isinstance(obj._tau, af.Array))
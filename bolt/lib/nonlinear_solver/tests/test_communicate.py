@@ -17,11 +17,12 @@ import arrayfire as af
 from petsc4py import PETSc
 
 from bolt.lib.nonlinear_solver.communicate \
-    import communicate_f, communicate_fields
+    import communicate_f, communicate_fields, communicate_p1_halo, \
+    use_ghost_zones_f
 
 
 class test_distribution_function(object):
-    def __init__(self):
+    def __init__(self, boundary_type = ('periodic', 'periodic')):
         
         self.q1_start = np.random.randint(0, 5)
         self.q2_start = np.random.randint(0, 5)
@@ -69,15 +70,13 @@ class test_distribution_function(object):
         self._da_f = PETSc.DMDA().create([self.N_q1, self.N_q2],
                                          dof=(self.N_p1 * self.N_p2 * self.N_p3),
                                          stencil_width=self.N_ghost,
-                                         boundary_type=('periodic', 'periodic'),
+                                         boundary_type=boundary_type,
                                          stencil_type=1, 
                                         )
 
-        self._glob_f  = self._da_f.createGlobalVec()
-        self._local_f = self._da_f.createLocalVec()
+        self._glob_f = self._da_f.createGlobalVec()
 
-        self._glob_f_array  = self._glob_f.getArray()
-        self._local_f_array = self._local_f.getArray()
+        self._glob_f_array = self._glob_f.getArray()
 
         self.boundary_conditions = type('obj', (object, ),
                                         {'in_q1':'periodic',
@@ -172,6 +171,47 @@ def test_communicate_f():
     expected = af.sin(2 * np.pi * obj.q1 + 4 * np.pi * obj.q2)
     assert (af.mean(af.abs(obj.f - expected)) < 5e-14)
 
+def test_communicate_f_ghosted():
+    # The ghost zones at the boundaries which aren't periodic
+    # are to be left unchanged by the communication:
+    obj = test_distribution_function(('ghosted', 'periodic'))
+    N_g = obj.N_ghost
+
+    obj.f[:, :N_g]  = 1
+    obj.f[:, -N_g:] = 1
+    communicate_f(obj)
+
+    expected = af.sin(2 * np.pi * obj.q1 + 4 * np.pi * obj.q2)
+    assert (af.mean(af.abs(obj.f - expected)[:, N_g:-N_g]) < 5e-14)
+    assert (af.all_true(obj.f[:, :N_g] == 1) and af.all_true(obj.f[:, -N_g:] == 1))
+
+def test_use_ghost_zones_f():
+    # When each step uses up a single ghost zone, the ghost
+    # zones are communicated once every N_ghost steps:
+    obj = test_distribution_function()
+
+    obj._N_ghost_step      = 1
+    obj._valid_ghost_width = 0
+
+    communicated = [use_ghost_zones_f(obj) for i in range(2 * obj.N_ghost)]
+    assert (communicated == ([True] + [False] * (obj.N_ghost - 1)) * 2)
+
+def test_communicate_p1_halo():
+    # With a single block of p1, the ghost zones along p1
+    # are obtained by periodic wrapping of the same block:
+    obj = type('obj', (object, ), {'_comm_p': PETSc.COMM_SELF.tompi4py(),
+                                   'performance_test_flag': False
+                                  }
+              )
+    
+    array  = af.randu(16, 8, 4, 9, dtype = af.Dtype.f64)
+    padded = communicate_p1_halo(obj, array, 3)
+
+    assert (padded.dims() == (22, 8, 4, 9))
+    assert (af.max(af.abs(padded[3:-3] - array)) == 0)
+    assert (af.max(af.abs(padded[:3] - array[-3:])) == 0)
+    assert (af.max(af.abs(padded[-3:] - array[:3])) == 0)
+
 def test_communicate_fields():
     obj = test_fields()
     communicate_fields(obj)
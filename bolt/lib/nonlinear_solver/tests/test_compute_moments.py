@@ -146,3 +146,36 @@ def test_compute_moments():
     assert(error_p1b < 1e-13)
     assert(error_p2b < 1e-13)
     assert(error_p3b < 1e-13)
+
+def test_compute_moments_batched():
+
+    obj = test()
+
+    moments = compute_moments(obj, ['density', 'mom_p1_bulk', 'energy'])
+
+    assert(moments.dims()[0] == 3)
+
+    for i, name in enumerate(['density', 'mom_p1_bulk', 'energy']):
+        error = af.max(af.abs(moments[i] - compute_moments(obj, name)))
+        assert(error < 1e-13)
+
+def test_compute_moments_cached():
+
+    obj = test()
+    obj._f_version = 0
+
+    rho = compute_moments(obj, 'density')
+    assert(obj._moments_cache[0] is obj.f)
+
+    # Repeated calls for the same version of f are served from the cache:
+    cache = obj._moments_cache
+    compute_moments(obj, ['mom_p1_bulk', 'energy'])
+    assert(obj._moments_cache is cache)
+
+    # Changing f invalidates the cache:
+    obj.f            = 2 * obj.f
+    obj._f_version  += 1
+    
+    error = af.max(af.abs(compute_moments(obj, 'density') - 2 * rho))
+    assert(obj._moments_cache is not cache)
+    assert(error < 1e-13)
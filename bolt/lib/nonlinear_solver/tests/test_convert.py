@@ -82,3 +82,29 @@ def test_convert_to_q_expanded():
                          )
 
     assert (af.sum(modified - expected) == 0)
+
+
+def test_convert_layout():
+    obj = test()
+    test_array = af.randu(obj.N_p1 * obj.N_p2 * obj.N_p3,
+                          obj.N_q1 + 2 * obj.N_ghost,
+                          obj.N_q2 + 2 * obj.N_ghost
+                         )
+
+    convert_layout = nonlinear_solver._convert_layout
+    
+    # Binding the conversion functions used:
+    obj._convert_to_p_expanded = lambda array:convert_to_p_expanded(obj, array)
+    obj._convert_to_q_expanded = lambda array:convert_to_q_expanded(obj, array)
+
+    p3_first = convert_layout(obj, test_array, 'q_expanded', 'p3_first')
+    expected = af.reorder(convert_to_p_expanded(obj, test_array), 2, 0, 1)
+
+    assert (af.sum(af.abs(p3_first - expected)) == 0)
+
+    for layout in ['q_interp', 'p_expanded', 'p3_first']:
+        converted = convert_layout(obj, test_array, 'q_expanded', layout)
+        converted = convert_layout(obj, converted, layout, 'q_interp')
+        converted = convert_layout(obj, converted, 'q_interp', 'q_expanded')
+
+        assert (af.sum(af.abs(converted - test_array)) == 0)
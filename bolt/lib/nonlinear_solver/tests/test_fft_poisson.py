@@ -14,7 +14,8 @@ import numpy as np
 import arrayfire as af
 from petsc4py import PETSc
 
-from bolt.lib.nonlinear_solver.EM_fields_solver.electrostatic import fft_poisson
+from bolt.lib.nonlinear_solver.EM_fields_solver.electrostatic import fft_poisson, \
+    _split, _redistribute, _slab_redistributions
 from bolt.lib.nonlinear_solver.communicate import communicate_fields
 
 def compute_moments(self, *args):
@@ -115,3 +116,84 @@ def test_fft_poisson():
                       )
 
     assert (error_E1 < 1e-14 and error_E2 < 1e-14)
+
+def redistribute_among_ranks(arrays, redistributions, name, shape):
+    # Carries out _redistribute for all the ranks at once, with the
+    # all-to-all exchange performed directly among the arrays passed:
+    arrays_out = []
+    for rank in range(len(arrays)):
+        array_out   = np.zeros(redistributions[rank]['shapes'][shape])
+        recv_slices = redistributions[rank][name][1]
+
+        for i in range(len(arrays)):
+            send_slices = redistributions[i][name][0]
+            array_out[recv_slices[i]] = arrays[i][send_slices[rank]]
+
+        arrays_out.append(array_out)
+
+    return(arrays_out)
+
+def test_slab_redistributions():
+    # Local zones of a 3 x 2 process grid, with the ranks ordered as
+    # by PETSc(varying fastest along q1). Taking N_k1 = N_q1, so that
+    # the redistributions to the slabs of k1 may be carried out on the
+    # arrays in q-space:
+    N_q1, N_q2 = 10, 7
+    local_zones = [(slice_q1, slice_q2) for slice_q2 in _split(N_q2, 2)
+                                        for slice_q1 in _split(N_q1, 3)
+                  ]
+
+    redistributions = [_slab_redistributions(local_zones, rank, N_q1, N_q2, N_q1)
+                       for rank in range(len(local_zones))
+                      ]
+
+    array  = np.random.rand(N_q1, N_q2)
+    arrays = [array[zone] for zone in local_zones]
+
+    q2_slabs = redistribute_among_ranks(arrays, redistributions, 
+                                        'to_q2_slabs', 'q2_slab'
+                                       )
+    k1_slabs = redistribute_among_ranks(q2_slabs, redistributions, 
+                                        'to_k1_slabs', 'k1_slab'
+                                       )
+
+    for rank in range(len(local_zones)):
+        assert (np.all(q2_slabs[rank] == array[:, _split(N_q2, 6)[rank]]))
+        assert (np.all(k1_slabs[rank] == array[_split(N_q1, 6)[rank]]))
+
+    # The inverse redistributions retrace these steps:
+    q2_slabs = redistribute_among_ranks(k1_slabs, redistributions, 
+                                        'from_k1_slabs', 'q2_slab_hat'
+                                       )
+    arrays_out = redistribute_among_ranks(q2_slabs, redistributions, 
+                                          'from_q2_slabs', 'local_zone'
+                                         )
+
+    for rank in range(len(local_zones)):
+        assert (np.all(arrays_out[rank] == arrays[rank]))
+
+def test_redistribute_round_trip():
+    # The redistributions through the slabs, and back are the identity:
+    N_q1, N_q2 = 10, 7
+    comm       = PETSc.COMM_SELF.tompi4py()
+
+    redistributions = _slab_redistributions([(slice(0, N_q1), slice(0, N_q2))], 0,
+                                            N_q1, N_q2, N_q1
+                                           )
+    shapes = redistributions['shapes']
+
+    array       = np.random.rand(N_q1, N_q2)
+    array_slabs = _redistribute(comm, array, *redistributions['to_q2_slabs'], 
+                                shapes['q2_slab']
+                               )
+    array_slabs = _redistribute(comm, array_slabs, *redistributions['to_k1_slabs'], 
+                                shapes['k1_slab']
+                               )
+    array_slabs = _redistribute(comm, array_slabs, *redistributions['from_k1_slabs'], 
+                                shapes['q2_slab_hat']
+                               )
+    array_out   = _redistribute(comm, array_slabs, *redistributions['from_q2_slabs'], 
+                                shapes['local_zone']
+                               )
+
+    assert (np.all(array_out == array))
@@ -9,6 +9,7 @@ are carried out as expected.
 """
 
 # Importing dependencies:
+import pytest
 import numpy as np
 import arrayfire as af
 import h5py
@@ -20,6 +21,8 @@ from bolt.lib.nonlinear_solver.file_io.dump \
 from bolt.lib.nonlinear_solver.file_io.load \
     import load_distribution_function
 
+from bolt.lib.nonlinear_solver.utils.shared_memory import shares_host_memory
+
 from bolt.lib.nonlinear_solver.compute_moments import \
     compute_moments as compute_moments_imported
 
@@ -83,13 +86,13 @@ class test(object):
                                                     stencil_width = self.N_ghost
                                                    )
 
-        self._glob_f       = self._da_dump_f.createGlobalVec()
-        self._glob_f_array = self._glob_f.getArray()
+        self._glob_dump_f       = self._da_dump_f.createGlobalVec()
+        self._glob_dump_f_array = self._glob_dump_f.getArray()
 
         self._glob_moments       = self._da_dump_moments.createGlobalVec()
         self._glob_moments_array =self._glob_moments.getArray()
 
-        PETSc.Object.setName(self._glob_f, 'distribution_function')
+        PETSc.Object.setName(self._glob_dump_f, 'distribution_function')
         PETSc.Object.setName(self._glob_moments, 'moments')
     
     compute_moments     = compute_moments_imported
@@ -99,7 +102,7 @@ def test_dump_load_distribution_function():
     test_obj = test()
     N_g      = test_obj.N_ghost
     
-    test_obj.f[:, N_g:-N_g,N_g:-N_g].to_ndarray(test_obj._glob_f_array)
+    test_obj.f[:, N_g:-N_g,N_g:-N_g].to_ndarray(test_obj._glob_dump_f_array)
     
     f_before_load = test_obj.f.copy()
 
@@ -110,6 +113,29 @@ def test_dump_load_distribution_function():
                         ))<1e-14
           )
 
+def test_dump_load_distribution_function_shared_memory():
+    # On the CPU backend, the Vec used in dump/load is backed by the memory 
+    # of af.Arrays(see place_af_array). The data needs to round-trip without
+    # going through the array of the Vec, which is restored after:
+    if(shares_host_memory() == False):
+        pytest.skip('The memory of af.Arrays is host memory only on the CPU backend')
+
+    test_obj = test()
+    N_g      = test_obj.N_ghost
+
+    test_obj._glob_dump_f_array[:] = -1
+    f_before_dump = test_obj.f.copy()
+
+    dump_distribution_function(test_obj, 'test_file')
+    test_obj.f = af.constant(0, *f_before_dump.dims(), dtype = af.Dtype.f64)
+    load_distribution_function(test_obj, 'test_file')
+
+    assert(af.max(af.abs(  test_obj.f[:, N_g:-N_g, N_g:-N_g] 
+                         - f_before_dump[:, N_g:-N_g, N_g:-N_g]
+                        )) == 0
+          )
+    assert(np.all(test_obj._glob_dump_f.getArray() == -1))
+
 def test_dump_moments():
     test_obj = test()
     N_g      = test_obj.N_ghost
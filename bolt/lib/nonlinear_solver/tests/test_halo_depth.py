@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+In the communication-avoiding mode(params.halo_depth = k > 1), the
+ghost zones are held k times as deep as needed by a single step, and
+are communicated only once every k steps. This test checks that the
+solution obtained in this mode is the same(upto round-off) as that
+obtained when communicating the ghost zones before each evaluation.
+This ensures that the depth of the ghost zones used up by each step
+(see get_ghost_width_per_step) is accounted for correctly.
+"""
+
+import pytest
+import numpy as np
+import arrayfire as af
+from petsc4py import PETSc
+
+from bolt.lib.nonlinear_solver.communicate import communicate_f, \
+                                                  communicate_f_begin, \
+                                                  communicate_f_end, \
+                                                  use_ghost_zones_f
+from bolt.lib.nonlinear_solver.interpolation_routines \
+    import f_interp_2d_overlapped
+from bolt.lib.nonlinear_solver.FVM_solver import timestep_df_dt
+from bolt.lib.nonlinear_solver.utils.ghost_zones \
+    import get_ghost_width_per_step, get_interior_slices
+from bolt.lib.nonlinear_solver.nonlinear_solver import nonlinear_solver
+
+calculate_q_center = nonlinear_solver._calculate_q_center
+
+class test(object):
+    def __init__(self, solver_method_in_q, halo_depth, fvm_integrator = 'RK2'):
+        self.physical_system = \
+            type('obj', (object, ),
+                 {'params': type('obj', (object, ),
+                                 {'solver_method_in_q' : solver_method_in_q,
+                                  'fvm_integrator'     : fvm_integrator,
+                                  'charge_electron'    : 0,
+                                  'fields_solver'      : 'fft'
+                                 }
+                                )
+                 }
+                )
+
+        # Ghost zones needed by each evaluation: The upwind differences
+        # used with the FVM below need 1, and the ASL needs 2:
+        N_g = 1 if (solver_method_in_q == 'FVM') else 2
+
+        self._halo_depth        = halo_depth
+        self._N_ghost_step      = N_g
+        self._valid_ghost_width = 0
+
+        if(halo_depth > 1):
+            self._N_ghost_step = \
+                get_ghost_width_per_step(self.physical_system.params, N_g)
+            N_g = halo_depth * self._N_ghost_step
+
+        self.N_ghost = N_g
+
+        self.N_q1 = self.N_q2 = 32
+        self.dq1  = self.dq2  = 1 / 32
+
+        self.N_p1 = self.N_p2 = self.N_p3 = 1
+
+        self._da_f = PETSc.DMDA().create([self.N_q1, self.N_q2],
+                                         stencil_width = self.N_ghost,
+                                         boundary_type = ('periodic', 'periodic'),
+                                         stencil_type  = 1
+                                        )
+
+        self._glob_f       = self._da_f.createGlobalVec()
+        self._glob_f_array = self._glob_f.getArray()
+
+        self.q1_start = self.q2_start = 0
+
+        self.q1_center, self.q2_center = calculate_q_center(self)
+
+        self._A_q1 = 1
+        self._A_q2 = 1
+
+        self.f = af.sin(2 * np.pi * self.q1_center + 4 * np.pi * self.q2_center)
+
+        self.performance_test_flag = False
+
+    def _apply_bcs_f(self):
+        return
+
+    _communicate_f       = communicate_f
+    _communicate_f_begin = communicate_f_begin
+    _communicate_f_end   = communicate_f_end
+    _use_ghost_zones_f   = use_ghost_zones_f
+
+    # Layout tracked state of the distribution function:
+    _f_version         = 0
+    _f_layout          = 'q_expanded'
+    f                  = nonlinear_solver.f
+    _get_f_in_layout   = nonlinear_solver._get_f_in_layout
+    _set_f_in_layout   = nonlinear_solver._set_f_in_layout
+    _convert_layout    = nonlinear_solver._convert_layout
+
+def df_dt_upwind(f, self):
+    # Upwind differences for the advection with unit speed along q1
+    # and q2. These use the zones (i - 1) and (j - 1) about each zone:
+    return(- (f - af.shift(f, 0, 1)) / self.dq1
+           - (f - af.shift(f, 0, 0, 1)) / self.dq2
+          )
+
+def f_interior(obj):
+    interior_q1, interior_q2 = get_interior_slices(obj)
+    return(obj.f[:, interior_q1, interior_q2])
+
+def check_halo_depth(solver_method_in_q, stepper, fvm_integrator = 'RK2'):
+    halo_depth = 3
+    dt         = 0.2 / 32
+
+    obj      = test(solver_method_in_q, 1, fvm_integrator)
+    obj_deep = test(solver_method_in_q, halo_depth, fvm_integrator)
+
+    # Taking steps over which the ghost zones are
+    # exchanged more than once in the deep halo mode:
+    for i in range(2 * halo_depth + 1):
+        stepper(obj, dt)
+        stepper(obj_deep, dt)
+
+    assert (af.max(af.abs(f_interior(obj) - f_interior(obj_deep))) < 1e-13)
+
+def check_halo_depth_fvm(stepper, fvm_integrator):
+    df_dt_fvm_q_imported           = timestep_df_dt.df_dt_fvm_q
+    df_dt_fvm_local_imported       = timestep_df_dt.df_dt_fvm_local
+    timestep_df_dt.df_dt_fvm_q     = df_dt_upwind
+    timestep_df_dt.df_dt_fvm_local = lambda f, self, *args, **kwargs: 0 * f
+
+    try:
+        check_halo_depth('FVM', stepper, fvm_integrator)
+
+    finally:
+        timestep_df_dt.df_dt_fvm_q     = df_dt_fvm_q_imported
+        timestep_df_dt.df_dt_fvm_local = df_dt_fvm_local_imported
+
+def test_halo_depth_ASL():
+    check_halo_depth('ASL', f_interp_2d_overlapped)
+
+def test_halo_depth_RK2():
+    check_halo_depth_fvm(timestep_df_dt.fvm_timestep_RK2, 'RK2')
+
+def test_halo_depth_SSPRK3():
+    check_halo_depth_fvm(timestep_df_dt.fvm_timestep_SSPRK3, 'SSPRK3')
+
+def test_halo_depth_invalid_integrator():
+    # The depth of the ghost zones used up by the steps
+    # of an unknown integrator can't be determined:
+    with pytest.raises(NotImplementedError):
+        test('FVM', 2, 'RK4')
@@ -8,6 +8,7 @@ distribution function array as we expect.
 
 
 # Importing dependencies:
+import pytest
 import numpy as np
 from numpy.fft import fftfreq
 import arrayfire as af
@@ -157,3 +158,53 @@ def test_initialize():
                 * af.exp(-0.5 * p3**2)
 
     assert(af.abs(af.abs(obj.f - f_ana))<1e-13)
+
+def physical_system_before_init(N_ghost, params, boundary_conditions = 'periodic'):
+    # Holds only the attributes which are read before any of the 
+    # data structures of the solver are created:
+    domain = {name: value for name in ['q1', 'q2', 'p1', 'p2', 'p3']
+                          for (name, value) in [(name + '_start', -1), 
+                                                (name + '_end',    1),
+                                                ('N_' + name,      8),
+                                                ('d' + name,       2 / 8)
+                                               ]
+             }
+
+    domain['N_ghost'] = N_ghost
+    domain['params']  = type('obj', (object, ), params)
+
+    domain['boundary_conditions'] = \
+        type('obj', (object, ), {'in_q1_left'   : boundary_conditions,
+                                 'in_q1_right'  : boundary_conditions,
+                                 'in_q2_bottom' : 'periodic',
+                                 'in_q2_top'    : 'periodic'
+                                }
+            )
+
+    return(type('obj', (object, ), domain))
+
+def test_N_ghost_below_minimum():
+    # weno5 needs 3 ghost zones:
+    system = physical_system_before_init(2, {'solver_method_in_q'         : 'FVM',
+                                             'reconstruction_method_in_q' : 'weno5'
+                                            }
+                                        )
+
+    with pytest.raises(Exception, match = 'N_ghost needs to be at least 3'):
+        nonlinear_solver(system)
+
+def test_split_p1_with_mirror_q1():
+    # The mirror of the block of p1 held by a rank is held by
+    # another rank, which isn't supported:
+    for boundary_conditions in ['mirror', 'mirror+dirichlet']:
+        system = physical_system_before_init(3, {'solver_method_in_q'         : 'FVM',
+                                                 'reconstruction_method_in_q' : 'weno5',
+                                                 'solver_method_in_p'         : 'FVM',
+                                                 'reconstruction_method_in_p' : 'minmod',
+                                                 'N_p1_procs'                 : 2
+                                                },
+                                             boundary_conditions
+                                            )
+
+        with pytest.raises(NotImplementedError, match = 'mirror boundary conditions'):
+            nonlinear_solver(system)
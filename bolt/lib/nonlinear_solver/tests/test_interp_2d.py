@@ -6,12 +6,15 @@ This test ensures that the convergence for the interpolation routine
 falls off with N^{-2}, where N is the number of divisions chosen.
 """
 
+import pytest
 import arrayfire as af
 import numpy as np
 from petsc4py import PETSc
 
 from bolt.lib.nonlinear_solver.interpolation_routines \
-    import f_interp_2d
+    import f_interp_2d, f_interp_2d_fft, f_interp_2d_overlapped
+from bolt.lib.nonlinear_solver.communicate \
+    import communicate_f, communicate_f_begin, communicate_f_end
 from bolt.lib.nonlinear_solver.nonlinear_solver import nonlinear_solver
 
 calculate_q_center = nonlinear_solver._calculate_q_center
@@ -21,9 +24,13 @@ class test(object):
         self._da_f = \
             PETSc.DMDA().create([N_q1, N_q2],
                                 stencil_width=N_ghost,
-                                boundary_type=('periodic', 'periodic')
+                                boundary_type=('periodic', 'periodic'),
+                                stencil_type=1
                                )
 
+        self._glob_f       = self._da_f.createGlobalVec()
+        self._glob_f_array = self._glob_f.getArray()
+
         self.N_q1 = N_q1
         self.N_q2 = N_q2
 
@@ -32,6 +39,8 @@ class test(object):
 
         self.N_ghost = N_ghost
 
+        self.N_p1 = self.N_p2 = self.N_p3 = 1
+
         self._A_q1 = 1
         self._A_q2 = 1
 
@@ -45,6 +54,21 @@ class test(object):
 
         self.performance_test_flag = False
 
+    def _apply_bcs_f(self):
+        return
+
+    _communicate_f       = communicate_f
+    _communicate_f_begin = communicate_f_begin
+    _communicate_f_end   = communicate_f_end
+
+    # Layout tracked state of the distribution function:
+    _f_version         = 0
+    _f_layout          = 'q_expanded'
+    f                  = nonlinear_solver.f
+    _get_f_in_layout   = nonlinear_solver._get_f_in_layout
+    _set_f_in_layout   = nonlinear_solver._set_f_in_layout
+    _convert_layout    = nonlinear_solver._convert_layout
+
 def test_f_interp_2d():
     N = 2**np.arange(5, 11)
     error = np.zeros(N.size)
@@ -59,3 +83,65 @@ def test_f_interp_2d():
 
     poly = np.polyfit(np.log10(N), np.log10(error), 1)
     assert (abs(poly[0] + 2) < 0.2)
+
+def test_f_interp_2d_fft():
+    # The Fourier space advection is exact for a resolved mode:
+    test_obj = test(32, 32, 3)
+    f_interp_2d_fft(test_obj, 0.1)
+    
+    f_analytic = af.sin(2 * np.pi * (test_obj.q1_center - 0.1) +
+                        4 * np.pi * (test_obj.q2_center - 0.1)
+                       )
+
+    error = af.max(af.abs(test_obj.f - f_analytic))
+    assert (error < 1e-12)
+
+def test_f_interp_2d_cached_departure_points():
+    # Repeated calls with the same dt need to reuse the departure points,
+    # and give the same result as advecting by the total time:
+    test_obj = test(64, 64, 3)
+    f_interp_2d(test_obj, 0.00001)
+    cache = test_obj._departure_indices_q_cache
+    f_interp_2d(test_obj, 0.00001)
+
+    assert (test_obj._departure_indices_q_cache is cache)
+
+    f_analytic = af.sin(2 * np.pi * (test_obj.q1_center - 0.00002) +
+                        4 * np.pi * (test_obj.q2_center - 0.00002)
+                       )
+    error = af.mean(af.abs(  test_obj.f[:, 3:-3, 3:-3] 
+                           - f_analytic[:, 3:-3, 3:-3]
+                          )
+                   )
+    assert (error < 1e-4)
+
+def test_f_interp_2d_overlapped():
+    # The overlapped communication needs to give the same result as the
+    # blocking communication followed by f_interp_2d. Local zones of size
+    # close to 2 * N_ghost check the strips about the inner zones, while
+    # the smaller local zones use the blocking communication:
+    for N in [6, 7, 8, 32]:
+        test_obj = test(N, N, 3)
+        f_interp_2d_overlapped(test_obj, 0.001)
+
+        test_obj_blocking = test(N, N, 3)
+        test_obj_blocking._communicate_f()
+        f_interp_2d(test_obj_blocking, 0.001)
+
+        assert (af.max(af.abs(test_obj.f - test_obj_blocking.f)) < 1e-13)
+
+def test_f_interp_2d_cfl_exceeds_ghost_zones():
+    # With N_ghost = 3, the departure points may lie at most 2 zones
+    # away, so that the stencil of the interpolation is in the ghost zones:
+    test_obj = test(32, 32, 3)
+    f_interp_2d(test_obj, 2 / 32)
+
+    test_obj = test(32, 32, 3)
+    with pytest.raises(Exception, match = 'exceeds N_ghost - 1'):
+        f_interp_2d(test_obj, 2.5 / 32)
+
+    # In the deep halo mode, the width valid for each step is used:
+    test_obj = test(32, 32, 6)
+    test_obj._N_ghost_step = 2
+    with pytest.raises(Exception, match = 'exceeds N_ghost - 1'):
+        f_interp_2d(test_obj, 1.5 / 32)
@@ -11,7 +11,8 @@ import numpy as np
 from petsc4py import PETSc
 
 from bolt.lib.nonlinear_solver.nonlinear_solver import nonlinear_solver
-from bolt.lib.nonlinear_solver.interpolation_routines import f_interp_p_3d
+from bolt.lib.nonlinear_solver.interpolation_routines \
+    import f_interp_p_3d, f_interp_p_shear_rotation
 from bolt.lib.nonlinear_solver.nonlinear_solver import nonlinear_solver
 
 calculate_q_center = nonlinear_solver._calculate_q_center
@@ -64,6 +65,14 @@ class test(object):
     _convert_to_p_expanded = convert_p_imported
     _convert_to_q_expanded = convert_q_imported
 
+    # Layout tracked state of the distribution function:
+    _f_version         = 0
+    _f_layout          = 'q_expanded'
+    f                  = nonlinear_solver.f
+    _get_f_in_layout   = nonlinear_solver._get_f_in_layout
+    _set_f_in_layout   = nonlinear_solver._set_f_in_layout
+    _convert_layout    = nonlinear_solver._convert_layout
+
 
 def test_f_interp_p_3d():
     N     = 2**np.arange(5, 9)
@@ -84,3 +93,39 @@ def test_f_interp_p_3d():
 
     poly = np.polyfit(np.log10(N), np.log10(error), 1)
     assert(abs(poly[0] + 2)<0.2)
+
+def test_f_interp_p_shear_rotation():
+    # Gyration by a quarter turn in the (p1, p2) plane, taken in
+    # a single step. For q/m = 1, B3 = 1, p = (2, 0) --> (0, -2)
+    obj = test(128)
+    
+    obj.N_p3 = 1
+    obj.dp3  = 1
+    obj.p1, obj.p2, obj.p3 = calculate_p_center(obj)
+
+    obj._da_f = PETSc.DMDA().create([obj.N_q1, obj.N_q2],
+                                    dof = obj.N_p1 * obj.N_p2 * obj.N_p3
+                                   )
+    
+    obj.q1_center = obj.q2_center = af.constant(0.5, 1, 1, 1, dtype = af.Dtype.f64)
+
+    obj.physical_system = \
+        type('obj', (object, ),
+             {'params': type('obj', (object, ), {'p_dim':2,
+                                                 'charge_electron':1,
+                                                 'mass_particle':1
+                                                }
+                            )
+             }
+            )
+
+    obj.cell_centered_EM_fields_at_n = af.constant(0, 6, 1, 1, dtype = af.Dtype.f64)
+    obj.cell_centered_EM_fields_at_n[5] = 1
+
+    obj.f = af.exp(-(obj.p1 - 2)**2 - obj.p2**2)
+    
+    f_interp_p_shear_rotation(obj, np.pi / 2)
+    
+    f_analytic = af.exp(-obj.p1**2 - (obj.p2 + 2)**2)
+
+    assert(af.max(af.abs(obj.f - f_analytic)) < 1e-2)
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+In this test we check that the 2D Poisson solver which uses
+PETSc's KSP works as intended. For this purpose, we assign
+a density distribution for which the analytical solution for
+electrostatic fields may be computed. The error in the solution
+given by the KSP solver is checked to fall off with N^{-2}, where
+N is the number of zones along each direction. This is checked for
+periodic boundaries, as well as for Dirichlet and Neumann boundaries
+along q1(on a DMDA with ghosted boundaries along q1), for which the
+potential is obtained from manufactured solutions.
+"""
+
+import numpy as np
+import arrayfire as af
+from petsc4py import PETSc
+
+from bolt.lib.nonlinear_solver.EM_fields_solver.electrostatic import ksp_poisson
+
+def density_periodic(q1, q2):
+    return (1 + af.sin(2 * np.pi * q1 + 4 * np.pi * q2))
+
+def compute_moments(self, *args):
+    return (self.density(self.q1, self.q2))
+
+class test(object):
+    def __init__(self, N, bc_q1 = 'periodic', density = density_periodic):
+
+        # Creating object:
+        self.physical_system = type('obj', (object, ),
+                                    {'params': type('obj', (object, ),
+                                     {'charge_electron': -1})
+                                    }
+                                   )
+
+        self.boundary_conditions = type('obj', (object, ),
+                                        {'in_q1_left'  :bc_q1,
+                                         'in_q1_right' :bc_q1,
+                                         'in_q2_bottom':'periodic',
+                                         'in_q2_top'   :'periodic'
+                                        }
+                                       )
+
+        self.N_q1 = N
+        self.N_q2 = N
+
+        self.dq1 = 1 / self.N_q1
+        self.dq2 = 1 / self.N_q2
+
+        self.N_ghost = np.random.randint(1, 4)
+
+        self.q1 = (0.5 + np.arange(-self.N_ghost, self.N_q1 + self.N_ghost)) * self.dq1
+        self.q2 = (0.5 + np.arange(-self.N_ghost, self.N_q2 + self.N_ghost)) * self.dq2
+
+        self.q2, self.q1 = np.meshgrid(self.q2, self.q1)
+        self.q2, self.q1 = af.reorder(af.to_array(self.q2), 2, 0, 1),\
+                           af.reorder(af.to_array(self.q1), 2, 0, 1)
+
+        self.cell_centered_EM_fields = af.constant(0, 6, self.q1.shape[1],
+                                                   self.q1.shape[2],
+                                                   dtype=af.Dtype.f64
+                                                  )
+
+        self._comm = PETSc.COMM_WORLD.tompi4py()
+
+        self._da_ksp = PETSc.DMDA().create([self.N_q1, self.N_q2],
+                                           stencil_width=self.N_ghost,
+                                           boundary_type=('periodic' if bc_q1 == 'periodic' 
+                                                          else 'ghosted',
+                                                          'periodic'),
+                                           stencil_type=1, 
+                                          )
+        
+        self.density = density
+        
+        self.performance_test_flag = False
+
+    compute_moments = compute_moments
+
+def test_ksp_poisson():
+    N     = 2**np.arange(5, 8)
+    error = np.zeros(N.size)
+
+    for i in range(N.size):
+        obj = test(int(N[i]))
+        ksp_poisson(obj)
+
+        E1_expected = (0.1 / np.pi) * af.cos(  2 * np.pi * obj.q1
+                                             + 4 * np.pi * obj.q2
+                                            )
+
+        N_g = obj.N_ghost
+
+        error[i] = af.mean(af.abs(  obj.cell_centered_EM_fields[0, N_g:-N_g, N_g:-N_g] 
+                                  - E1_expected[0, N_g:-N_g, N_g:-N_g]
+                                 )
+                          )
+
+    poly = np.polyfit(np.log10(N), np.log10(error), 1)
+    assert (abs(poly[0] + 2) < 0.2)
+
+def check_ksp_poisson_q1_boundaries(bc_q1, phi, E1):
+    # rho = charge_electron * density = -laplacian(phi) = 5 * pi^2 * phi
+    # for the potentials considered, with charge_electron = -1:
+    density = lambda q1, q2: -5 * np.pi**2 * phi(q1, q2)
+
+    N     = 2**np.arange(5, 8)
+    error = np.zeros(N.size)
+
+    for i in range(N.size):
+        obj = test(int(N[i]), bc_q1, density)
+        ksp_poisson(obj)
+
+        N_g = obj.N_ghost
+
+        # The zones adjacent to the edges are included, which checks the
+        # values taken in the ghost zones beyond the edges for phi:
+        error[i] = af.max(af.abs(  obj.cell_centered_EM_fields[0, N_g:-N_g, N_g:-N_g] 
+                                 - E1(obj.q1, obj.q2)[0, N_g:-N_g, N_g:-N_g]
+                                )
+                         )
+
+    poly = np.polyfit(np.log10(N), np.log10(error), 1)
+    assert (abs(poly[0] + 2) < 0.2)
+
+def test_ksp_poisson_dirichlet():
+    # phi = 0 at q1 = 0, 1:
+    phi = lambda q1, q2: af.sin(np.pi * q1) * af.cos(2 * np.pi * q2)
+    E1  = lambda q1, q2: -np.pi * af.cos(np.pi * q1) * af.cos(2 * np.pi * q2)
+
+    check_ksp_poisson_q1_boundaries('dirichlet', phi, E1)
+
+def test_ksp_poisson_neumann():
+    # dphi/dq1 = 0 at q1 = 0, 1. Along with the periodic boundaries 
+    # along q2, phi is defined up to a constant(using the null space):
+    phi = lambda q1, q2: af.cos(np.pi * q1) * af.cos(2 * np.pi * q2)
+    E1  = lambda q1, q2: np.pi * af.sin(np.pi * q1) * af.cos(2 * np.pi * q2)
+
+    check_ksp_poisson_q1_boundaries('mirror', phi, E1)
+
+def test_ksp_poisson_nullspace():
+    obj = test(32, 'mirror')
+    ksp_poisson(obj)
+    assert (obj._poisson_bcs['q1_left'] == 'neumann')
+    assert (obj._poisson_nullspace is not None)
+
+    obj = test(32, 'dirichlet')
+    ksp_poisson(obj)
+    assert (obj._poisson_nullspace is None)
+
+def test_ksp_poisson_warm_start():
+    # The solver is created once, and the potential from the previous
+    # solve is used as the initial guess, so that solving again for the
+    # same density needs fewer iterations:
+    obj = test(64)
+    ksp_poisson(obj)
+    
+    ksp        = obj._ksp_poisson
+    iterations = ksp.getIterationNumber()
+
+    ksp_poisson(obj)
+    
+    assert (obj._ksp_poisson is ksp)
+    assert (ksp.getIterationNumber() < iterations)
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Checks the minimum number of ghost zones which is determined from
+the methods chosen under params, which is used when N_ghost is set
+to 'auto', and as the lower bound on the value of N_ghost passed.
+"""
+
+import pytest
+
+from bolt.lib.nonlinear_solver.utils.ghost_zones import get_minimum_ghost_width
+
+def params(solver_method_in_q, reconstruction_method_in_q = None):
+    return(type('obj', (object, ), 
+                {'solver_method_in_q'         : solver_method_in_q,
+                 'reconstruction_method_in_q' : reconstruction_method_in_q
+                }
+               )
+          )
+
+def test_get_minimum_ghost_width():
+    expected = [(params('FVM', 'piecewise-constant'), 1),
+                (params('FVM', 'minmod'),             2),
+                (params('FVM', 'ppm'),                3),
+                (params('FVM', 'weno5'),              3),
+                (params('ASL'),                       2),
+                # The reconstruction method is unused with ASL:
+                (params('ASL', 'weno5'),              2)
+               ]
+
+    for method_params, N_ghost in expected:
+        assert (get_minimum_ghost_width(method_params) == N_ghost)
+
+def test_get_minimum_ghost_width_invalid():
+    with pytest.raises(NotImplementedError):
+        get_minimum_ghost_width(params('FVM', 'weno7'))
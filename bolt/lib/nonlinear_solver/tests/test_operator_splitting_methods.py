@@ -96,3 +96,17 @@ def test_jia_split_operations():
 
     poly = np.polyfit(np.log10(number_of_time_step), np.log10(error), 1)
     assert (abs(poly[0] + 4) < 0.2)
+
+def test_strang_split_operations_merged_steps():
+
+    number_of_time_step = 10**np.arange(3)
+    time_step_sizes     = 1 / number_of_time_step
+    error = np.zeros(time_step_sizes.size)
+
+    for i in range(time_step_sizes.size):
+        test_obj = test()
+        strang(test_obj, op1, op2, time_step_sizes[i], number_of_time_step[i])
+        error[i] = abs(af.sum(test_obj.f) - np.exp(1) + 1)
+
+    poly = np.polyfit(np.log10(number_of_time_step), np.log10(error), 1)
+    assert (abs(poly[0] + 2) < 0.2)
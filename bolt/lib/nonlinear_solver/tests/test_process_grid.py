@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+This test checks that the process grid chosen for the DMDAs minimizes
+the volume of the ghost zones exchanged, and that this volume is 
+counted correctly for periodic and non-periodic domains.
+"""
+
+from bolt.lib.nonlinear_solver.utils.ghost_zones import \
+    get_exchange_bytes, choose_process_grid
+
+def test_get_exchange_bytes():
+    # 2 x 1 grid on a 8 x 4 domain, with 1 ghost zone and dof = 1:
+    # Periodic: Each local zone(4 x 4) receives (6 * 6 - 16) zones
+    assert (get_exchange_bytes((2, 1), 8, 4, 1, 1, 1, True, True) == 8 * 2 * 20)
+    # Non-periodic: Each local zone only receives along the shared edge
+    assert (get_exchange_bytes((2, 1), 8, 4, 1, 1, 1, False, False) == 8 * 2 * 4)
+
+def test_choose_process_grid():
+    # Skewed domains are split along the longer axis:
+    assert (choose_process_grid(4, 1024, 8, 3, 3, 1, True, True) == (4, 1))
+    assert (choose_process_grid(4, 8, 1024, 3, 3, 1, True, True) == (1, 4))
+    # Square domains are split evenly:
+    assert (choose_process_grid(16, 256, 256, 3, 3, 1, True, True) == (4, 4))
+    # Domains degenerate along q2:
+    assert (choose_process_grid(6, 256, 1, 3, 0, 1, True, True) == (6, 1))
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+riemann_flux_difference evaluates the Riemann solve at the faces
+of the cells along with the difference of the fluxes at the faces,
+without forming the fluxes at the faces. This test checks the result
+against the fluxes formed at the faces first, for both the upwind
+and the Lax-Friedrichs fluxes, along q1 and q2.
+"""
+
+import numpy as np
+import arrayfire as af
+
+from bolt.lib.nonlinear_solver.FVM_solver.riemann_solver \
+    import riemann_flux_difference
+
+class test(object):
+    def __init__(self, riemann_solver, C_q_varies_in_q):
+        self.physical_system = \
+            type('obj', (object, ),
+                 {'params': type('obj', (object, ),
+                                 {'riemann_solver': riemann_solver})
+                 }
+                )
+
+        self.N_p  = 8
+        self.N_q1 = 16
+        self.N_q2 = 12
+
+        self.dq1 = 1 / self.N_q1
+        self.dq2 = 1 / self.N_q2
+        self.dt  = 0.001
+
+        # Advection terms with either sign, which are either
+        # uniform in q-space or vary in q-space:
+        if(C_q_varies_in_q == True):
+            shape = (self.N_p, self.N_q1, self.N_q2)
+        else:
+            shape = (self.N_p, 1, 1)
+
+        self._C_q1 = af.to_array(np.random.rand(*shape) - 0.5)
+        self._C_q2 = af.to_array(np.random.rand(*shape) - 0.5)
+
+        self.performance_test_flag = False
+
+def random_array(obj):
+    return(af.to_array(np.random.rand(obj.N_p, obj.N_q1, obj.N_q2)))
+
+def flux_difference_at_faces(self, plus_eps_flux, minus_eps_flux,
+                             f_plus_eps, f_minus_eps, dim
+                            ):
+    # The numerical flux is formed at the left face of each cell,
+    # and the difference is taken with that at the right face:
+    if(dim == 'q1'):
+        shift    = lambda array, n: af.shift(array, 0, n)
+        velocity = self._C_q1
+        dq       = self.dq1
+
+    else:
+        shift    = lambda array, n: af.shift(array, 0, 0, n)
+        velocity = self._C_q2
+        dq       = self.dq2
+
+    # Values from the cell to the left of the face, and the right of the face:
+    left_flux, right_flux = shift(minus_eps_flux, 1), plus_eps_flux
+    left_f,    right_f    = shift(f_minus_eps, 1),    f_plus_eps
+
+    if(self.physical_system.params.riemann_solver == 'upwind-flux'):
+        velocity = af.broadcast(lambda a, b: a + 0 * b, velocity, left_flux)
+        flux     = af.select(velocity > 0, left_flux, right_flux)
+
+    else:
+        flux =   0.5 * (left_flux + right_flux) \
+               - 0.5 * (self.dt / dq) * (right_f - left_f)
+
+    return(shift(flux, -1) - flux)
+
+def check_riemann_flux_difference(riemann_solver, C_q_varies_in_q):
+    obj = test(riemann_solver, C_q_varies_in_q)
+
+    for dim in ['q1', 'q2']:
+        arrays = [random_array(obj) for i in range(4)]
+
+        expected = flux_difference_at_faces(obj, *arrays, dim)
+        result   = riemann_flux_difference(obj, *arrays, dim)
+
+        assert (af.max(af.abs(result - expected)) < 1e-14)
+
+def test_riemann_flux_difference_upwind():
+    check_riemann_flux_difference('upwind-flux', False)
+    check_riemann_flux_difference('upwind-flux', True)
+
+def test_riemann_flux_difference_lax_friedrichs():
+    check_riemann_flux_difference('lax-friedrichs', False)
+    check_riemann_flux_difference('lax-friedrichs', True)
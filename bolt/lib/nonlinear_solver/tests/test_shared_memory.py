@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+On the CPU backend, the PETSc.Vecs may be backed by the memory of
+af.Arrays. This test ensures that the changes made through the Vec
+are reflected in the af.Array, and that the Vec is restored after.
+"""
+
+import pytest
+import numpy as np
+import arrayfire as af
+from petsc4py import PETSc
+
+from bolt.lib.nonlinear_solver.utils.shared_memory import \
+    shares_host_memory, place_af_array, reset_af_array
+
+def test_place_af_array():
+    if(shares_host_memory() == False):
+        pytest.skip('The memory of af.Arrays is host memory only on the CPU backend')
+
+    vec = PETSc.Vec().createSeq(16, comm = PETSc.COMM_SELF)
+    vec.set(1)
+
+    array = place_af_array(vec, af.to_array(np.arange(16.)))
+    vec.scale(2)
+    reset_af_array(vec, array)
+
+    assert (af.max(af.abs(array - 2 * af.to_array(np.arange(16.)))) == 0)
+    assert (np.all(vec.getArray() == 1))
@@ -12,7 +12,8 @@ import numpy as np
 import arrayfire as af
 
 from bolt.lib.nonlinear_solver.temporal_evolution.integrators \
-    import RK2, RK4, RK5
+    import RK2, RK4, RK5, exponential_relaxation
+from bolt.lib.nonlinear_solver.FVM_solver import timestep_df_dt
 
 class test(object):
     def __init__(self):
@@ -68,3 +69,82 @@ def test_RK5():
 
     poly = np.polyfit(np.log10(number_of_time_step), np.log10(error), 1)
     assert (abs(poly[0] + 5) < 0.2)
+
+
+# This test ensures that the exponential relaxation update is exact
+# for df/dt = -(f - f0)/tau, irrespective of the time-step size:
+def test_exponential_relaxation():
+    f0  = 2.0
+    tau = 0.001
+
+    relaxation = lambda f:-(f - f0) / tau
+
+    for dt in [1e-5, 1e-2, 1]:
+        f = af.to_array(np.array([1.0]))
+        f = exponential_relaxation(relaxation, f, dt, tau)
+
+        assert (abs(af.sum(f) - (f0 + (1 - f0) * np.exp(-dt / tau))) < 1e-12)
+
+    f = exponential_relaxation(lambda f:0 * f, af.to_array(np.array([1.0])), 1, np.inf)
+    assert (af.sum(f) == 1)
+
+
+# Tests for the low-storage SSP methods used with the FVM:
+class test_fvm(object):
+    def __init__(self):
+        self.f = af.to_array(np.array([1.0]))
+
+        self.physical_system = \
+            type('obj', (object, ),
+                 {'params': type('obj', (object, ), {'charge_electron':0,
+                                                     'fields_solver':'fft'
+                                                    }
+                                )
+                 }
+                )
+
+    def _communicate_f(self):
+        return
+
+    def _communicate_f_begin(self):
+        return
+
+    def _communicate_f_end(self):
+        return
+
+    def _apply_bcs_f(self):
+        return
+
+
+def check_fvm_order(stepper, order, number_of_time_step):
+    # Replacing df_dt_fvm by the test problem df/dt = f. The test
+    # problem is local, and is taken up entirely by df_dt_fvm_local:
+    df_dt_fvm_q_imported           = timestep_df_dt.df_dt_fvm_q
+    df_dt_fvm_local_imported       = timestep_df_dt.df_dt_fvm_local
+    timestep_df_dt.df_dt_fvm_q     = lambda f, self: 0 * f
+    timestep_df_dt.df_dt_fvm_local = lambda f, self, *args, **kwargs: f
+    
+    time_step_sizes = 1 / number_of_time_step
+    error = np.zeros(time_step_sizes.size)
+
+    try:
+        for i in range(time_step_sizes.size):
+            test_obj = test_fvm()
+            for j in range(number_of_time_step[i]):
+                stepper(test_obj, time_step_sizes[i])
+            error[i] = abs(af.sum(test_obj.f) - np.exp(1))
+
+    finally:
+        timestep_df_dt.df_dt_fvm_q     = df_dt_fvm_q_imported
+        timestep_df_dt.df_dt_fvm_local = df_dt_fvm_local_imported
+
+    poly = np.polyfit(np.log10(number_of_time_step), np.log10(error), 1)
+    assert (abs(poly[0] + order) < 0.2)
+
+
+def test_fvm_SSPRK3():
+    check_fvm_order(timestep_df_dt.fvm_timestep_SSPRK3, 3, 10**np.arange(4))
+
+
+def test_fvm_SSPRK104():
+    check_fvm_order(timestep_df_dt.fvm_timestep_SSPRK104, 4, 10**np.arange(3))
@@ -3,6 +3,7 @@
 
 import arrayfire as af
 import numpy as np
+from mpi4py import MPI
 
 # Importing functions used used for time-splitting and time-stepping:
 from .temporal_evolution import operator_splitting_methods as split
@@ -10,22 +11,30 @@ from .temporal_evolution import integrators
 
 # Importing solver functions:
 from .FVM_solver.df_dt_fvm import df_dt_fvm
-from .FVM_solver.timestep_df_dt import fvm_timestep_RK2
+from .FVM_solver.timestep_df_dt import fvm_timestep_RK2, \
+                                       fvm_timestep_SSPRK3, \
+                                       fvm_timestep_SSPRK104
 
-from .interpolation_routines import f_interp_2d
+from .interpolation_routines import f_interp_2d_overlapped, f_interp_2d_fft
 from .EM_fields_solver.fields_step import fields_step
 
 # Defining the operators:
 # When using FVM:
 def op_fvm_q(self, dt):
-    
-    self._communicate_f()
-    self._apply_bcs_f()
-
+    # The communication of the ghost zones of f is carried out by
+    # the timesteppers, and is overlapped with the computation of 
+    # the terms which don't need the ghost zones:
     if(self.performance_test_flag == True):
         tic = af.time()
 
-    fvm_timestep_RK2(self, dt)
+    if(self._fvm_integrator == 'SSPRK3'):
+        fvm_timestep_SSPRK3(self, dt)
+    
+    elif(self._fvm_integrator == 'SSPRK104'):
+        fvm_timestep_SSPRK104(self, dt)
+
+    else:
+        fvm_timestep_RK2(self, dt)
 
     if(self.performance_test_flag == True):
         af.sync()
@@ -33,11 +42,7 @@ def op_fvm_q(self, dt):
         self.time_fvm_solver += toc - tic
     
     # Solving for tau = 0 systems
-    if(af.any_true(self.physical_system.params.tau(self.q1_center, self.q2_center,
-                                                   self.p1, self.p2, self.p3
-                                                  ) == 0
-                  )
-      ):
+    if(self._collision_regime == 'tau_zero'):
         if(self.performance_test_flag == True):
             tic = af.time()
 
@@ -59,9 +64,15 @@ def op_fvm_q(self, dt):
 # When using advective SL method:
 # Advection in q-space:
 def op_advect_q(self, dt):
-    self._communicate_f()
-    self._apply_bcs_f()
-    f_interp_2d(self, dt)
+    # When A_q is independent of q, and the system is periodic,
+    # the advection is performed exactly in Fourier space:
+    if(self._fft_advect_q == True):
+        f_interp_2d_fft(self, dt)
+    
+    # The communication of the ghost zones of f is overlapped with
+    # the interpolation in the interior of the local zone:
+    else:
+        f_interp_2d_overlapped(self, dt)
 
     return
 
@@ -71,12 +82,12 @@ def op_solve_src(self, dt):
     if(self.performance_test_flag == True):
         tic = af.time()
 
+    # No changes are made to f for collisionless systems:
+    if(self._collision_regime == 'collisionless'):
+        pass
+
     # Solving for tau = 0 systems
-    if(af.any_true(self.physical_system.params.tau(self.q1_center, self.q2_center,
-                                                   self.p1, self.p2, self.p3
-                                                  ) == 0
-                  )
-      ):
+    elif(self._collision_regime == 'tau_zero'):
         self.f = self._source(self.f, self.q1_center, self.q2_center,
                               self.p1, self.p2, self.p3, 
                               self.compute_moments, 
@@ -84,6 +95,16 @@ def op_solve_src(self, dt):
                               True
                              ) 
 
+    # Exact update for relaxation type sources:
+    elif(self._source_integrator == 'exponential'):
+        self.f = integrators.exponential_relaxation(self._source, self.f, dt,
+                                                    self._tau,
+                                                    self.q1_center, self.q2_center,
+                                                    self.p1, self.p2, self.p3, 
+                                                    self.compute_moments, 
+                                                    self.physical_system.params
+                                                   )
+
     else:
         self.f = integrators.RK2(self._source, self.f, dt,
                                  self.q1_center, self.q2_center,
@@ -165,17 +186,28 @@ def lie_step(self, dt):
 
     return
 
-def strang_step(self, dt):
+def strang_step(self, dt, N_steps = 1):
     """
     Advances the system using a strang-split 
     scheme. This scheme is 2nd order accurate in
     time.
 
+    When N_steps > 1, the system is evolved by N_steps
+    time-steps in a single call, and the adjacent half-steps 
+    of the first split operator(q-advection) of consecutive 
+    time-steps are merged into a single full step. The operators
+    are only split back at the end of the call, so this should be
+    used to advance the system between consecutive outputs/dumps.
+
     Parameters
     ----------
 
     dt : float
          Time-step size to evolve the system
+
+    N_steps : int
+              Number of time-steps to evolve the system by.
+              Defaults to 1.
     """
     self.dt            = dt
 
@@ -187,16 +219,17 @@ def strang_step(self, dt):
         if(    self.physical_system.params.solver_method_in_p == 'ASL'
            and self.physical_system.params.charge_electron != 0
           ):
-            split.strang(self, op_fvm_q, op_fields, dt)
+            split.strang(self, op_fvm_q, op_fields, dt, N_steps)
 
         else:
-            op_fvm_q(self, dt)
+            for i in range(N_steps):
+                op_fvm_q(self, dt)
 
     # Advective Semi-lagrangian method
     elif(self.physical_system.params.solver_method_in_q == 'ASL'):
 
         if(self.physical_system.params.charge_electron == 0):
-            split.strang(self, op_advect_q, op_solve_src, dt)
+            split.strang(self, op_advect_q, op_solve_src, dt, N_steps)
 
         else:
             def op_advect_q_and_solve_src(self, dt):
@@ -207,10 +240,10 @@ def strang_step(self, dt):
                                    )
                       )
 
-            split.strang(self, op_advect_q_and_solve_src, op_fields, dt)
+            split.strang(self, op_advect_q_and_solve_src, op_fields, dt, N_steps)
     
     check_divergence(self)
-    self.time_elapsed += dt 
+    self.time_elapsed += N_steps * dt 
 
     if(self.performance_test_flag == True):
         af.sync()
@@ -328,3 +361,133 @@ def jia_step(self, dt):
         self.time_ts += toc - tic
 
     return
+
+def _max_abs(array):
+    if(isinstance(array, af.Array)):
+        return(af.max(af.abs(array)))
+    else:
+        return(abs(array))
+
+def compute_stable_dt(self, N_cfl = 0.5):
+    """
+    Returns the largest time-step which satisfies the CFL condition
+    along all the dimensions of the phase space. The advection terms
+    in p-space are evaluated using the current values of the
+    cell-centered EM fields.
+
+    Parameters
+    ----------
+
+    N_cfl : float
+            CFL number to be used. Defaults to 0.5
+    """
+    # Inverse of the time taken to cross a cell along each dimension:
+    inverse_dt = [_max_abs(self._A_q1) / self.dq1, _max_abs(self._A_q2) / self.dq2]
+
+    if(self.physical_system.params.charge_electron != 0):
+
+        E1 = self.cell_centered_EM_fields[0]
+        E2 = self.cell_centered_EM_fields[1]
+        E3 = self.cell_centered_EM_fields[2]
+
+        B1 = self.cell_centered_EM_fields[3]
+        B2 = self.cell_centered_EM_fields[4]
+        B3 = self.cell_centered_EM_fields[5]
+
+        (A_p1, A_p2, A_p3) = af.broadcast(self._A_p, self.q1_center, self.q2_center,
+                                          self.p1, self.p2, self.p3,
+                                          E1, E2, E3, B1, B2, B3,
+                                          self.physical_system.params
+                                         )
+
+        inverse_dt.append(_max_abs(A_p1) / self.dp1)
+        inverse_dt.append(_max_abs(A_p2) / self.dp2)
+
+        if(self.physical_system.params.p_dim == 3):
+            inverse_dt.append(_max_abs(A_p3) / self.dp3)
+
+    inverse_dt = self._comm_world.allreduce(max(inverse_dt), op = MPI.MAX)
+
+    if(inverse_dt == 0):
+        return(np.inf)
+
+    return(N_cfl / inverse_dt)
+
+def evolve(self, t_final, N_cfl = 0.5, error_tolerance = 1e-3):
+    """
+    Evolves the system till time t_final, using strang split steps of
+    size chosen automatically. The time-step is taken as the stable
+    time-step(see compute_stable_dt) which is recomputed each step, so
+    that the time-step adjusts to the growth/decay of the fields. The 
+    last step is shortened to end exactly at t_final.
+
+    When the FVM is used in q-space, the embedded error estimate of the
+    FVM stepper(against forward Euler) is also used: steps with a relative
+    error above error_tolerance are rejected and retaken with a smaller 
+    time-step.
+
+    Parameters
+    ----------
+
+    t_final : float
+              Time till which the system is to be evolved.
+
+    N_cfl : float
+            CFL number to be used. Defaults to 0.5
+
+    error_tolerance : float
+                      Tolerance for the relative error estimate when
+                      using the FVM in q-space. Defaults to 1e-3
+    """
+    adaptive = (self.physical_system.params.solver_method_in_q == 'FVM')
+    
+    # Time-step limit set by the error control:
+    dt_error = np.inf
+
+    # Used to restore the state of the system on rejected steps:
+    fields_names = [name for name in ['cell_centered_EM_fields',
+                                      'cell_centered_EM_fields_at_n',
+                                      'cell_centered_EM_fields_at_n_plus_half',
+                                      'yee_grid_EM_fields'
+                                     ]
+                    if hasattr(self, name)
+                   ]
+
+    # Tolerance used in comparing the floating point times:
+    eps = 1e-12 * max(abs(t_final), 1)
+
+    while(self.time_elapsed < t_final - eps):
+
+        dt = min(compute_stable_dt(self, N_cfl), dt_error,
+                 t_final - self.time_elapsed
+                )
+
+        if(adaptive == False):
+            self.strang_timestep(dt)
+            continue
+
+        f_start      = self.f
+        fields_start = [getattr(self, name).copy() for name in fields_names]
+        time_start   = self.time_elapsed
+
+        self._estimate_error = True
+        self._error_estimate = 0
+        self.strang_timestep(dt)
+        self._estimate_error = False
+
+        error = self._comm_world.allreduce(self._error_estimate, op = MPI.MAX)
+
+        # Controller for the size of the next step:
+        if(error == 0):
+            dt_error = 2 * dt
+        else:
+            dt_error = dt * min(2, max(0.2, 0.9 * (error_tolerance / error)**0.5))
+
+        if(error > error_tolerance):
+            # Rejecting the step, and restoring the state:
+            self.f            = f_start
+            self.time_elapsed = time_start
+            for name, field in zip(fields_names, fields_start):
+                setattr(self, name, field)
+    
+    return
@@ -0,0 +1,188 @@
+# The following functions are used in handling the local zones, 
+# and the ghost zones held along q1 and q2. When the domain is
+# degenerate along q2(N_q2 = 1), 1D DMDAs are used and no ghost
+# zones are held along q2.
+
+def get_local_corners(da):
+    """
+    Returns ((i_q1_start, i_q2_start), (N_q1_local, N_q2_local)) for
+    the local zone of the DMDA. For 1D DMDAs, the local zone is taken
+    to span the single zone along q2.
+    """
+    corners = da.getCorners()
+
+    if(da.getDim() == 1):
+        return(((corners[0][0], 0), (corners[1][0], 1)))
+
+    return(corners)
+
+def get_ghost_widths(self):
+    """
+    Returns the number of ghost zones held along q1 and q2.
+    """
+    return(self.N_ghost, getattr(self, 'N_ghost_q2', self.N_ghost))
+
+def get_interior_slices(self):
+    """
+    Returns the slices along q1 and q2 which select the zones of 
+    the local zone, without the ghost zones.
+    """
+    N_g_q1, N_g_q2 = get_ghost_widths(self)
+
+    return(slice(N_g_q1, -N_g_q1 or None), slice(N_g_q2, -N_g_q2 or None))
+
+# Number of ghost zones needed by the reconstruction methods used by 
+# the FVM: the face values of each zone use a stencil of half-width
+# (width - 1), and the Riemann problem at the face of the first zone
+# of the local zone also needs the face value of the zone before it:
+reconstruction_ghost_widths = {'piecewise-constant' : 1,
+                               'minmod'             : 2,
+                               'ppm'                : 3,
+                               'weno5'              : 3
+                              }
+
+def get_minimum_ghost_width(params):
+    """
+    Returns the minimum number of ghost zones needed by the methods
+    chosen under params:
+
+    - FVM: Determined by reconstruction_method_in_q.
+    - ASL: The bicubic spline interpolation uses the zones i-1 to i+2 
+           about the departure point, which lies within a zone of the 
+           arrival point for CFL numbers below 1. Needs 2 zones.
+           Larger time-steps need N_ghost > CFL + 1, which is checked
+           when the departure points are computed.
+    - FDTD: The Yee-grid updates, and the averaging of the currents 
+            and fields onto the Yee-grid use the adjacent zones.
+            Needs 1 zone.
+
+    The boundary conditions fill the ghost zones(from the physical domain 
+    for mirror, and from the user-defined functions for Dirichlet), and 
+    don't need any additional zones.
+    """
+    N_ghost = 1
+
+    if(params.solver_method_in_q == 'FVM'):
+        
+        if(params.reconstruction_method_in_q not in reconstruction_ghost_widths):
+            raise NotImplementedError('Reconstruction method invalid/not-implemented')
+        
+        N_ghost = max(N_ghost, 
+                      reconstruction_ghost_widths[params.reconstruction_method_in_q]
+                     )
+
+    elif(params.solver_method_in_q == 'ASL'):
+        N_ghost = max(N_ghost, 2)
+
+    return(N_ghost)
+
+# Number of evaluations of df/dt in a step of the time integrators
+# used with the FVM. Each of these uses up the ghost zones needed by
+# the reconstruction when the stages aren't separated by exchanges:
+fvm_integrator_stages = {'RK2'      : 2,
+                         'SSPRK3'   : 3,
+                         'SSPRK104' : 10
+                        }
+
+def get_ghost_width_per_step(params, N_ghost):
+    """
+    Returns the number of ghost zones of f which are used up by a step
+    which isn't separated from the previous step by an exchange of the
+    ghost zones, when each evaluation needs N_ghost zones:
+
+    - FVM: N_ghost for each stage of fvm_integrator.
+    - ASL: N_ghost for each advection in q-space.
+    """
+    if(params.solver_method_in_q == 'FVM'):
+        fvm_integrator = getattr(params, 'fvm_integrator', 'RK2')
+
+        if(fvm_integrator not in fvm_integrator_stages):
+            raise NotImplementedError('Unavailable/Invalid FVM integrator')
+
+        return(N_ghost * fvm_integrator_stages[fvm_integrator])
+
+    return(N_ghost)
+
+def get_halo_bytes(da, N_ghost, N_ghost_q2):
+    """
+    Returns the size in bytes(for double precision) of the ghost zones
+    held in the local zone of the DMDA, for the given ghost zone widths.
+    """
+    ((i_q1_start, i_q2_start), (N_q1_local, N_q2_local)) = get_local_corners(da)
+
+    N_zones_ghosted = (N_q1_local + 2 * N_ghost) * (N_q2_local + 2 * N_ghost_q2)
+    N_zones         = N_q1_local * N_q2_local
+
+    return(8 * da.getDof() * (N_zones_ghosted - N_zones))
+
+def get_exchange_bytes(proc_sizes, N_q1, N_q2, N_ghost, N_ghost_q2, dof,
+                       periodic_q1, periodic_q2
+                      ):
+    """
+    Returns the number of bytes(for double precision) received by all the
+    ranks in a single exchange of the ghost zones(including the corners),
+    for the process grid proc_sizes = (N_procs_q1, N_procs_q2). The local
+    zones are taken to be split as evenly as possible, as done by PETSc.
+    The ghost zones beyond the edges of the domain which aren't periodic
+    aren't communicated.
+    """
+    def local_sizes(N, N_procs):
+        return([N // N_procs + (1 if i < N % N_procs else 0) for i in range(N_procs)])
+
+    def received_widths(N_procs, N_g, periodic):
+        # Widths of the ghost zones received at the start, and the end:
+        return([(N_g if (periodic or i > 0) else 0,
+                 N_g if (periodic or i < N_procs - 1) else 0
+                )
+                for i in range(N_procs)
+               ]
+              )
+
+    N_zones_received = 0
+    for N_q1_local, (start_q1, end_q1) in zip(local_sizes(N_q1, proc_sizes[0]),
+                                              received_widths(proc_sizes[0], N_ghost, 
+                                                              periodic_q1
+                                                             )
+                                             ):
+        for N_q2_local, (start_q2, end_q2) in zip(local_sizes(N_q2, proc_sizes[1]),
+                                                  received_widths(proc_sizes[1], N_ghost_q2, 
+                                                                  periodic_q2
+                                                                 )
+                                                 ):
+            N_zones_received +=   (N_q1_local + start_q1 + end_q1) \
+                                * (N_q2_local + start_q2 + end_q2) \
+                                - N_q1_local * N_q2_local
+
+    return(8 * dof * N_zones_received)
+
+def choose_process_grid(N_procs, N_q1, N_q2, N_ghost, N_ghost_q2, dof,
+                        periodic_q1, periodic_q2
+                       ):
+    """
+    Returns the process grid (N_procs_q1, N_procs_q2) which minimizes the
+    number of bytes received in an exchange of the ghost zones(see 
+    get_exchange_bytes). Only the process grids for which every local zone
+    holds at least N_ghost zones along each axis are considered, when 
+    possible. For domains degenerate along q2, the grid is (N_procs, 1).
+    """
+    if(N_q2 == 1):
+        return((N_procs, 1))
+
+    candidates = [(N_procs_q1, N_procs // N_procs_q1) 
+                  for N_procs_q1 in range(1, N_procs + 1) 
+                  if N_procs % N_procs_q1 == 0
+                 ]
+
+    valid = [(N_procs_q1, N_procs_q2) for (N_procs_q1, N_procs_q2) in candidates
+             if (    N_q1 // N_procs_q1 >= max(N_ghost, 1)
+                 and N_q2 // N_procs_q2 >= max(N_ghost_q2, 1)
+                )
+            ]
+
+    return(min(valid or candidates, 
+               key = lambda proc_sizes: get_exchange_bytes(proc_sizes, N_q1, N_q2,
+                                                           N_ghost, N_ghost_q2, dof,
+                                                           periodic_q1, periodic_q2
+                                                          )
+              )
+          )
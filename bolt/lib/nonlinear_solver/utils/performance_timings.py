@@ -22,47 +22,47 @@ def print_table(self, N_iters):
     time_apply_bcs_f = np.zeros(1); time_apply_bcs_fields = np.zeros(1)
 
     # Performing reduction operations to obtain the greatest time amongst nodes/devices:
-    self._comm.Reduce(np.array([self.time_ts/N_iters]), time_ts,
+    self._comm_world.Reduce(np.array([self.time_ts/N_iters]), time_ts,
                       op = MPI.MAX, root = 0
                      )
-    self._comm.Reduce(np.array([self.time_interp2/N_iters]), time_interp2,
+    self._comm_world.Reduce(np.array([self.time_interp2/N_iters]), time_interp2,
                       op = MPI.MAX, root = 0
                      )
-    self._comm.Reduce(np.array([self.time_sourcets/N_iters]), time_sourcets,
+    self._comm_world.Reduce(np.array([self.time_sourcets/N_iters]), time_sourcets,
                       op = MPI.MAX, root = 0
                      )
-    self._comm.Reduce(np.array([self.time_fvm_solver/N_iters]), time_fvm_solver,
+    self._comm_world.Reduce(np.array([self.time_fvm_solver/N_iters]), time_fvm_solver,
                       op = MPI.MAX, root = 0
                      )
-    self._comm.Reduce(np.array([self.time_reconstruct/N_iters]), time_reconstruct,
+    self._comm_world.Reduce(np.array([self.time_reconstruct/N_iters]), time_reconstruct,
                       op = MPI.MAX, root = 0
                      )
-    self._comm.Reduce(np.array([self.time_riemann/N_iters]), time_riemann,
+    self._comm_world.Reduce(np.array([self.time_riemann/N_iters]), time_riemann,
                       op = MPI.MAX, root = 0
                      )
-    self._comm.Reduce(np.array([self.time_communicate_f/N_iters]), time_communicate_f,
+    self._comm_world.Reduce(np.array([self.time_communicate_f/N_iters]), time_communicate_f,
                       op = MPI.MAX, root = 0
                      )
-    self._comm.Reduce(np.array([self.time_apply_bcs_f/N_iters]), time_apply_bcs_f,
+    self._comm_world.Reduce(np.array([self.time_apply_bcs_f/N_iters]), time_apply_bcs_f,
                       op = MPI.MAX, root = 0
                      )
-    self._comm.Reduce(np.array([self.time_fieldstep/N_iters]), time_fieldstep,
+    self._comm_world.Reduce(np.array([self.time_fieldstep/N_iters]), time_fieldstep,
                       op = MPI.MAX, root = 0
                      )
-    self._comm.Reduce(np.array([self.time_fieldsolver/N_iters]), time_fieldsolver,
+    self._comm_world.Reduce(np.array([self.time_fieldsolver/N_iters]), time_fieldsolver,
                       op = MPI.MAX, root = 0
                      )
-    self._comm.Reduce(np.array([self.time_interp3/N_iters]), time_interp3,
+    self._comm_world.Reduce(np.array([self.time_interp3/N_iters]), time_interp3,
                       op = MPI.MAX, root = 0
                      )
-    self._comm.Reduce(np.array([self.time_communicate_fields/N_iters]), time_communicate_fields,
+    self._comm_world.Reduce(np.array([self.time_communicate_fields/N_iters]), time_communicate_fields,
                       op = MPI.MAX, root = 0
                      )
-    self._comm.Reduce(np.array([self.time_apply_bcs_fields/N_iters]), time_apply_bcs_fields,
+    self._comm_world.Reduce(np.array([self.time_apply_bcs_fields/N_iters]), time_apply_bcs_fields,
                       op = MPI.MAX, root = 0
                      )
                      
-    if(self._comm.rank == 0):
+    if(self._comm_world.rank == 0):
 
         table = PrettyTable(["Method", "Time-Taken(s/iter)", "Percentage(%)"])
         table.add_row(['TIMESTEP', time_ts[0], 100])
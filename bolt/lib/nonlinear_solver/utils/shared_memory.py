@@ -0,0 +1,51 @@
+# The following functions are used in backing the arrays of PETSc Vecs
+# by the memory of af.Arrays. This is possible on the CPU backend, where
+# the device memory of ArrayFire is host memory. This avoids copying the
+# data through NumPy(to_ndarray/to_array) when transferring the data
+# between ArrayFire and PETSc. On the other backends, the data is copied.
+
+import ctypes
+import numpy as np
+import arrayfire as af
+
+def shares_host_memory():
+    """
+    Returns True when the memory of af.Arrays is host memory,
+    which can be used directly as the array of a PETSc.Vec
+    """
+    return(af.get_active_backend() == 'cpu')
+
+def place_af_array(vec, array):
+    """
+    Backs the PETSc.Vec by the memory of the af.Array(of dtype f64,
+    with as many elements as vec). Returns the af.Array used, which
+    is a copy of array when array doesn't have memory of its own
+    (such as indexed arrays). The array is locked until reset_af_array
+    is called, and the changes made to the array of vec are reflected
+    in it. The array is to be used only through vec until then.
+    """
+    af.eval(array)
+
+    if(not array.is_linear() or array.is_owner() == False):
+        array = array.copy()
+        af.eval(array)
+
+    # Computations which write to the array are completed:
+    af.sync()
+
+    buffer = np.ctypeslib.as_array((ctypes.c_double * array.elements()).\
+                                   from_address(array.device_ptr())
+                                  )
+    vec.placeArray(buffer)
+
+    return(array)
+
+def reset_af_array(vec, array):
+    """
+    Restores the array of the PETSc.Vec which was backed by the
+    af.Array using place_af_array, and unlocks the af.Array.
+    """
+    vec.resetArray()
+    af.device.unlock_array(array)
+
+    return
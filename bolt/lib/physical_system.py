@@ -65,9 +65,13 @@ class physical_system(object):
         # Checking that domain resolution and size are 
         # of the correct data-type(only of int or float):
         
+        # N_ghost may additionally be set to 'auto'(see below):
         attributes = [a for a in dir(domain) if not a.startswith('__')]
         
         for i in range(len(attributes)):
+            if(attributes[i] == 'N_ghost' and domain.N_ghost == 'auto'):
+                continue
+
             if((isinstance(getattr(domain, attributes[i]), int) or
                 isinstance(getattr(domain, attributes[i]), float)
                ) == 0
@@ -135,10 +139,18 @@ class physical_system(object):
         self.N_p3, self.p3_start, self.p3_end = domain.N_p3,\
                                                 domain.p3_start, domain.p3_end
 
+        # Number of ghost zones used. When this is not specified, or is
+        # set to 'auto', the minimum number of ghost zones needed by the 
+        # methods chosen in params is used by the solver:
+        N_ghost = getattr(domain, 'N_ghost', 'auto')
+
+        if(N_ghost != 'auto' and not isinstance(N_ghost, int)):
+            raise TypeError('Expected N_ghost to be of type int, or \'auto\'')
+
         # Checking that the given input parameters are physical:
         if(self.N_q1 < 0 or self.N_q2 < 0 or
            self.N_p1 < 0 or self.N_p2 < 0 or self.N_p3 < 0 or
-           domain.N_ghost < 0
+           (N_ghost != 'auto' and N_ghost < 0)
           ):
             raise Exception('Grid resolution for the phase \
                              space cannot be negative'
@@ -161,7 +173,7 @@ class physical_system(object):
 
         # Getting number of ghost zones, and the boundary conditions that are
         # utilized
-        self.N_ghost                 = domain.N_ghost
+        self.N_ghost                 = N_ghost
         self.boundary_conditions     = boundary_conditions
 
         # Placeholder for all the functions:
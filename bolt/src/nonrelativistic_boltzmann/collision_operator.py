@@ -31,6 +31,166 @@ def f0(p1, p2, p3, n, T, p1_bulk, p2_bulk, p3_bulk, params):
     af.eval(f0)
     return (f0)
 
+# Holds the decomposition of the last velocity grid passed to f0_separable:
+_p_axes_cache = None
+
+def _separable_p_axes(p1, p2, p3):
+    """
+    Returns the 1D grids along p1, p2 and p3 for a velocity grid which is
+    a tensor product of these 1D grids, and is stored along axis 0(as in
+    the nonlinear solver). The 1D grids are returned as af.Arrays which
+    lie along the axes 0, 1, 2 in order of their stride in the flattened
+    velocity grid. None is returned when the grid cannot be decomposed so.
+    The result is cached for the last (p1, p2, p3) passed.
+    """
+    global _p_axes_cache
+
+    if(    _p_axes_cache is not None
+       and _p_axes_cache[0] is p1
+       and _p_axes_cache[1] is p2
+       and _p_axes_cache[2] is p3
+      ):
+        return(_p_axes_cache[3])
+
+    _p_axes_cache = (p1, p2, p3, None)
+
+    N_p = p1.elements()
+    for p in (p1, p2, p3):
+        if(not isinstance(p, af.Array) or p.dims()[0] != N_p or p.elements() != N_p):
+            return(None)
+
+    unique  = []
+    inverse = []
+    strides = []
+
+    for p in (p1, p2, p3):
+        p_unique, p_inverse = np.unique(p.to_ndarray().ravel(), return_inverse = True)
+        changes             = np.nonzero(p_inverse != p_inverse[0])[0]
+        
+        unique.append(p_unique)
+        inverse.append(p_inverse)
+        strides.append(changes[0] if changes.size > 0 else N_p)
+
+    # Axes ordered from the fastest varying to the slowest varying:
+    order = list(np.argsort(strides, kind = 'stable'))
+    shape = tuple(unique[k].size for k in order)
+
+    if(np.prod(shape) != N_p):
+        return(None)
+
+    p_axes = [None, None, None]
+    for j, k in enumerate(order):
+        axis_shape    = [1, 1, 1]
+        axis_shape[j] = shape[j]
+
+        # Checking that the flattened grid is the tensor product:
+        if(not np.array_equal(inverse[k].reshape(shape, order = 'F'),
+                              np.broadcast_to(np.arange(shape[j]).reshape(axis_shape), 
+                                              shape
+                                             )
+                             )
+          ):
+            return(None)
+        
+        p_axes[k] = af.moddims(af.to_array(unique[k]), *axis_shape)
+
+    _p_axes_cache = (p1, p2, p3, p_axes)
+    return(p_axes)
+
+def f0_separable(p1, p2, p3, n, T, p1_bulk, p2_bulk, p3_bulk, params):
+    """
+    Return the Local MB distribution. 
+
+    Since the exponent is separable in p1, p2 and p3, the distribution 
+    is built as the outer product of 1D factors evaluated on the 1D grids
+    along p1, p2 and p3. This requires evaluating exp over arrays of size
+    (N_p1 + N_p2 + N_p3) * N_q instead of N_p1 * N_p2 * N_p3 * N_q. 
+    Falls back to f0 when the velocity grid isn't stored as a flattened 
+    tensor product along axis 0.
+    """
+    p_axes = _separable_p_axes(p1, p2, p3)
+    
+    moments = (n, T, p1_bulk, p2_bulk, p3_bulk)
+
+    if(   p_axes is None 
+       or not all(isinstance(moment, af.Array) for moment in moments)
+       or not all(   moment.dims()[0] == 1 
+                  and moment.elements() == n.elements() 
+                  for moment in moments
+                 )
+      ):
+        return(f0(p1, p2, p3, n, T, p1_bulk, p2_bulk, p3_bulk, params))
+
+    m = params.mass_particle
+    k = params.boltzmann_constant
+    
+    N_q1 = n.dims()[1] if n.numdims() > 1 else 1
+    N_q2 = n.dims()[2] if n.numdims() > 2 else 1
+
+    # The variation in q-space is held along axis 3 for the 1D factors:
+    to_axis_3 = lambda moment:af.moddims(moment, 1, 1, 1, N_q1 * N_q2)
+
+    n, T = to_axis_3(n), to_axis_3(T)
+
+    # Defining a lambda function to perform broadcasting operations
+    # This is done using af.broadcast, which allows us to perform 
+    # batched operations when operating on arrays of different sizes
+    factor = lambda p, p_bulk:af.exp(-m * (p - p_bulk)**2 / (2 * k * T))
+
+    f0_p1 = af.broadcast(factor, p_axes[0], to_axis_3(p1_bulk))
+
+    # For p_dim < 3, the distribution is uniform along the unused dimensions:
+    if(params.p_dim >= 2):
+        f0_p2 = af.broadcast(factor, p_axes[1], to_axis_3(p2_bulk))
+    else:
+        f0_p2 = p_axes[1]**0
+
+    if(params.p_dim == 3):
+        f0_p3 = af.broadcast(factor, p_axes[2], to_axis_3(p3_bulk))
+    else:
+        f0_p3 = p_axes[2]**0
+
+    multiply = lambda a, b, c, d:a * b * c * d
+    f_MB     = af.broadcast(multiply,
+                            n * (m / (2 * np.pi * k * T))**(params.p_dim / 2),
+                            f0_p1, f0_p2, f0_p3
+                           )
+
+    f_MB = af.moddims(f_MB, p1.elements(), N_q1, N_q2)
+
+    af.eval(f_MB)
+    return(f_MB)
+
+# Holds the last evaluation of params.tau(see _evaluate_tau):
+_tau_cache = None
+
+def _evaluate_tau(q1, q2, p1, p2, p3, params):
+    """
+    Returns (tau, tau_is_zero), where tau is params.tau evaluated at the
+    points of the phase space, and tau_is_zero is True when tau is zero
+    anywhere. The solvers pass the same arrays for the phase space in
+    every call. So the result is cached, and is only recomputed when these
+    arrays or params.tau are changed.
+    """
+    global _tau_cache
+
+    arguments = (params.tau, q1, q2, p1, p2, p3)
+
+    if(   _tau_cache is None 
+       or any(a is not b for a, b in zip(_tau_cache[0], arguments))
+      ):
+        tau = params.tau(q1, q2, p1, p2, p3)
+        
+        if(isinstance(tau, af.Array)):
+            af.eval(tau)
+            tau_is_zero = bool(af.any_true(tau == 0))
+        else:
+            tau_is_zero = (tau == 0)
+
+        _tau_cache = (arguments, tau, tau_is_zero)
+
+    return(_tau_cache[1], _tau_cache[2])
+
 def BGK(f, q1, q2, p1, p2, p3, moments, params, flag = False):
     """Return BGK operator -(f-f0)/tau."""
     n = moments('density', f)
@@ -48,9 +208,12 @@ def BGK(f, q1, q2, p1, p2, p3, moments, params, flag = False):
                               - n * p3_bulk**2
                              ) / (n + eps) + eps
 
-    if(af.any_true(params.tau(q1, q2, p1, p2, p3) == 0)):
+    # tau is only evaluated when the phase space arrays change:
+    tau, tau_is_zero = _evaluate_tau(q1, q2, p1, p2, p3, params)
+
+    if(tau_is_zero):
 
-        f_MB = f0(p1, p2, p3, n, T, p1_bulk, p2_bulk, p3_bulk, params)
+        f_MB = f0_separable(p1, p2, p3, n, T, p1_bulk, p2_bulk, p3_bulk, params)
       
         if(flag == False):
             f_MB[:] = 0        
@@ -60,18 +223,18 @@ def BGK(f, q1, q2, p1, p2, p3, moments, params, flag = False):
     else:
 
         C_f = -(  f
-                - f0(p1, p2, p3, n, T, p1_bulk, p2_bulk, p3_bulk, params)
-               ) / params.tau(q1, q2, p1, p2, p3)
+                - f0_separable(p1, p2, p3, n, T, p1_bulk, p2_bulk, p3_bulk, params)
+               ) / tau
 
         # When (f - f0) is NaN. Dividing by np.inf doesn't give 0
         # Setting when tau is zero we assign f = f0 manually
         # WORKAROUND:
-        if(isinstance(params.tau(q1, q2, p1, p2, p3), af.Array) is True):
-            C_f = af.select(params.tau(q1, q2, p1, p2, p3) == np.inf, 0, C_f)
+        if(isinstance(tau, af.Array) is True):
+            C_f = af.select(tau == np.inf, 0, C_f)
             af.eval(C_f)
         
         else:
-            if(params.tau(q1, q2, p1, p2, p3) == np.inf):
+            if(tau == np.inf):
                 C_f = 0
 
         return(C_f)
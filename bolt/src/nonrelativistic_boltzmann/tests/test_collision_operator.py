@@ -147,3 +147,66 @@ def test_1V():
                          )
                   ) < 1e-14
           )
+
+def test_f0_separable():
+    # Velocity grid laid out as in the nonlinear solver:
+    p1 = -5 + (0.5 + np.arange(16)) * (10 / 16)
+    p2 = -5 + (0.5 + np.arange(12)) * (10 / 12)
+    p3 = -5 + (0.5 + np.arange(8))  * (10 / 8)
+
+    p2, p1, p3 = np.meshgrid(p2, p1, p3)
+
+    p1 = af.flat(af.to_array(p1))
+    p2 = af.flat(af.to_array(p2))
+    p3 = af.flat(af.to_array(p3))
+
+    q1 = af.reorder(af.to_array((0.5 + np.arange(10)) / 10), 1, 0)
+    q1 = af.tile(q1, 1, 1, 6)
+
+    n  = 1 + 0.01 * af.sin(2 * np.pi * q1)
+    T  = 1 + 0.01 * af.cos(2 * np.pi * q1)
+    pb = 0.01 * af.cos(2 * np.pi * q1)
+
+    for p_dim in [1, 2, 3]:
+        params = type('obj', (object, ), {'p_dim': p_dim,
+                                          'mass_particle': 1,
+                                          'boltzmann_constant': 1
+                                         }
+                     )
+
+        f_MB = collision_operator.f0(p1, p2, p3, n, T, pb, -pb, 2 * pb, params)
+        f_MB_separable = collision_operator.f0_separable(p1, p2, p3, n, T, 
+                                                         pb, -pb, 2 * pb, params
+                                                        )
+
+        assert(f_MB_separable.dims() == f_MB.dims())
+        assert(af.max(af.abs(f_MB_separable - f_MB)) < 1e-14)
+
+def test_tau_evaluated_once():
+    # tau is only evaluated again when the phase space arrays,
+    # or params.tau are changed:
+    obj = test()
+
+    calls = []
+    def tau_counted(q1, q2, p1, p2, p3):
+        calls.append(1)
+        return(tau(q1, q2, p1, p2, p3))
+
+    obj.physical_system.params.tau = tau_counted
+
+    f = MB_dist(obj.q1_center, obj.q2_center, obj.p1, obj.p2, obj.p3, 1)
+
+    for i in range(3):
+        collision_operator.BGK(f, obj.q1_center, obj.q2_center,
+                               obj.p1, obj.p2, obj.p3, 
+                               obj.compute_moments,
+                               obj.physical_system.params
+                              )
+    assert (len(calls) == 1)
+
+    collision_operator.BGK(f, obj.q1_center, obj.q2_center,
+                           obj.p1.copy(), obj.p2, obj.p3, 
+                           obj.compute_moments,
+                           obj.physical_system.params
+                          )
+    assert (len(calls) == 2)